@@ -2,14 +2,58 @@
 
 from __future__ import annotations
 
-from singer_sdk.authenticators import OAuthAuthenticator, SingletonMeta
+import datetime
+import threading
+import time
 
+import requests
+from singer_sdk.authenticators import OAuthAuthenticator
+from singer_sdk.helpers._util import utc_now
 
-# The SingletonMeta metaclass makes your streams reuse the same authenticator instance.
-# If this behaviour interferes with your use-case, you can remove the metaclass.
+from tap_gapi.telemetry import Telemetry  # noqa: TCH001
+from tap_gapi.token_cache import TokenCache
+
+# Tokens are refreshed this many seconds before they expire by default.
+DEFAULT_TOKEN_REFRESH_MARGIN = 60
+
+
+# Streams sharing a scope reuse the same authenticator instance, see
+# `Tapgapi.get_authenticator`, so a token is only requested once per scope.
 class gapiAuthenticator(OAuthAuthenticator):
     """Authenticator class for gapi."""
 
+    def __init__(
+        self,
+        *args,  # noqa: ANN002
+        session: requests.Session | None = None,
+        telemetry: Telemetry | None = None,
+        **kwargs,  # noqa: ANN003
+    ) -> None:
+        """Create a new authenticator.
+
+        Args:
+            args: Positional arguments for `OAuthAuthenticator`.
+            session: HTTP session used to request tokens.
+            telemetry: Telemetry counting the token requests.
+            kwargs: Keyword arguments for `OAuthAuthenticator`.
+        """
+        super().__init__(*args, **kwargs)
+        self._session = session or requests.Session()
+        self._telemetry = telemetry
+        self._token_lock = threading.Lock()
+        cache_dir = self.config.get("token_cache_dir")
+        self._token_cache = TokenCache(cache_dir) if cache_dir else None
+
+    @property
+    def token_refresh_margin(self) -> float:
+        """Return how many seconds before expiry a token is refreshed.
+
+        Returns:
+            The refresh margin in seconds.
+        """
+        margin = self.config.get("token_refresh_margin")
+        return DEFAULT_TOKEN_REFRESH_MARGIN if margin is None else margin
+
     @property
     def oauth_request_body(self) -> dict:
         """Define the OAuth request body for the AutomaticTestTap API.
@@ -17,15 +61,109 @@ class gapiAuthenticator(OAuthAuthenticator):
         Returns:
             A dict with the request body
         """
-        # TODO: Define the request body needed for the API.
         return {
             "client_id": self.config["client_id"],
             "client_secret": self.config["client_secret"],
             "grant_type": self.config["grant_type"],
             "access_token_url": self.config["access_token_url"],
-            "scope": self.config["scope"],
+            "scope": self.oauth_scopes,
         }
 
+    @property
+    def auth_headers(self) -> dict:
+        """Return the auth headers, refreshing the token at most once at a time.
+
+        Returns:
+            HTTP headers for authentication.
+        """
+        with self._token_lock:
+            return super().auth_headers
+
+    def is_token_valid(self) -> bool:
+        """Check if the token is valid for longer than the refresh margin.
+
+        Returns:
+            True if the token can still be used.
+        """
+        if self.last_refreshed is None:
+            return False
+        if not self.expires_in:
+            return True
+        age = (utc_now() - self.last_refreshed).total_seconds()
+        return self.expires_in - age > self.token_refresh_margin
+
+    def update_access_token(self) -> None:
+        """Update the access token, going through the token cache if enabled."""
+        if self._token_cache is None:
+            self._request_access_token()
+            return
+
+        key = self._token_cache.cache_key(
+            self.auth_endpoint,
+            self.config["client_id"],
+            self.oauth_scopes,
+        )
+        with self._token_cache.lock(key):
+            cached = self._token_cache.load(key, min_ttl=self.token_refresh_margin)
+            if cached is not None:
+                access_token, expires_at = cached
+                self.access_token = access_token
+                self.last_refreshed = utc_now()
+                self.expires_in = (
+                    None if expires_at is None else int(expires_at - time.time())
+                )
+                self.logger.info(
+                    "Reusing cached access token for scope '%s'.",
+                    self.oauth_scopes,
+                )
+                return
+
+            self._request_access_token()
+            expires_at = (
+                None
+                if self.expires_in is None
+                else (
+                    self.last_refreshed + datetime.timedelta(seconds=self.expires_in)
+                ).timestamp()
+            )
+            self._token_cache.store(key, self.access_token, expires_at)
+
+    def _request_access_token(self) -> None:
+        """Request a new access token through the shared HTTP session.
+
+        Raises:
+            RuntimeError: When OAuth login fails.
+        """
+        request_time = utc_now()
+        started = time.perf_counter()
+        token_response = self._session.post(
+            self.auth_endpoint,
+            headers=self._oauth_headers,
+            data=self.oauth_request_payload,
+            timeout=60,
+        )
+        if self._telemetry is not None:
+            self._telemetry.add_token_request(
+                self.oauth_scopes,
+                time.perf_counter() - started,
+            )
+        try:
+            token_response.raise_for_status()
+        except requests.HTTPError as ex:
+            msg = f"Failed OAuth login, response was '{token_response.text}'. {ex}"
+            raise RuntimeError(msg) from ex
+
+        self.logger.info(
+            "OAuth authorization attempt was successful for scope '%s'.",
+            self.oauth_scopes,
+        )
+
+        token_json = token_response.json()
+        self.access_token = token_json["access_token"]
+        expiration = token_json.get("expires_in", self._default_expiration)
+        self.expires_in = int(expiration) if expiration else None
+        self.last_refreshed = request_time
+
     @classmethod
     def create_for_stream(cls, stream) -> gapiAuthenticator:  # noqa: ANN001
         """Instantiate an authenticator for a specific Singer stream.
@@ -39,5 +177,7 @@ class gapiAuthenticator(OAuthAuthenticator):
         return cls(
             stream=stream,
             auth_endpoint= stream.config["access_token_url"],
-            oauth_scopes= stream.config["scope"],
+            oauth_scopes= stream.scope,
+            session=stream.requests_session,
+            telemetry=stream._tap.telemetry,  # noqa: SLF001
         )
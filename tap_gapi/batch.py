@@ -0,0 +1,194 @@
+"""Batch files written in place of RECORD messages."""
+
+from __future__ import annotations
+
+import gzip
+from typing import IO, Any, Iterator
+from uuid import uuid4
+
+from singer_sdk.batch import BaseBatcher, lazy_chunked_generator
+from singer_sdk.helpers._batch import BatchConfig, BatchFileFormat
+
+from tap_gapi.writer import get_encoder
+
+# Faster than gzip's default of 9, for files only read once by the loader.
+GZIP_COMPRESS_LEVEL = 6
+
+
+def _import_pyarrow() -> Any:  # noqa: ANN401
+    """Import ``pyarrow``, which is slow to import, once Parquet is written.
+
+    Returns:
+        The ``pyarrow`` module, with ``pyarrow.parquet`` loaded.
+    """
+    import pyarrow  # noqa: PLC0415
+    import pyarrow.parquet  # noqa: PLC0415
+
+    return pyarrow
+
+
+def _arrow_type(property_schema: dict) -> Any:  # noqa: ANN401
+    """Return the Arrow type of a JSON schema property.
+
+    Args:
+        property_schema: The JSON schema of the property.
+
+    Returns:
+        The Arrow data type, or None if the property has no single Arrow type.
+    """
+    types = property_schema.get("type", [])
+    if isinstance(types, str):
+        types = [types]
+    types = set(types) - {"null"}
+    if len(types) != 1:
+        return None
+    json_type = types.pop()
+    pyarrow = _import_pyarrow()
+    if json_type == "object":
+        properties = property_schema.get("properties")
+        if not properties:
+            return None
+        fields = [
+            (name, _arrow_type(schema) or pyarrow.string())
+            for name, schema in properties.items()
+        ]
+        return pyarrow.struct(fields)
+    if json_type == "array":
+        items = property_schema.get("items")
+        item_type = _arrow_type(items) if isinstance(items, dict) else None
+        return None if item_type is None else pyarrow.list_(item_type)
+    return {
+        "boolean": pyarrow.bool_(),
+        "integer": pyarrow.int64(),
+        "number": pyarrow.float64(),
+        "string": pyarrow.string(),
+    }.get(json_type)
+
+
+def arrow_schema(schema: dict) -> Any:  # noqa: ANN401
+    """Return the Arrow schema of a stream's JSON schema.
+
+    Every batch file of a stream gets the same column types, instead of types
+    inferred from the records of each file. Properties without a single Arrow
+    type are written as JSON strings.
+
+    Args:
+        schema: The JSON schema of the stream.
+
+    Returns:
+        The ``pyarrow.Schema`` of the Parquet files.
+    """
+    pyarrow = _import_pyarrow()
+    return pyarrow.schema(
+        (name, _arrow_type(property_schema) or pyarrow.string())
+        for name, property_schema in schema.get("properties", {}).items()
+    )
+
+
+class FileBatcher(BaseBatcher):
+    """Write records to JSON Lines or Parquet batch files.
+
+    JSON Lines records are serialized with the fast writer's encoder, and the
+    ``compression`` setting of the encoding is honored for both formats. Each
+    file holds at most ``batch_size`` records.
+    """
+
+    def __init__(
+        self,
+        tap_name: str,
+        stream_name: str,
+        batch_config: BatchConfig,
+        schema: dict,
+    ) -> None:
+        """Create a new batcher.
+
+        Args:
+            tap_name: The name of the tap.
+            stream_name: The name of the stream.
+            batch_config: The batch configuration.
+            schema: The JSON schema of the records.
+
+        Raises:
+            ImportError: If Parquet files are requested and ``pyarrow`` is not
+                installed.
+        """
+        super().__init__(tap_name, stream_name, batch_config)
+        self.schema = schema
+        self.format = batch_config.encoding.format
+        self.compressed = batch_config.encoding.compression == "gzip"
+        self._dumps = get_encoder()
+        if self.format == BatchFileFormat.PARQUET:
+            try:
+                self._pyarrow = _import_pyarrow()
+            except ImportError:  # pragma: no cover - optional dependency
+                msg = "Parquet batch files require the 'parquet' extra of tap-gapi"
+                raise ImportError(msg) from None
+            self._arrow_schema = arrow_schema(schema)
+            self._json_columns = [
+                name
+                for name, property_schema in schema.get("properties", {}).items()
+                if _arrow_type(property_schema) is None
+            ]
+
+    @property
+    def extension(self) -> str:
+        """Return the file name extension of the batch files.
+
+        Returns:
+            The extension, including the leading dot.
+        """
+        if self.format == BatchFileFormat.PARQUET:
+            return ".parquet"
+        return ".json.gz" if self.compressed else ".json"
+
+    def _write_jsonl(self, file: IO[bytes], records: Iterator[dict]) -> None:
+        dumps = self._dumps
+        if self.compressed:
+            with gzip.GzipFile(
+                fileobj=file,
+                mode="wb",
+                compresslevel=GZIP_COMPRESS_LEVEL,
+            ) as gz:
+                gz.writelines(dumps(record) + b"\n" for record in records)
+        else:
+            file.writelines(dumps(record) + b"\n" for record in records)
+
+    def _write_parquet(self, file: IO[bytes], records: Iterator[dict]) -> None:
+        rows = list(records)
+        for row in rows:
+            for name in self._json_columns:
+                if row.get(name) is not None:
+                    row[name] = self._dumps(row[name]).decode()
+        table = self._pyarrow.Table.from_pylist(rows, schema=self._arrow_schema)
+        self._pyarrow.parquet.write_table(
+            table,
+            file,
+            compression="gzip" if self.compressed else "snappy",
+        )
+
+    def get_batches(self, records: Iterator[dict]) -> Iterator[list[str]]:
+        """Write the records to batch files.
+
+        Args:
+            records: The records to batch.
+
+        Yields:
+            The manifest of each batch, a list with the URL of its file.
+        """
+        sync_id = f"{self.tap_name}--{self.stream_name}-{uuid4()}"
+        prefix = self.batch_config.storage.prefix or ""
+        write = (
+            self._write_parquet
+            if self.format == BatchFileFormat.PARQUET
+            else self._write_jsonl
+        )
+        for i, chunk in enumerate(
+            lazy_chunked_generator(records, self.batch_config.batch_size),
+            start=1,
+        ):
+            filename = f"{prefix}{sync_id}-{i}{self.extension}"
+            with self.batch_config.storage.fs(create=True) as fs:
+                with fs.open(filename, "wb") as file:
+                    write(file, chunk)
+                file_url = fs.geturl(filename)
+            yield [file_url]
@@ -0,0 +1,161 @@
+"""Persistent cache of the discovery catalog shared by tap invocations.
+
+The catalog only changes with the tap's code, its version and the few settings
+deciding which streams and properties exist. This module imports nothing from
+the Singer SDK, so a cached catalog is written out before the SDK and the stream
+definitions are imported at all.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+from importlib import metadata
+from pathlib import Path
+
+#: Settings changing the discovered streams or their schemas.
+DISCOVERY_SETTINGS = (
+    "change_detection",
+    "delete_detection",
+    "denormalize_cost_centers",
+    "hierarchy_streams",
+)
+
+_PACKAGE_DIR = Path(__file__).parent
+
+
+@functools.lru_cache(maxsize=None)
+def definition_hash() -> str:
+    """Return a hash of the tap's source code, which defines the streams.
+
+    Returns:
+        The hex digest of every module of the package.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(_PACKAGE_DIR.rglob("*.py")):
+        digest.update(path.relative_to(_PACKAGE_DIR).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def tap_version() -> str:
+    """Return the installed version of the tap.
+
+    Returns:
+        The package version, or an empty string if it is not installed.
+    """
+    try:
+        return metadata.version("tap-gapi")
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+class CatalogCache:
+    """Store discovered catalogs on disk, one file per scope and tap release.
+
+    Catalogs are keyed by the configured scopes, the tap version, a hash of the
+    stream definitions and the discovery settings, so a new release or a
+    changed setting is discovered again instead of read back stale.
+    """
+
+    def __init__(self, directory: str | os.PathLike) -> None:
+        """Create a new cache.
+
+        Args:
+            directory: Directory holding the cached catalogs.
+        """
+        self.directory = Path(directory).expanduser()
+
+    @staticmethod
+    def cache_key(config: dict) -> str:
+        """Return the cache key of the catalog discovered with a config.
+
+        Args:
+            config: The tap config.
+
+        Returns:
+            A file-name safe key.
+        """
+        scope = config.get("scope") or []
+        raw = json.dumps(
+            {
+                "scopes": [scope] if isinstance(scope, str) else list(scope),
+                "version": tap_version(),
+                "definitions": definition_hash(),
+                "settings": {
+                    name: bool(config.get(name)) for name in DISCOVERY_SETTINGS
+                },
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    def load(self, key: str) -> str | None:
+        """Return a cached catalog.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The catalog's JSON text, or None if none is cached.
+        """
+        try:
+            return (self.directory / f"catalog-{key}.json").read_text()
+        except OSError:
+            return None
+
+    def store(self, key: str, catalog_text: str) -> None:
+        """Atomically write a catalog.
+
+        Args:
+            key: The cache key.
+            catalog_text: The catalog's JSON text.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"catalog-{key}.json"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(catalog_text)
+        tmp_path.replace(path)
+
+
+def cached_discovery(args: list[str]) -> str | None:
+    """Return the cached catalog of a ``--discover`` command line, if any.
+
+    Only plain ``--discover`` invocations with config files are answered from
+    the cache. Anything else, like ``--config ENV``, ``--refresh-catalog`` or
+    another option, is left to the tap.
+
+    Args:
+        args: The command line arguments.
+
+    Returns:
+        The catalog's JSON text, or None if the tap must run.
+    """
+    config_files: list[str] = []
+    discover = False
+    arguments = iter(args)
+    for argument in arguments:
+        if argument == "--discover":
+            discover = True
+        elif argument == "--config":
+            config_files.append(next(arguments, "ENV"))
+        elif argument.startswith("--config="):
+            config_files.append(argument[len("--config=") :])
+        else:
+            return None
+    if not discover or not config_files or "ENV" in config_files:
+        return None
+
+    config: dict = {}
+    try:
+        for config_file in config_files:
+            config.update(json.loads(Path(config_file).read_text()))
+    except (OSError, ValueError):
+        return None
+    cache_dir = config.get("catalog_cache_dir")
+    if not cache_dir:
+        return None
+    cache = CatalogCache(cache_dir)
+    return cache.load(cache.cache_key(config))
@@ -0,0 +1,247 @@
+"""Content-hash change detection and delete detection for gapi streams."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Iterator
+
+from tap_gapi.keyset import KeySetStore
+
+#: Schema of the column flagging records deleted from the source.
+DELETED_AT_PROPERTY = {"type": ["string", "null"], "format": "date-time"}
+
+#: Size in bytes of the record digests.
+DIGEST_SIZE = 8
+
+
+def record_digest(record: dict) -> bytes:
+    """Return a short, stable digest of a record's content.
+
+    Args:
+        record: The raw record.
+
+    Returns:
+        A digest that only changes when the record does.
+    """
+    canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=DIGEST_SIZE).digest()
+
+
+def record_key(record: dict, primary_keys: list[str]) -> str:
+    """Return the primary key of a record as a string.
+
+    Args:
+        record: The raw record.
+        primary_keys: The stream's primary keys.
+
+    Returns:
+        The value of a single primary key, or a JSON list of composite keys.
+    """
+    if len(primary_keys) == 1:
+        return str(record.get(primary_keys[0]))
+    return json.dumps([record.get(key) for key in primary_keys])
+
+
+class ChangeTracker:
+    """Track what changed in a stream since the key set saved in its state.
+
+    The tracker keeps, in the stream (or partition) state:
+
+    - ``body_digest``: a hash of the raw response body, for single-response streams
+    - ``etag`` / ``last_modified``: the validators sent back by the server
+    - ``record_keys``: the compact key set of the records, with a digest of each
+      record when detecting changes
+
+    Without digests, only deletes are detected: every record is emitted, and
+    the keys missing since the previous run are flagged as deleted.
+    """
+
+    def __init__(
+        self,
+        state: dict,
+        primary_keys: list[str],
+        *,
+        digests: bool = True,
+        store: KeySetStore | None = None,
+        owner: str = "",
+    ) -> None:
+        """Create a tracker from the previous state.
+
+        Args:
+            state: The stream or partition state.
+            primary_keys: The stream's primary keys.
+            digests: Whether to detect changed records, not only deleted ones.
+            store: Where key sets are written, for sidecar files.
+            owner: The stream or partition tracked, naming its sidecar files.
+        """
+        self._primary_keys = primary_keys
+        self.digests = digests
+        self._store = store or KeySetStore()
+        self._owner = owner
+        self.previous_body_digest: str | None = state.get("body_digest")
+        self.previous_etag: str | None = state.get("etag")
+        self.previous_last_modified: str | None = state.get("last_modified")
+        self._previous_key_set: dict | None = state.get("record_keys")
+        #: Whether the sidecar file of the previous key set was missing.
+        self.key_set_missing = False
+        self.previous_hashes: dict[str, bytes] = (
+            dict(self._previous_entries()) if digests else {}
+        )
+        self.hashes: dict[str, bytes] = {}
+        self.responses = 0
+        self.body_digest: str | None = None
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        self.unchanged = False
+        # Set when the source was filtered server-side, so absent records are not
+        # necessarily deleted.
+        self.partial = False
+
+    @property
+    def conditional_headers(self) -> dict[str, str]:
+        """Return the headers making the first request conditional.
+
+        Returns:
+            ``If-None-Match`` / ``If-Modified-Since`` headers, when known.
+        """
+        headers: dict[str, str] = {}
+        if not self.digests:
+            # Every record is emitted, so the body is always needed.
+            return headers
+        if self.previous_etag:
+            headers["If-None-Match"] = self.previous_etag
+        if self.previous_last_modified:
+            headers["If-Modified-Since"] = self.previous_last_modified
+        return headers
+
+    def observe_response(self, headers: Any) -> None:  # noqa: ANN401
+        """Record the cache validators of a response.
+
+        Args:
+            headers: The response headers.
+        """
+        self.responses += 1
+        self.etag = headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified")
+
+    def observe_body(self, content: bytes) -> bool:
+        """Hash a complete response body.
+
+        Args:
+            content: The raw response body.
+
+        Returns:
+            True if the body is identical to the one seen on the previous run.
+        """
+        if not self.digests:
+            return False
+        self.body_digest = hashlib.sha256(content).hexdigest()
+        return self.body_digest == self.previous_body_digest
+
+    def record_key(self, record: dict) -> str:
+        """Return the primary key of a record as a string.
+
+        Args:
+            record: The raw record.
+
+        Returns:
+            The key under which the record's digest is stored.
+        """
+        return record_key(record, self._primary_keys)
+
+    def key_record(self, key: str) -> dict:
+        """Rebuild the primary key columns of a record from its key.
+
+        Args:
+            key: A key returned by :meth:`record_key`.
+
+        Returns:
+            A partial record holding the primary key columns.
+        """
+        if len(self._primary_keys) == 1:
+            return {self._primary_keys[0]: key}
+        return dict(zip(self._primary_keys, json.loads(key)))
+
+    def is_changed(self, record: dict) -> bool:
+        """Register a record and tell whether it is new or changed.
+
+        Args:
+            record: The raw record.
+
+        Returns:
+            False if the record is identical to the previous run.
+        """
+        key = self.record_key(record)
+        if not self.digests:
+            self.hashes[key] = b""
+            return True
+        digest = record_digest(record)
+        self.hashes[key] = digest
+        return self.previous_hashes.get(key) != digest
+
+    def deleted_keys(self) -> Iterator[str]:
+        """Yield the keys seen on the previous run but not on this one.
+
+        Yields:
+            The key of each deleted record.
+        """
+        if self.unchanged or self.partial:
+            return
+        hashes = self.hashes
+        previous_keys = (
+            self.previous_hashes
+            if self.digests
+            else (key for key, _ in self._previous_entries())
+        )
+        for key in previous_keys:
+            if key not in hashes:
+                yield key
+
+    def _previous_entries(self) -> Iterator[tuple[str, bytes]]:
+        """Return the keys and digests of the previous run.
+
+        Returns:
+            An iterator of each key and its digest, sorted by key.
+        """
+        try:
+            return self._store.load(self._previous_key_set)
+        except FileNotFoundError:
+            # Without the previous keys, nothing is reported as deleted and
+            # every record as changed.
+            self.key_set_missing = True
+            return iter(())
+
+    def save(self, state: dict) -> None:
+        """Write the key set of this run to the state.
+
+        Args:
+            state: The stream or partition state.
+        """
+        if self.unchanged:
+            return
+        entries = self.hashes
+        if self.partial:
+            previous = (
+                self.previous_hashes
+                if self.digests
+                else dict.fromkeys((key for key, _ in self._previous_entries()), b"")
+            )
+            entries = {**previous, **self.hashes}
+        key_set = self._store.dump(
+            sorted(entries.items()),
+            len(entries),
+            DIGEST_SIZE if self.digests else 0,
+            owner=self._owner,
+            previous=self._previous_key_set,
+        )
+        state["record_keys"] = key_set
+        for key, value in (
+            ("body_digest", self.body_digest if self.responses == 1 else None),
+            ("etag", self.etag),
+            ("last_modified", self.last_modified),
+        ):
+            if value:
+                state[key] = value
+            else:
+                state.pop(key, None)
@@ -0,0 +1,27 @@
+"""Command line entry point of tap-gapi.
+
+A discovery answered by the catalog cache is written out before the tap, and
+with it the Singer SDK, is imported.
+"""
+
+from __future__ import annotations
+
+import sys
+
+from tap_gapi.catalog_cache import cached_discovery
+
+
+def main() -> None:
+    """Run the tap's command line, or write out a cached catalog."""
+    catalog_text = cached_discovery(sys.argv[1:])
+    if catalog_text is not None:
+        sys.stdout.write(f"{catalog_text}\n")
+        return
+
+    from tap_gapi.tap import Tapgapi  # noqa: PLC0415
+
+    Tapgapi.cli()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,26 +2,395 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import datetime
+import email.utils
+import enum
+import itertools
 import json
+import logging
+import math
+import threading
+import time
 import urllib.parse
-import sys
-from functools import cached_property
-from typing import Any, Callable, Iterable
+from concurrent.futures import Executor
+from functools import cached_property, partial
+from http import HTTPStatus
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    ClassVar,
+    Generator,
+    Iterable,
+    Iterator,
+)
 
+import pendulum
 import requests
+from singer_sdk import metrics
+from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+from singer_sdk.helpers._batch import BaseBatchFileEncoding, BatchConfig  # noqa: TCH002
+from singer_sdk.helpers._typing import TypeConformanceLevel
+from singer_sdk.helpers._util import utc_now
 from singer_sdk.helpers.jsonpath import extract_jsonpath
 from singer_sdk.pagination import JSONPathPaginator # noqa: TCH002
 from singer_sdk.streams import RESTStream
 
-from tap_gapi.auth import gapiAuthenticator
+from tap_gapi.batch import FileBatcher
+from tap_gapi.changes import DELETED_AT_PROPERTY, ChangeTracker, record_key
+from tap_gapi.coercion import RecordCoercer
+from tap_gapi.engine import AsyncEngine  # noqa: TCH001
+from tap_gapi.hierarchy import Hierarchy
+from tap_gapi.jsonstream import IncrementalJSONReader, jsonpath_to_keys, project
+from tap_gapi.lookup import LookupIndex
+from tap_gapi.page_size import (
+    DEFAULT_MAX_PAGE_SIZE,
+    DEFAULT_MIN_PAGE_SIZE,
+    DEFAULT_PAGE_LATENCY_TARGET,
+    AdaptivePageSize,
+    set_query_param,
+)
+from tap_gapi.prefetch import RecordPrefetcher
+from tap_gapi.telemetry import StreamTelemetry, TelemetryMetric
+from tap_gapi.transport import send_async
 
-if sys.version_info >= (3, 9):
-    import importlib.resources as importlib_resources
-else:
-    import importlib_resources
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 _Auth = Callable[[requests.PreparedRequest], requests.PreparedRequest]
 
+# Attribute used to memoize the decoded body on a ``requests.Response``.
+_PARSED_BODY_ATTR = "_gapi_parsed_body"
+
+# Size of the chunks read from the socket when streaming a response body.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def loads_json(data: bytes | str) -> Any:  # noqa: ANN401
+    """Decode a JSON document, using orjson when it is installed.
+
+    Args:
+        data: The raw JSON document.
+
+    Returns:
+        The decoded document.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def parse_timestamp(value: Any) -> datetime.datetime | None:  # noqa: ANN401
+    """Parse an ISO 8601 timestamp, assuming UTC when no offset is given.
+
+    Args:
+        value: The raw value of a timestamp field.
+
+    Returns:
+        An aware datetime, or None if the value is not a timestamp.
+    """
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = pendulum.parse(value, strict=False)
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+def parse_response_body(response: requests.Response) -> Any:  # noqa: ANN401
+    """Return the decoded JSON body of a response, decoding it at most once.
+
+    The record extractor and the paginator both read from the same response, so
+    the decoded document is cached on the response object itself.
+
+    Args:
+        response: The HTTP ``requests.Response`` object.
+
+    Returns:
+        The decoded response body.
+    """
+    body = getattr(response, _PARSED_BODY_ATTR, None)
+    if body is None:
+        body = loads_json(response.content)
+        setattr(response, _PARSED_BODY_ATTR, body)
+    return body
+
+
+class ThrottleMetric(str, enum.Enum):
+    """Metric logged whenever a request waits for the rate limits."""
+
+    THROTTLE_WAIT = "throttle_wait"
+
+
+def rate_limit_delay(response: requests.Response) -> float | None:
+    """Return how long the server asks clients to wait before the next request.
+
+    ``Retry-After`` is honored on ``429`` and ``503`` responses, and an exhausted
+    ``X-RateLimit-Remaining`` quota pauses requests until ``X-RateLimit-Reset``.
+
+    Args:
+        response: The HTTP ``requests.Response`` object.
+
+    Returns:
+        The delay in seconds, or None if the server did not ask for one.
+    """
+    headers = response.headers
+    retry_after = headers.get("Retry-After")
+    if retry_after and response.status_code in {
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+    }:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            try:
+                retry_at = email.utils.parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                return None
+            return max(retry_at.timestamp() - time.time(), 0.0)
+
+    reset = headers.get("X-RateLimit-Reset")
+    if headers.get("X-RateLimit-Remaining") == "0" and reset:
+        try:
+            reset_value = float(reset)
+        except ValueError:
+            return None
+        # Gateways send either the seconds left in the window or its epoch end.
+        if reset_value > time.time() / 2:
+            reset_value -= time.time()
+        return max(reset_value, 0.0)
+    return None
+
+
+class TokenBucket:
+    """Let callers through at a steady rate, allowing short bursts."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Create a new, full bucket.
+
+        Args:
+            rate: Tokens added per second.
+            burst: Maximum number of tokens held by the bucket.
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, queuing behind earlier callers if the bucket is empty.
+
+        Returns:
+            How many seconds to wait before using the token.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class RequestScheduler:
+    """Schedule the requests of every stream of a tap within the API limits.
+
+    Requests go through a token bucket shared by all hosts, a concurrency limit
+    per host, and a per-host pause set from the rate-limit headers of the
+    responses. Every wait is logged as a ``throttle_wait`` metric and added up in
+    :attr:`throttle_waits`.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float | None = None,
+        burst_size: int | None = None,
+        max_concurrent_requests_per_host: int | None = None,
+        metrics_logger: logging.Logger | None = None,
+    ) -> None:
+        """Create a new scheduler.
+
+        Args:
+            requests_per_second: Sustained request rate, unlimited if None.
+            burst_size: Requests that may be sent at once after an idle period.
+            max_concurrent_requests_per_host: Requests in flight per host,
+                unlimited if None.
+            metrics_logger: Logger receiving the throttle metrics.
+        """
+        self._bucket = (
+            TokenBucket(
+                requests_per_second,
+                burst_size or math.ceil(requests_per_second),
+            )
+            if requests_per_second
+            else None
+        )
+        self._max_concurrency = max_concurrent_requests_per_host
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._async_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._paused_until: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._metrics_logger = metrics_logger or metrics.get_metrics_logger()
+        #: Number of waits and total seconds waited, by host and reason.
+        self.throttle_waits: dict[tuple[str, str], list[float]] = {}
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore | None:
+        if not self._max_concurrency:
+            return None
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(
+                    self._max_concurrency,
+                )
+            return self._semaphores[host]
+
+    def _async_semaphore(self, host: str) -> asyncio.Semaphore | None:
+        if not self._max_concurrency:
+            return None
+        if host not in self._async_semaphores:
+            self._async_semaphores[host] = asyncio.Semaphore(self._max_concurrency)
+        return self._async_semaphores[host]
+
+    def _wait(self, host: str, reason: str, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        time.sleep(seconds)
+        self._record_wait(host, reason, seconds)
+
+    async def _wait_async(self, host: str, reason: str, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        await asyncio.sleep(seconds)
+        self._record_wait(host, reason, seconds)
+
+    def _record_wait(self, host: str, reason: str, seconds: float) -> None:
+        with self._lock:
+            totals = self.throttle_waits.setdefault((host, reason), [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+        metrics.log(
+            self._metrics_logger,
+            metrics.Point(
+                "timer",
+                ThrottleMetric.THROTTLE_WAIT,
+                seconds,
+                {metrics.Tag.ENDPOINT: host, "reason": reason},
+            ),
+        )
+
+    @contextlib.contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        """Wait until a request to ``url`` may be sent, and hold its slot.
+
+        Args:
+            url: The request URL.
+
+        Yields:
+            Nothing, once the request may be sent.
+        """
+        host = urllib.parse.urlsplit(url).netloc
+        semaphore = self._semaphore(host)
+        if semaphore is not None and not semaphore.acquire(blocking=False):
+            started = time.monotonic()
+            semaphore.acquire()
+            self._record_wait(host, "concurrency", time.monotonic() - started)
+        try:
+            self._wait(
+                host,
+                "retry_after",
+                self._paused_until.get(host, 0) - time.monotonic(),
+            )
+            if self._bucket is not None:
+                self._wait(host, "rate_limit", self._bucket.reserve())
+            yield
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+    @contextlib.asynccontextmanager
+    async def async_slot(self, url: str) -> AsyncIterator[None]:
+        """Wait on the event loop until a request to ``url`` may be sent.
+
+        This is the asyncio counterpart of :meth:`slot`, only to be used from a
+        single event loop.
+
+        Args:
+            url: The request URL.
+
+        Yields:
+            Nothing, once the request may be sent.
+        """
+        host = urllib.parse.urlsplit(url).netloc
+        semaphore = self._async_semaphore(host)
+        if semaphore is not None:
+            started = time.monotonic()
+            waited = semaphore.locked()
+            await semaphore.acquire()
+            if waited:
+                self._record_wait(host, "concurrency", time.monotonic() - started)
+        try:
+            await self._wait_async(
+                host,
+                "retry_after",
+                self._paused_until.get(host, 0) - time.monotonic(),
+            )
+            if self._bucket is not None:
+                await self._wait_async(host, "rate_limit", self._bucket.reserve())
+            yield
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+    def observe(self, url: str, response: requests.Response) -> float | None:
+        """Pause requests to the host of ``url`` if the response asks for it.
+
+        Args:
+            url: The request URL.
+            response: The HTTP ``requests.Response`` object.
+
+        Returns:
+            The delay requested by the server, if any.
+        """
+        delay = rate_limit_delay(response)
+        if delay:
+            host = urllib.parse.urlsplit(url).netloc
+            with self._lock:
+                self._paused_until[host] = max(
+                    self._paused_until.get(host, 0),
+                    time.monotonic() + delay,
+                )
+        return delay
+
+
+class PageEnd:
+    """Mark the end of a page in the records of a paginated stream.
+
+    It travels with the records up to ``post_process``, which runs once every
+    record of the page has been written, even when the page was prefetched.
+    """
+
+    def __init__(self, next_token: Any | None) -> None:  # noqa: ANN401
+        """Create a new marker.
+
+        Args:
+            next_token: The token of the page following this one, if any.
+        """
+        self.next_token = next_token
+
+
 class gapiStream(RESTStream):
     """gapi stream class."""
 
@@ -32,14 +401,86 @@ class gapiStream(RESTStream):
 
     records_jsonpath = "$.result[*]"
 
+    #: Query parameter filtering records on the replication key server-side, for
+    #: endpoints that support one.
+    replication_filter_param: str | None = None
+
+    #: Query parameter listing the properties the endpoint should return, for
+    #: endpoints that support one. It is only sent when properties are
+    #: deselected.
+    fields_param: str | None = None
+
+    #: Whether the endpoint returns all of its records in a single response.
+    single_response = True
+
+    #: The keys of a record's id and of its parent's id, for streams holding a
+    #: tree. Closure-table and ancestor-path streams are derived from them.
+    hierarchy_keys: tuple[str, str] | None = None
+
+    #: A boolean setting the stream is only discovered with, for optional
+    #: streams.
+    enabled_by: str | None = None
+
+    #: The dimension streams the records are denormalized against: the stream
+    #: class and the foreign key of each dimension, by the name of the object
+    #: property it is nested in.
+    dimensions: ClassVar[dict[str, tuple[type[gapiStream], str]]] = {}
+
+    #: The stream whose records this stream is built from, as they are synced,
+    #: instead of requesting its own.
+    records_from: ClassVar[type[gapiStream] | None] = None
+
+    _replication_floor: datetime.datetime | None = None
+    _dimension_lookups: ClassVar[dict[str, tuple[LookupIndex, str]]] = {}
+    _change_tracker: ChangeTracker | None = None
+
+    #: Whether records are written to batch files instead of RECORD messages.
+    _batching = False
+
+    #: Compiled record coercers of each stream class, keyed by schema.
+    _record_coercers: ClassVar[dict[str, RecordCoercer]]
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        """Initialize the stream.
+
+        Args:
+            args: Positional arguments for `RESTStream`.
+            kwargs: Keyword arguments for `RESTStream`.
+        """
+        super().__init__(*args, **kwargs)
+        self._prefetchers: dict[str, RecordPrefetcher] = {}
+        if self.config.get("fast_coercion"):
+            # Records are coerced by `post_process` instead.
+            self.TYPE_CONFORMANCE_LEVEL = TypeConformanceLevel.NONE
+        if self.config.get("change_detection") or self.config.get("delete_detection"):
+            self.schema = {
+                **self.schema,
+                "properties": {
+                    **self.schema["properties"],
+                    "_sdc_deleted_at": DELETED_AT_PROPERTY,
+                },
+            }
+
+    #: The OAuth scope granting access to this stream's endpoint.
+    scope: str
+
     @cached_property
     def authenticator(self) -> _Auth:
-        """Return a new authenticator object.
+        """Return the authenticator shared by every stream of this scope.
 
         Returns:
             An authenticator instance.
         """
-        return gapiAuthenticator.create_for_stream(self)
+        return self._tap.get_authenticator(self)  # noqa: SLF001
+
+    @property
+    def requests_session(self) -> requests.Session:
+        """Return the HTTP session shared by every stream of the tap.
+
+        Returns:
+            The tap-wide ``requests.Session``.
+        """
+        return self._tap.requests_session  # noqa: SLF001
 
     @property
     def http_headers(self) -> dict:
@@ -56,8 +497,8 @@ class gapiStream(RESTStream):
 
     def get_url_params(
         self,
-        context: dict | None,  # noqa: ARG002
-        next_page_token: Any | None,  # noqa: ANN401
+        context: dict | None,
+        next_page_token: Any | None,  # noqa: ANN401, ARG002
     ) -> dict[str, Any]:
         """Return a dictionary of values to be used in URL parameterization.
 
@@ -69,29 +510,806 @@ class gapiStream(RESTStream):
             A dictionary of URL query parameters.
         """
         params: dict = {}
+        if self.replication_key and self.replication_filter_param:
+            starting_value = self.get_starting_replication_key_value(context)
+            if starting_value:
+                params[self.replication_filter_param] = starting_value
+        if self.fields_param and self._selected_properties is not None:
+            params[self.fields_param] = ",".join(self._selected_properties)
         return params
 
+    def _start_change_tracking(self, context: dict | None) -> None:
+        """Load the key set of the previous run, if change or delete detection is on.
+
+        Args:
+            context: The stream context.
+        """
+        change_detection = bool(self.config.get("change_detection"))
+        if self._change_tracker is None and (
+            change_detection or self.config.get("delete_detection")
+        ):
+            self._change_tracker = ChangeTracker(
+                self.get_context_state(context),
+                self.primary_keys or [],
+                digests=change_detection,
+                store=self._tap.key_set_store,  # noqa: SLF001
+                owner=f"{self.name}/{self._context_key(context)}",
+            )
+            self._change_tracker.partial = self._is_partial_sync(context)
+
+    def _is_partial_sync(self, context: dict | None) -> bool:
+        """Tell whether this sync only fetches part of the source.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            True if records missing from this sync are not necessarily deleted.
+        """
+        return bool(
+            self.replication_filter_param
+            and self.replication_key
+            and self.get_starting_replication_key_value(context),
+        )
+
+    def get_records(self, context: dict | None) -> Iterable[dict[str, Any]]:
+        """Return the records changed since the bookmark or `start_date`.
+
+        With change detection enabled, only new and changed records are returned.
+        With change or delete detection enabled, they are followed by a tombstone
+        for every record that disappeared from the source.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            Each record that was not filtered out.
+        """
+        self._replication_floor = (
+            parse_timestamp(self.get_starting_replication_key_value(context))
+            if self.replication_key
+            else None
+        )
+        self._start_change_tracking(context)
+        self._dimension_lookups = {
+            name: (self._tap.get_record_index(dimension_type, "lookup"), foreign_key)
+            for name, (dimension_type, foreign_key) in self.dimensions.items()
+        }
+        yield from super().get_records(context)
+
+        tracker, self._change_tracker = self._change_tracker, None
+        if tracker is None:
+            return
+        deleted_at = utc_now().isoformat()
+        for key in tracker.deleted_keys():
+            yield {**tracker.key_record(key), "_sdc_deleted_at": deleted_at}
+        if tracker.key_set_missing:
+            self.logger.warning(
+                "The previous key set of stream '%s' is missing from the key set "
+                "directory, so no deleted record was detected.",
+                self.name,
+            )
+        tracker.save(self.get_context_state(context))
+        # Make sure the new key set is emitted even if no record changed.
+        self._is_state_flushed = False
+
+    def post_process(
+        self,
+        row: dict,
+        context: dict | None = None,  # noqa: ARG002
+    ) -> dict | None:
+        """Drop unchanged records and records older than the starting bookmark.
+
+        The records of denormalized streams are first joined with their
+        dimensions, so they change with them.
+
+        Args:
+            row: Individual record in the stream.
+            context: The stream context.
+
+        Returns:
+            The record, or None if it has not changed since the last sync.
+        """
+        for name, (index, foreign_key) in self._dimension_lookups.items():
+            row[name] = index.get(row.get(foreign_key))
+        if self._change_tracker is not None and not self._change_tracker.is_changed(
+            row,
+        ):
+            return None
+        if self._replication_floor is not None:
+            updated_at = parse_timestamp(row.get(self.replication_key))
+            if updated_at is not None and updated_at < self._replication_floor:
+                return None
+        if self._record_coercer is not None:
+            return self._record_coercer(row)
+        return row
+
+    @cached_property
+    def _record_coercer(self) -> RecordCoercer | None:
+        """Return the record coercer of this stream, compiled once per class.
+
+        Returns:
+            The coercer, or None to use the SDK's type conformance.
+        """
+        if not self.config.get("fast_coercion"):
+            return None
+        stream_type = type(self)
+        if "_record_coercers" not in stream_type.__dict__:
+            stream_type._record_coercers = {}
+        schema = self.schema
+        if self._selected_properties is not None:
+            properties = schema["properties"]
+            schema = {
+                **schema,
+                "properties": {
+                    name: properties[name]
+                    for name in (*self._selected_properties, "_sdc_deleted_at")
+                    if name in properties
+                },
+            }
+        # Instances of one class may differ, e.g. with change detection enabled
+        # or other properties selected.
+        key = json.dumps(schema, sort_keys=True)
+        if key not in stream_type._record_coercers:
+            stream_type._record_coercers[key] = RecordCoercer(schema)
+        return stream_type._record_coercers[key]
+
+    @cached_property
+    def _selected_properties(self) -> tuple[str, ...] | None:
+        """Return the properties records are projected on, compiled from the mask.
+
+        Properties the tap itself reads, such as keys and foreign keys, are kept
+        even when deselected. The records of dimension streams are kept whole for
+        the streams built from or denormalized against them.
+
+        Returns:
+            The names of the kept properties, or None to keep every property.
+        """
+        properties = self.schema["properties"]
+        mask = self.mask
+        selected = [name for name in properties if mask.get(("properties", name), True)]
+        if len(selected) == len(properties) or (
+            self.name in self._tap.indexed_stream_names  # noqa: SLF001
+        ):
+            return None
+        required = {
+            *(self.primary_keys or ()),
+            *(self.hierarchy_keys or ()),
+            *(foreign_key for _, foreign_key in self.dimensions.values()),
+        }
+        if self.replication_key:
+            required.add(self.replication_key)
+        return tuple(
+            name for name in properties if name in required or name in selected
+        )
+
+    def get_batches(
+        self,
+        batch_config: BatchConfig,
+        context: dict | None = None,
+    ) -> Iterable[tuple[BaseBatchFileEncoding, list[str]]]:
+        """Write the stream's records to batch files.
+
+        The SDK writes a BATCH message, then the state, after each file.
+
+        Args:
+            batch_config: The batch configuration.
+            context: The stream context.
+
+        Yields:
+            The encoding and manifest of each batch.
+        """
+        batcher = FileBatcher(self.tap_name, self.name, batch_config, self.schema)
+        self._batching = True
+        try:
+            records = self._sync_records(context, write_messages=False)
+            for manifest in batcher.get_batches(records):
+                yield batch_config.encoding, manifest
+        finally:
+            self._batching = False
+
+    def _increment_stream_state(
+        self,
+        latest_record: dict[str, Any],
+        *,
+        context: dict | None = None,
+    ) -> None:
+        """Advance the bookmark, ignoring records without a replication value.
+
+        Args:
+            latest_record: The record just emitted.
+            context: The stream context.
+        """
+        if self.replication_key and latest_record.get(self.replication_key) is None:
+            self.get_context_state(context)
+            return
+        super()._increment_stream_state(latest_record, context=context)
+
+    def prepare_request(
+        self,
+        context: dict | None,
+        next_page_token: Any | None,  # noqa: ANN401
+    ) -> requests.PreparedRequest:
+        """Prepare a request, made conditional when change detection is enabled.
+
+        Args:
+            context: The stream context.
+            next_page_token: The next page index or value.
+
+        Returns:
+            The prepared request.
+        """
+        prepared_request = super().prepare_request(context, next_page_token)
+        if (
+            self._change_tracker is not None
+            and self.single_response
+            and next_page_token is None
+        ):
+            prepared_request.headers.update(self._change_tracker.conditional_headers)
+        return prepared_request
+
+    def build_prepared_request(
+        self,
+        *args: Any,  # noqa: ANN401
+        **kwargs: Any,  # noqa: ANN401
+    ) -> requests.PreparedRequest:
+        """Build a request authenticated for this stream's scope.
+
+        The session is shared by streams of several scopes, so the authenticator
+        is attached to the request rather than to the session. Requests are not
+        authenticated in replay-only mode, which never sends them, so offline
+        replays need neither credentials nor the token endpoint.
+
+        Args:
+            args: Positional arguments for ``requests.Request``.
+            kwargs: Keyword arguments for ``requests.Request``.
+
+        Returns:
+            The prepared request.
+        """
+        cache = self._tap.response_cache  # noqa: SLF001
+        auth = None if cache is not None and cache.replay_only else self.authenticator
+        request = requests.Request(*args, auth=auth, **kwargs)
+        return self.requests_session.prepare_request(request)
+
+    @cached_property
+    def _streamed_records_keys(self) -> tuple[str, ...] | None:
+        """Return the object keys to follow when streaming, or None to buffer."""
+        if not self.config.get("stream_responses"):
+            return None
+        return jsonpath_to_keys(self.records_jsonpath)
+
+    def _request(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+    ) -> requests.Response:
+        """Send the request through the tap's scheduler.
+
+        In streaming mode, the body is left on the socket to be parsed as it
+        arrives.
+
+        Args:
+            prepared_request: The prepared request to send.
+            context: The stream context.
+
+        Returns:
+            The HTTP ``requests.Response`` object.
+        """
+        self._before_send(prepared_request)
+        cached = self._load_cached_response(prepared_request)
+        if cached is not None:
+            return cached
+        queued_at = time.perf_counter()
+        with self._tap.request_scheduler.slot(prepared_request.url):  # noqa: SLF001
+            self._telemetry.add(
+                TelemetryMetric.THROTTLE_DURATION,
+                time.perf_counter() - queued_at,
+            )
+            try:
+                response = self.requests_session.send(
+                    prepared_request,
+                    timeout=self.timeout,
+                    stream=self._streamed_records_keys is not None,
+                )
+            except requests.exceptions.RequestException as ex:
+                self._on_send_error(ex)
+                raise
+        self._after_send(prepared_request, response, context)
+        self._store_response(prepared_request, response)
+        return response
+
+    async def _request_async(
+        self,
+        client: Any,  # noqa: ANN401
+        prepared_request: requests.PreparedRequest,
+        context: dict | None,
+    ) -> requests.Response:
+        """Send the request with an asynchronous client, retrying like `_request`.
+
+        Args:
+            client: The ``httpx.AsyncClient`` of the asyncio engine.
+            prepared_request: The prepared request to send.
+            context: The stream context.
+
+        Returns:
+            The HTTP ``requests.Response`` object.
+        """
+        scheduler = self._tap.request_scheduler  # noqa: SLF001
+        wait = self.backoff_wait_generator()
+        wait.send(None)
+        max_tries = self.backoff_max_tries()
+        started = time.monotonic()
+        tries = 0
+        while True:
+            tries += 1
+            try:
+                self._before_send(prepared_request)
+                cached = self._load_cached_response(prepared_request)
+                if cached is not None:
+                    return cached
+                queued_at = time.perf_counter()
+                async with scheduler.async_slot(prepared_request.url):
+                    self._telemetry.add(
+                        TelemetryMetric.THROTTLE_DURATION,
+                        time.perf_counter() - queued_at,
+                    )
+                    try:
+                        response = await send_async(
+                            client,
+                            prepared_request,
+                            timeout=self.timeout,
+                        )
+                    except requests.exceptions.RequestException as ex:
+                        self._on_send_error(ex)
+                        raise
+                self._after_send(prepared_request, response, context)
+                self._store_response(prepared_request, response)
+            except (
+                ConnectionResetError,
+                RetriableAPIError,
+                requests.exceptions.ReadTimeout,
+                requests.exceptions.ConnectionError,
+            ) as ex:
+                if tries >= max_tries:
+                    raise
+                seconds = self.backoff_jitter(wait.send(ex))
+                self.backoff_handler(
+                    {
+                        "target": self._request_async,
+                        "args": (prepared_request, context),
+                        "kwargs": {},
+                        "tries": tries,
+                        "elapsed": time.monotonic() - started,
+                        "wait": seconds,
+                        "exception": ex,
+                    },
+                )
+                await asyncio.sleep(seconds)
+            else:
+                return response
+
+    @cached_property
+    def _telemetry(self) -> StreamTelemetry:
+        """Return the telemetry counters of this stream.
+
+        Returns:
+            The counters, shared by every instance of the stream.
+        """
+        return self._tap.telemetry.stream(self.name)  # noqa: SLF001
+
+    def _load_cached_response(
+        self,
+        prepared_request: requests.PreparedRequest,
+    ) -> requests.Response | None:
+        """Return the cached response of a request, if the tap has a cache.
+
+        Args:
+            prepared_request: The prepared request about to be sent.
+
+        Returns:
+            The cached response, or None to send the request.
+
+        Raises:
+            FatalAPIError: If the cache is replay-only and has no response.
+        """
+        cache = self._tap.response_cache  # noqa: SLF001
+        if cache is None:
+            return None
+        response = cache.load(prepared_request, self.scope)
+        if response is None and cache.replay_only:
+            msg = f"No cached response for {prepared_request.url} in replay-only mode"
+            raise FatalAPIError(msg)
+        return response
+
+    def _store_response(
+        self,
+        prepared_request: requests.PreparedRequest,
+        response: requests.Response,
+    ) -> None:
+        """Cache a validated response, if the tap has a cache.
+
+        Args:
+            prepared_request: The request that was sent.
+            response: The HTTP ``requests.Response`` object.
+        """
+        cache = self._tap.response_cache  # noqa: SLF001
+        if cache is not None:
+            cache.store(prepared_request, self.scope, response)
+
+    def _before_send(self, prepared_request: requests.PreparedRequest) -> None:
+        """Adjust a request right before each attempt to send it.
+
+        Args:
+            prepared_request: The prepared request about to be sent.
+        """
+
+    def _on_send_error(self, exception: requests.exceptions.RequestException) -> None:
+        """React to a request that could not be sent or timed out.
+
+        Args:
+            exception: The network error.
+        """
+
+    def _after_send(
+        self,
+        prepared_request: requests.PreparedRequest,
+        response: requests.Response,
+        context: dict | None,
+    ) -> None:
+        """Record and validate a response.
+
+        Args:
+            prepared_request: The request that was sent.
+            response: The HTTP ``requests.Response`` object.
+            context: The stream context.
+        """
+        self._tap.request_scheduler.observe(  # noqa: SLF001
+            prepared_request.url,
+            response,
+        )
+        latency = response.elapsed.total_seconds()
+        self._telemetry.observe_request(latency)
+        if self._streamed_records_keys is None:
+            # Streamed bodies are counted as `parse_response` reads them.
+            self._telemetry.add(
+                TelemetryMetric.HTTP_RESPONSE_BYTES,
+                len(response.content),
+            )
+        self._tap.telemetry.trace_request(  # noqa: SLF001
+            self.name,
+            prepared_request.method,
+            prepared_request.url,
+            response.status_code,
+            latency,
+        )
+        self._write_request_duration_log(
+            endpoint=self.path,
+            response=response,
+            context=context,
+            extra_tags={"url": prepared_request.path_url}
+            if self._LOG_REQUEST_METRIC_URLS
+            else None,
+        )
+        self.validate_response(response)
+        logging.debug("Response received successfully.")
+
+    def backoff_handler(self, details: dict) -> None:
+        """Log a retry and count the time spent waiting for it.
+
+        Args:
+            details: The backoff details of the retried request.
+        """
+        self._telemetry.add(TelemetryMetric.BACKOFF_DURATION, details["wait"])
+        super().backoff_handler(details)
+
+    def backoff_wait_generator(self) -> Generator[float, Any, None]:
+        """Wait exponentially between retries, unless the server said how long.
+
+        When a response carries ``Retry-After`` or an exhausted rate-limit quota,
+        the scheduler already holds back every request to that host for as long
+        as asked, so the retry itself does not wait any further.
+
+        Yields:
+            The number of seconds to wait before the next try.
+        """
+        fallback = super().backoff_wait_generator()
+        next(fallback)
+        exception = yield  # type: ignore[misc]
+        while True:
+            wait = next(fallback)
+            response = getattr(exception, "response", None)
+            if response is not None and rate_limit_delay(response) is not None:
+                wait = 0
+            exception = yield wait
+
+    @staticmethod
+    def _context_key(context: dict | None) -> str:
+        return json.dumps(context, sort_keys=True, default=str)
+
+    def _create_prefetchers(
+        self,
+        fetch_records: Callable[[dict | None], Any],
+    ) -> list[RecordPrefetcher]:
+        """Create a prefetcher for each partition of this stream.
+
+        Args:
+            fetch_records: Callable returning the records of a partition.
+
+        Returns:
+            The prefetchers, which still have to be run.
+        """
+        if self.records_from is not None:
+            # The records are read from the index of the stream they come from.
+            return []
+        prefetchers = []
+        for context in self.partitions or [None]:
+            # Create the state entry and the starting bookmark up front so the
+            # worker only ever reads state.
+            self._write_starting_replication_value(context)
+            if context is None:
+                self._start_change_tracking(None)
+            prefetcher = RecordPrefetcher(
+                lambda context=context: fetch_records(context),
+            )
+            self._prefetchers[self._context_key(context)] = prefetcher
+            prefetchers.append(prefetcher)
+        return prefetchers
+
+    def start_prefetch(self, executor: Executor) -> list[RecordPrefetcher]:
+        """Start fetching this stream's records in the background.
+
+        Each partition is fetched on its own. The next call to ``request_records``
+        for a partition reads from its prefetched records instead of issuing the
+        requests itself.
+
+        Args:
+            executor: The executor running the fetches.
+
+        Returns:
+            The prefetchers, which can be cancelled if the sync is aborted.
+        """
+        prefetchers = self._create_prefetchers(super().request_records)
+        profiler = self._tap.profiler  # noqa: SLF001
+        for prefetcher in prefetchers:
+            if profiler is None:
+                executor.submit(prefetcher.run)
+            else:
+                executor.submit(profiler.run_for_stream, self.name, prefetcher.run)
+        return prefetchers
+
+    def start_async_prefetch(self, engine: AsyncEngine) -> list[RecordPrefetcher]:
+        """Start fetching this stream's records on the asyncio engine.
+
+        Args:
+            engine: The engine running the event loop.
+
+        Returns:
+            The prefetchers, which can be cancelled if the sync is aborted.
+        """
+        prefetchers = self._create_prefetchers(
+            lambda context: self.request_records_async(engine.client, context),
+        )
+        for prefetcher in prefetchers:
+            engine.submit(prefetcher.run_async())
+        return prefetchers
+
+    async def request_records_async(
+        self,
+        client: Any,  # noqa: ANN401
+        context: dict | None,
+    ) -> AsyncIterator[dict]:
+        """Request records page by page with an asynchronous client.
+
+        This mirrors ``RESTStream.request_records``, sharing its request
+        preparation, pagination and response parsing. Preparing a request may
+        refresh the access token and parsing decodes a whole page, both
+        blocking, so they run on the loop's default executor to keep the other
+        streams' requests flowing.
+
+        Args:
+            client: The ``httpx.AsyncClient`` of the asyncio engine.
+            context: The stream context.
+
+        Yields:
+            Each record from the source.
+        """
+        loop = asyncio.get_running_loop()
+        paginator = self.get_new_paginator()
+
+        def parse_page(response: requests.Response) -> list[dict]:
+            records = list(self.parse_response(response))
+            paginator.advance(response)
+            return records
+
+        with metrics.http_request_counter(self.name, self.path) as request_counter:
+            request_counter.context = context
+            while not paginator.finished:
+                prepared_request = await loop.run_in_executor(
+                    None,
+                    partial(
+                        self.prepare_request,
+                        context,
+                        next_page_token=paginator.current_value,
+                    ),
+                )
+                response = await self._request_async(
+                    client,
+                    prepared_request,
+                    context,
+                )
+                request_counter.increment()
+                self.update_sync_costs(prepared_request, response, context)
+                for record in await loop.run_in_executor(None, parse_page, response):
+                    yield record
+
+    def request_records(self, context: dict | None) -> Iterable[dict]:
+        """Request records from the API, or drain them from a running prefetch.
+
+        Records used by other streams, like the parent links of a hierarchical
+        stream, are indexed as they go by. The indexes are only kept when the
+        whole source was fetched. The records of a stream built from another
+        stream's records are read from its index.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            Each record from the source.
+        """
+        if self.records_from is not None:
+            tap = self._tap  # noqa: SLF001
+            yield from tap.get_record_index(self.records_from, "lookup").records()
+            return
+
+        prefetcher = self._prefetchers.pop(self._context_key(context), None)
+        records = super().request_records(context) if prefetcher is None else prefetcher
+        indexes = self._new_record_indexes() if context is None else {}
+        if not indexes:
+            yield from records
+            return
+
+        # Checkpoints written while the records go by do not make this fetch
+        # partial, only one resuming from a previous run.
+        partial = self._is_partial_sync(context)
+        for record in records:
+            if not isinstance(record, PageEnd):
+                for index in indexes.values():
+                    index.add_record(record)
+            yield record
+        tracker = self._change_tracker
+        if not partial and not (
+            tracker is not None and (tracker.unchanged or tracker.partial)
+        ):
+            for kind, index in indexes.items():
+                self._tap.record_indexes[self.name, kind] = index  # noqa: SLF001
+
+    def _new_record_indexes(self) -> dict[str, Hierarchy | LookupIndex]:
+        """Return empty indexes of this stream's records, for derived streams.
+
+        Returns:
+            The ``hierarchy`` of the parent links of a hierarchical stream and
+            the ``lookup`` of a dimension stream, when they are used.
+        """
+        indexes: dict[str, Hierarchy | LookupIndex] = {}
+        if self.hierarchy_keys and self.config.get("hierarchy_streams"):
+            indexes["hierarchy"] = Hierarchy(self.hierarchy_keys)
+        if self.name in self._tap.indexed_stream_names:  # noqa: SLF001
+            indexes["lookup"] = LookupIndex(
+                self.primary_keys[0],
+                list(type(self).schema["properties"]),
+            )
+        return indexes
+
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         """Parse the response and return an iterator of result records.
 
+        In streaming mode, records are decoded one at a time as the body arrives
+        and the remainder of the document is left on the response for the
+        paginator. Records are projected on the selected properties as soon as
+        they are decoded, so deselected ones are never coerced or written.
+
         Args:
             response: The HTTP ``requests.Response`` object.
 
         Yields:
             Each record from the source.
         """
-        yield from extract_jsonpath(self.records_jsonpath, input=response.json())
+        # Partitions may be fetched concurrently, so only single-response streams,
+        # which have none, look at the response as a whole.
+        tracker = self._change_tracker if self.single_response else None
+        if tracker is not None:
+            if response.status_code == HTTPStatus.NOT_MODIFIED:
+                tracker.unchanged = True
+                return
+            tracker.observe_response(response.headers)
+            if self._streamed_records_keys is None and tracker.observe_body(
+                response.content,
+            ):
+                tracker.unchanged = True
+                return
+
+        telemetry = self._telemetry
+        telemetry.add(TelemetryMetric.PAGE_COUNT, 1)
+        records = 0
+        fields = self._selected_properties
+        if self._streamed_records_keys is None:
+            started = time.perf_counter()
+            body = parse_response_body(response)
+            telemetry.add(
+                TelemetryMetric.DECODE_DURATION,
+                time.perf_counter() - started,
+            )
+            try:
+                for record in extract_jsonpath(self.records_jsonpath, input=body):
+                    records += 1
+                    yield record if fields is None else project(record, fields)
+            finally:
+                telemetry.add(TelemetryMetric.RECORDS_PARSED, records)
+            return
+
+        # Decoding is timed as the reader works, less the time spent waiting on
+        # the socket, which is counted with the bytes received.
+        received = [0, 0.0]
+
+        def chunks() -> Iterator[bytes]:
+            body = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            while True:
+                started = time.perf_counter()
+                chunk = next(body, None)
+                received[1] += time.perf_counter() - started
+                if chunk is None:
+                    return
+                received[0] += len(chunk)
+                yield chunk
+
+        reader = IncrementalJSONReader(
+            chunks(),
+            self._streamed_records_keys,
+            fields=fields,
+        )
+        reading = 0.0
+        try:
+            started = time.perf_counter()
+            for record in reader:
+                reading += time.perf_counter() - started
+                records += 1
+                yield record
+                started = time.perf_counter()
+            reading += time.perf_counter() - started
+        finally:
+            response.close()
+            telemetry.add(TelemetryMetric.RECORDS_PARSED, records)
+            telemetry.add(TelemetryMetric.HTTP_RESPONSE_BYTES, received[0])
+            telemetry.add(
+                TelemetryMetric.DECODE_DURATION,
+                max(reading - received[1], 0.0),
+            )
+        setattr(response, _PARSED_BODY_ATTR, reader.skeleton)
 
 class gapiPaginator(JSONPathPaginator):
     """gapi paginator class."""
 
+    def has_more(self, response: requests.Response) -> bool:
+        """Stop on a ``304 Not Modified`` response, which has no body."""
+        return response.status_code != HTTPStatus.NOT_MODIFIED
+
     def get_next(self, response: requests.Response) -> Any | None:
         """Return a token for identifying the next page of results."""
-        last_evaluated_key = extract_jsonpath(self._jsonpath, response.json())
+        last_evaluated_key = extract_jsonpath(
+            self._jsonpath,
+            parse_response_body(response),
+        )
         return next(last_evaluated_key, None)
 
 class paginatedGapiStream(gapiStream):
-    """gapi paginated stream class."""
+    """gapi paginated stream class.
+
+    With ``checkpoint_every_pages`` set, the token of the next page is saved in
+    the stream state every N pages, along with the keys of the last page written.
+    An interrupted sync then resumes from that token, skipping the records of
+    the checkpointed page if they show up again.
+    """
 
     def get_new_paginator(self):
         return gapiPaginator(jsonpath=self.last_evaluated_key_jsonpath)
@@ -103,11 +1321,84 @@ class paginatedGapiStream(gapiStream):
 
     last_evaluated_key_jsonpath = "$.result.lastEvaluatedKey"
     records_jsonpath = "$.result.items[*]"
+    single_response = False
+
+    #: Query parameter holding the number of records per page.
+    page_size_param = "limit"
+
+    _pages_written = 0
+    _page_keys: list[str]
+    _resume_boundary_keys: frozenset[str] = frozenset()
+
+    @cached_property
+    def _page_size(self) -> AdaptivePageSize | None:
+        """Return the page size controller, or None to use the server default."""
+        page_size = self.config.get("page_size")
+        if not page_size:
+            return None
+        return AdaptivePageSize(
+            page_size,
+            minimum=self.config.get("min_page_size") or DEFAULT_MIN_PAGE_SIZE,
+            maximum=self.config.get("max_page_size") or DEFAULT_MAX_PAGE_SIZE,
+            latency_target=(
+                self.config.get("page_latency_target") or DEFAULT_PAGE_LATENCY_TARGET
+            ),
+            adaptive=bool(self.config.get("adaptive_page_size")),
+        )
+
+    @property
+    def partitions(self) -> list[dict] | None:
+        """Return one partition per combination of the configured filter values.
+
+        Returns:
+            The partitions of this stream, or None if it is not partitioned.
+        """
+        filters = (self.config.get("partition_filters") or {}).get(self.name)
+        if not filters:
+            return super().partitions
+        return [
+            dict(zip(filters, values))
+            for values in itertools.product(*filters.values())
+        ]
+
+    @property
+    def checkpoint_every_pages(self) -> int:
+        """Return how many pages are written between two checkpoints.
+
+        Returns:
+            The checkpoint interval, or 0 if checkpoints are disabled.
+        """
+        return self.config.get("checkpoint_every_pages") or 0
+
+    def _get_resume_token(self, context: dict | None) -> Any | None:  # noqa: ANN401
+        """Return the token checkpointed by an interrupted sync.
+
+        Args:
+            context: The stream context.
 
+        Returns:
+            The token of the page to resume from, or None to start over.
+        """
+        if not self.checkpoint_every_pages:
+            return None
+        return self.get_context_state(context).get("resume_token")
+
+    def _is_partial_sync(self, context: dict | None) -> bool:
+        """Tell whether this sync only fetches part of the source.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            True if records missing from this sync are not necessarily deleted.
+        """
+        return super()._is_partial_sync(context) or bool(
+            self._get_resume_token(context),
+        )
 
     def get_url_params(
         self,
-        context: dict | None,  # noqa: ARG002
+        context: dict | None,
         next_page_token: Any | None,  # noqa: ANN401
     ) -> dict[str, Any]:
         """Return a dictionary of values to be used in URL parameterization.
@@ -119,8 +1410,174 @@ class paginatedGapiStream(gapiStream):
         Returns:
             A dictionary of URL query parameters.
         """
-        params: dict = {"activeStatus": "ALL"}
+        params: dict = super().get_url_params(context, next_page_token)
+        params["activeStatus"] = "ALL"
+        if context:
+            params.update(context)
+        if next_page_token is None:
+            next_page_token = self._get_resume_token(context)
         if next_page_token:
             next_token = urllib.parse.quote(json.dumps(next_page_token))
             params["nextToken"] = next_token
-        return params
\ No newline at end of file
+        return params
+
+    def _before_send(self, prepared_request: requests.PreparedRequest) -> None:
+        """Ask for the current page size.
+
+        The page size is set here rather than in ``get_url_params`` so retries
+        after a shrink ask for the smaller page.
+
+        Args:
+            prepared_request: The prepared request about to be sent.
+        """
+        if self._page_size is not None:
+            prepared_request.url = set_query_param(
+                prepared_request.url,
+                self.page_size_param,
+                self._page_size.page_size,
+            )
+
+    def _on_send_error(self, exception: requests.exceptions.RequestException) -> None:
+        """Shrink the page size when the server did not answer in time.
+
+        Args:
+            exception: The network error.
+        """
+        if self._page_size is not None and isinstance(
+            exception,
+            requests.exceptions.ReadTimeout,
+        ):
+            self._page_size.shrink()
+
+    def _after_send(
+        self,
+        prepared_request: requests.PreparedRequest,
+        response: requests.Response,
+        context: dict | None,
+    ) -> None:
+        """Validate a response, then adapt the page size to its latency.
+
+        Args:
+            prepared_request: The request that was sent.
+            response: The HTTP ``requests.Response`` object.
+            context: The stream context.
+        """
+        super()._after_send(prepared_request, response, context)
+        if self._page_size is not None:
+            self._page_size.record_latency(response.elapsed.total_seconds())
+
+    def validate_response(self, response: requests.Response) -> None:
+        """Validate the response, shrinking the page size on server overload.
+
+        Args:
+            response: The HTTP ``requests.Response`` object.
+
+        Raises:
+            RetriableAPIError: If the page was too large and can be made smaller.
+        """
+        page_size = self._page_size
+        if page_size is not None and (
+            response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+            or response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+        ):
+            if (
+                page_size.shrink()
+                and response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+            ):
+                msg = self.response_error_message(response)
+                raise RetriableAPIError(msg, response)
+        super().validate_response(response)
+
+    def get_records(self, context: dict | None) -> Iterable[dict[str, Any]]:
+        """Return the records, resuming from the last checkpoint if there is one.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            Each record that was not filtered out.
+        """
+        state = self.get_context_state(context)
+        self._resume_boundary_keys = (
+            frozenset(state.get("resume_boundary_keys") or ())
+            if self._get_resume_token(context)
+            else frozenset()
+        )
+        self._pages_written = 0
+        self._page_keys = []
+        yield from super().get_records(context)
+
+        # The sync went through: the next one starts from the first page.
+        if state.pop("resume_token", None) is not None:
+            self._is_state_flushed = False
+        state.pop("resume_boundary_keys", None)
+
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Parse the response, marking the end of the page when checkpointing.
+
+        Args:
+            response: The HTTP ``requests.Response`` object.
+
+        Yields:
+            Each record from the source, then a `PageEnd` marker.
+        """
+        yield from super().parse_response(response)
+        if (
+            self.checkpoint_every_pages
+            and response.status_code != HTTPStatus.NOT_MODIFIED
+        ):
+            next_token = extract_jsonpath(
+                self.last_evaluated_key_jsonpath,
+                parse_response_body(response),
+            )
+            yield PageEnd(next(next_token, None))
+
+    def post_process(
+        self,
+        row: dict,
+        context: dict | None = None,
+    ) -> dict | None:
+        """Track page boundaries and drop records already written before a restart.
+
+        Args:
+            row: Individual record in the stream, or a `PageEnd` marker.
+            context: The stream context.
+
+        Returns:
+            The record, or None if it should not be written.
+        """
+        if isinstance(row, PageEnd):
+            self._end_page(row, context)
+            return None
+        if self.checkpoint_every_pages:
+            key = record_key(row, self.primary_keys or [])
+            if key in self._resume_boundary_keys:
+                return None
+            self._page_keys.append(key)
+        return super().post_process(row, context)
+
+    def _end_page(self, page_end: PageEnd, context: dict | None) -> None:
+        """Checkpoint the next page token once every N pages have been written.
+
+        Args:
+            page_end: The marker of the page just written.
+            context: The stream context.
+        """
+        # Only the first page after a restart may repeat checkpointed records.
+        self._resume_boundary_keys = frozenset()
+        self._pages_written += 1
+        page_keys, self._page_keys = self._page_keys, []
+        if (
+            not page_end.next_token
+            or self._pages_written % self.checkpoint_every_pages
+        ):
+            return
+
+        state = self.get_context_state(context)
+        state["resume_token"] = page_end.next_token
+        state["resume_boundary_keys"] = page_keys
+        self._is_state_flushed = False
+        if not self._batching:
+            # Batched records are only written once their file is complete, and
+            # the SDK writes the state right after.
+            self._write_state_message()
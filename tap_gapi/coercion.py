@@ -0,0 +1,178 @@
+"""Schema-driven record coercion compiled once per stream schema."""
+
+from __future__ import annotations
+
+import datetime
+from typing import Any, Callable
+
+_Converter = Callable[[Any], Any]
+
+_TRUE_STRINGS = frozenset({"true", "t", "yes", "y", "1"})
+_FALSE_STRINGS = frozenset({"false", "f", "no", "n", "0", ""})
+
+
+def _types(property_schema: dict) -> set[str]:
+    types = property_schema.get("type", [])
+    if isinstance(types, str):
+        types = [types]
+    for option in property_schema.get("anyOf", []):
+        types = [*types, *_types(option)]
+    return set(types) - {"null"}
+
+
+def to_boolean(value: Any) -> Any:  # noqa: ANN401
+    """Coerce a boolean, accepting numbers and common string spellings.
+
+    Args:
+        value: The raw value.
+
+    Returns:
+        The boolean, or the value unchanged if it cannot be read as one.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_STRINGS:
+            return True
+        if lowered in _FALSE_STRINGS:
+            return False
+    return value
+
+
+def to_integer(value: Any) -> Any:  # noqa: ANN401
+    """Coerce an integer, accepting integral floats and numeric strings.
+
+    Args:
+        value: The raw value.
+
+    Returns:
+        The integer, or the value unchanged if it cannot be read as one.
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    return value
+
+
+def to_number(value: Any) -> Any:  # noqa: ANN401
+    """Coerce a number, accepting numeric strings.
+
+    Args:
+        value: The raw value.
+
+    Returns:
+        The number, or the value unchanged if it cannot be read as one.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def to_date_time(value: Any) -> Any:  # noqa: ANN401
+    """Serialize date and datetime objects, leaving timestamps as sent.
+
+    Args:
+        value: The raw value.
+
+    Returns:
+        An ISO 8601 string for date objects, otherwise the value unchanged.
+    """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.isoformat()
+    if isinstance(value, datetime.date):
+        return f"{value.isoformat()}T00:00:00+00:00"
+    return value
+
+
+def _compile_property(property_schema: dict) -> _Converter | None:
+    """Return the converter of one property, or None if values pass through.
+
+    Args:
+        property_schema: The JSON schema of the property.
+
+    Returns:
+        A callable converting non-null values.
+    """
+    types = _types(property_schema)
+    if "object" in types and "properties" in property_schema:
+        return RecordCoercer(property_schema)
+    if "array" in types and isinstance(property_schema.get("items"), dict):
+        convert_item = _compile_property(property_schema["items"])
+        if convert_item is None:
+            return None
+        return lambda items: (
+            [None if item is None else convert_item(item) for item in items]
+            if isinstance(items, list)
+            else items
+        )
+    if "boolean" in types:
+        return to_boolean
+    if "integer" in types:
+        return to_integer
+    if "number" in types:
+        return to_number
+    if "string" in types and property_schema.get("format") == "date-time":
+        return to_date_time
+    return None
+
+
+class RecordCoercer:
+    """Coerce records to a stream schema with converters resolved up front.
+
+    Unlike the SDK's generic conformance, the schema is only walked once: each
+    record is rebuilt from the list of schema properties, so unknown keys are
+    dropped and missing ones are set to None, and only properties whose type
+    needs it go through a converter.
+    """
+
+    def __init__(self, schema: dict) -> None:
+        """Compile the coercer of a schema.
+
+        Args:
+            schema: The JSON schema of the records.
+        """
+        properties: dict = schema.get("properties", {})
+        self.property_names = tuple(properties)
+        self._converters = tuple(
+            (name, converter)
+            for name, converter in (
+                (name, _compile_property(property_schema))
+                for name, property_schema in properties.items()
+            )
+            if converter is not None
+        )
+
+    def __call__(self, record: dict) -> dict:
+        """Coerce one record.
+
+        Args:
+            record: The raw record.
+
+        Returns:
+            A new record holding exactly the schema properties.
+        """
+        if not isinstance(record, dict):
+            return record
+        get = record.get
+        coerced = {name: get(name) for name in self.property_names}
+        for name, convert in self._converters:
+            value = coerced[name]
+            if value is not None:
+                coerced[name] = convert(value)
+        return coerced
@@ -0,0 +1,79 @@
+"""Asyncio engine fetching the records of every stream from one event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Coroutine
+
+# Seconds to wait for the client to close when the engine shuts down.
+_CLOSE_TIMEOUT = 10
+
+
+class AsyncEngine:
+    """Run the requests of every prefetched stream on a single event loop.
+
+    The loop runs on one background thread, so any number of streams and
+    partitions can have requests in flight without a thread each. Records are
+    handed over to the main thread through the stream prefetchers, which keeps
+    the Singer output in stream order.
+    """
+
+    def __init__(self, client: Any, name: str = "gapi-engine") -> None:  # noqa: ANN401
+        """Create a new engine.
+
+        Args:
+            client: The asynchronous HTTP client shared by every request.
+            name: Name of the event loop thread.
+        """
+        self.client = client
+        self._name = name
+        self._loop = asyncio.new_event_loop()
+        self._thread: threading.Thread | None = None
+        self._futures: list[concurrent.futures.Future] = []
+
+    def __enter__(self) -> AsyncEngine:
+        """Start the event loop.
+
+        Returns:
+            The running engine.
+        """
+        self._thread = threading.Thread(
+            target=self._loop.run_forever,
+            name=self._name,
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def submit(self, coroutine: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the event loop.
+
+        Args:
+            coroutine: The coroutine to run.
+
+        Returns:
+            A future resolving to the result of the coroutine.
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        self._futures.append(future)
+        return future
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Cancel pending work, close the client and stop the event loop.
+
+        Args:
+            exc_info: The exception raised in the ``with`` block, if any.
+        """
+        for future in self._futures:
+            future.cancel()
+        close = getattr(self.client, "aclose", None)
+        if close is not None:
+            asyncio.run_coroutine_threadsafe(close(), self._loop).result(
+                _CLOSE_TIMEOUT,
+            )
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+        self._loop.close()
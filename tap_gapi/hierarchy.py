@@ -0,0 +1,297 @@
+"""Closure-table and ancestor-path streams derived from hierarchical streams."""
+
+from __future__ import annotations
+
+import typing as t
+from array import array
+
+from singer_sdk import Stream
+from singer_sdk import typing as th  # JSON Schema typing helpers
+
+if t.TYPE_CHECKING:
+    from singer_sdk import Tap
+
+    from tap_gapi.client import gapiStream
+    from tap_gapi.prefetch import RecordPrefetcher
+
+# Parent links of the nodes at the top of a chain of ancestors.
+ROOT = -1
+ORPHAN = -2
+CYCLE = -3
+
+_ORPHAN_FLAG = 1
+_CYCLE_FLAG = 2
+
+
+class Hierarchy:
+    """The parent links of a tree's nodes, resolved in one linear pass.
+
+    Nodes are numbered in the order they are added, and their parents, depths
+    and roots are kept in integer arrays, so a tree of hundreds of thousands of
+    nodes takes a few megabytes. Closure rows and ancestor paths are generated
+    from the arrays instead of being stored.
+
+    A node whose parent is missing is an orphan, and the root of its chain. A
+    cycle of parent links is broken at the last node found on it, which
+    becomes a root. Every node of the cycle is flagged.
+    """
+
+    def __init__(self, keys: tuple[str, str] = ("id", "parentId")) -> None:
+        """Create an empty hierarchy.
+
+        Args:
+            keys: The keys of a record's id and of its parent's id.
+        """
+        self.keys = keys
+        self.ids: list[str] = []
+        self.parent_ids: list[str | None] = []
+        self._positions: dict[str, int] = {}
+        self._parents = array("q")
+        self._depths = array("q")
+        self._roots = array("q")
+        self._flags = bytearray()
+
+    def __len__(self) -> int:
+        """Return the number of nodes.
+
+        Returns:
+            The number of nodes.
+        """
+        return len(self.ids)
+
+    def add(self, node_id: t.Any, parent_id: t.Any) -> None:  # noqa: ANN401
+        """Add a node, or replace the parent of a node added before.
+
+        Args:
+            node_id: The node's id. Nodes without an id are ignored.
+            parent_id: The id of the node's parent, empty for a root.
+        """
+        if node_id is None:
+            return
+        node_id = str(node_id)
+        parent_id = None if parent_id in (None, "") else str(parent_id)
+        position = self._positions.get(node_id)
+        if position is None:
+            self._positions[node_id] = len(self.ids)
+            self.ids.append(node_id)
+            self.parent_ids.append(parent_id)
+        else:
+            self.parent_ids[position] = parent_id
+        # Added nodes invalidate the resolved links.
+        del self._parents[:]
+
+    def add_record(self, record: dict) -> None:
+        """Add the node of a record.
+
+        Args:
+            record: The raw record.
+        """
+        id_key, parent_key = self.keys
+        self.add(record.get(id_key), record.get(parent_key))
+
+    def _resolve(self) -> None:
+        if len(self._parents) == len(self.ids):
+            return
+        positions = self._positions
+        parents = array("q", [ROOT]) * len(self.ids)
+        flags = bytearray(len(self.ids))
+        for node, parent_id in enumerate(self.parent_ids):
+            # A node that is its own parent is a root, as is often recorded.
+            if parent_id is None or parent_id == self.ids[node]:
+                continue
+            parent = positions.get(parent_id)
+            if parent is None:
+                parents[node] = ORPHAN
+                flags[node] = _ORPHAN_FLAG
+            else:
+                parents[node] = parent
+
+        depths = array("q", [-1]) * len(self.ids)
+        roots = array("q", [0]) * len(self.ids)
+        for start in range(len(self.ids)):
+            if depths[start] >= 0:
+                continue
+            # Walk up to a resolved node, the top of the chain, or a cycle.
+            chain: dict[int, None] = {}
+            node = start
+            while node >= 0 and depths[node] < 0 and node not in chain:
+                chain[node] = None
+                node = parents[node]
+            chain_nodes = list(chain)
+            if node >= 0 and node in chain:
+                cycle = chain_nodes[chain_nodes.index(node) :]
+                parents[cycle[-1]] = CYCLE
+                for member in cycle:
+                    flags[member] |= _CYCLE_FLAG
+            for member in reversed(chain_nodes):
+                parent = parents[member]
+                if parent < 0:
+                    depths[member] = 0
+                    roots[member] = member
+                else:
+                    depths[member] = depths[parent] + 1
+                    roots[member] = roots[parent]
+        self._parents, self._depths, self._roots, self._flags = (
+            parents,
+            depths,
+            roots,
+            flags,
+        )
+
+    def _ancestors(self, node: int) -> t.Iterator[int]:
+        while node >= 0:
+            yield node
+            node = self._parents[node]
+
+    def path(self, node_id: str) -> list[str]:
+        """Return the ids from the root of a node's chain down to the node.
+
+        Args:
+            node_id: The node's id.
+
+        Returns:
+            The ids of the node's ancestors, then the node's.
+        """
+        self._resolve()
+        ids = self.ids
+        return [ids[node] for node in self._ancestors(self._positions[node_id])][::-1]
+
+    def closure(self) -> t.Iterator[dict]:
+        """Generate the closure table, one row per ancestor of each node.
+
+        Every node is also its own ancestor, at depth 0.
+
+        Yields:
+            The ancestor's id, the descendant's id and their distance.
+        """
+        self._resolve()
+        ids = self.ids
+        for descendant in range(len(ids)):
+            for depth, ancestor in enumerate(self._ancestors(descendant)):
+                yield {
+                    "ancestorId": ids[ancestor],
+                    "descendantId": ids[descendant],
+                    "depth": depth,
+                }
+
+    def paths(self) -> t.Iterator[dict]:
+        """Generate the ancestor path of every node.
+
+        Yields:
+            The node's position in the tree, and flags for orphans and cycles.
+        """
+        self._resolve()
+        ids = self.ids
+        for node in range(len(ids)):
+            flags = self._flags[node]
+            yield {
+                "id": ids[node],
+                "parentId": self.parent_ids[node],
+                "rootId": ids[self._roots[node]],
+                "depth": self._depths[node],
+                "path": [ids[ancestor] for ancestor in self._ancestors(node)][::-1],
+                "isOrphan": bool(flags & _ORPHAN_FLAG),
+                "inCycle": bool(flags & _CYCLE_FLAG),
+            }
+
+
+class HierarchyStream(Stream):
+    """A stream derived from the parent links of a hierarchical stream.
+
+    The source stream's records are indexed as it syncs. When it was not
+    synced in full during this run, its endpoint is fetched again.
+    """
+
+    #: Suffix appended to the source stream's name.
+    suffix: t.ClassVar[str]
+
+    def __init__(self, tap: Tap, source_type: type[gapiStream]) -> None:
+        """Create the stream derived from a source stream.
+
+        Args:
+            tap: The tap.
+            source_type: The class of the hierarchical stream.
+        """
+        self.source_type = source_type
+        super().__init__(tap, name=f"{source_type.name}_{self.suffix}")
+
+    def get_hierarchy(self) -> Hierarchy:
+        """Return the hierarchy of the source stream, fetching it if needed.
+
+        Returns:
+            The source stream's hierarchy.
+        """
+        return self._tap.get_record_index(  # type: ignore[attr-defined]
+            self.source_type,
+            "hierarchy",
+        )
+
+    def start_prefetch(self, *_: object) -> list[RecordPrefetcher]:
+        """Prefetch nothing: the records are derived on the writer thread.
+
+        Returns:
+            No prefetcher.
+        """
+        return []
+
+    start_async_prefetch = start_prefetch
+
+
+class ClosureStream(HierarchyStream):
+    """Every ancestor of each node of a hierarchical stream, at its distance."""
+
+    suffix = "closure"
+    primary_keys: t.ClassVar[list[str]] = ["ancestorId", "descendantId"]
+    schema = th.PropertiesList(
+        th.Property("ancestorId", th.StringType),
+        th.Property("descendantId", th.StringType),
+        th.Property("depth", th.IntegerType),
+    ).to_dict()
+
+    def get_records(
+        self,
+        context: dict | None,  # noqa: ARG002
+    ) -> t.Iterable[dict]:
+        """Return the closure table of the source stream.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The closure rows.
+        """
+        return self.get_hierarchy().closure()
+
+
+class PathStream(HierarchyStream):
+    """The ancestor path, root and depth of each node of a hierarchical stream."""
+
+    suffix = "paths"
+    primary_keys: t.ClassVar[list[str]] = ["id"]
+    schema = th.PropertiesList(
+        th.Property("id", th.StringType),
+        th.Property("parentId", th.StringType),
+        th.Property("rootId", th.StringType),
+        th.Property("depth", th.IntegerType),
+        th.Property("path", th.ArrayType(th.StringType)),
+        th.Property("isOrphan", th.BooleanType),
+        th.Property("inCycle", th.BooleanType),
+    ).to_dict()
+
+    def get_records(
+        self,
+        context: dict | None,  # noqa: ARG002
+    ) -> t.Iterable[dict]:
+        """Return the ancestor path of every node of the source stream.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The paths.
+        """
+        return self.get_hierarchy().paths()
+
+
+#: Streams derived from every hierarchical stream.
+HIERARCHY_STREAM_TYPES: list[type[HierarchyStream]] = [ClosureStream, PathStream]
@@ -0,0 +1,204 @@
+"""Incremental JSON decoding for large gapi response bodies."""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_SIMPLE_JSONPATH = re.compile(r"^\$((?:\.[A-Za-z_][A-Za-z0-9_]*)+)\[\*\]$")
+
+# Drop the consumed part of the buffer once it grows past this many characters.
+_COMPACT_THRESHOLD = 1 << 16
+
+
+def jsonpath_to_keys(jsonpath: str) -> tuple[str, ...] | None:
+    """Convert a simple ``$.a.b[*]`` JSONPath into a tuple of object keys.
+
+    Args:
+        jsonpath: The records JSONPath of a stream.
+
+    Returns:
+        The object keys leading to the record array, or None if the expression is
+        too complex to be followed incrementally.
+    """
+    match = _SIMPLE_JSONPATH.match(jsonpath)
+    if not match:
+        return None
+    return tuple(match.group(1).lstrip(".").split("."))
+
+
+def project(record: Any, fields: tuple[str, ...]) -> Any:  # noqa: ANN401
+    """Keep only some properties of a record.
+
+    Args:
+        record: The decoded record.
+        fields: The names of the properties to keep.
+
+    Returns:
+        A new record with the properties of ``fields`` it holds, or the value
+        itself if it is not an object.
+    """
+    if not isinstance(record, dict):
+        return record
+    return {name: record[name] for name in fields if name in record}
+
+
+class IncrementalJSONReader:
+    """Walk a JSON document chunk by chunk and yield the items of one array.
+
+    Only the items of the target array are ever materialized one at a time. Every
+    other value met along the way (e.g. ``lastEvaluatedKey``) is kept in
+    :attr:`skeleton`, which mirrors the document without the streamed items.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        keys: tuple[str, ...],
+        fields: tuple[str, ...] | None = None,
+    ) -> None:
+        """Create a new reader.
+
+        Args:
+            chunks: The raw response body, in chunks.
+            keys: Object keys leading to the array to stream.
+            fields: The properties each item is projected on, if not all.
+        """
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._keys = keys
+        self._fields = fields
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self.skeleton: dict = {}
+
+    def __iter__(self) -> Iterator[Any]:
+        """Yield each item of the target array.
+
+        Yields:
+            One decoded item at a time.
+        """
+        yield from self._walk_object(self.skeleton, 0)
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer.
+
+        Returns:
+            False once the body is exhausted.
+        """
+        if self._eof:
+            return False
+        if self._pos > _COMPACT_THRESHOLD:
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._eof = True
+            self._buf += self._text_decoder.decode(b"", final=True)
+            return False
+        self._buf += self._text_decoder.decode(chunk)
+        return True
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character without consuming it.
+
+        Returns:
+            The next significant character.
+
+        Raises:
+            ValueError: If the document ends unexpectedly.
+        """
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                msg = "Unexpected end of JSON document"
+                raise ValueError(msg)
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            msg = f"Expected '{char}' at offset {self._pos}, found '{found}'"
+            raise ValueError(msg)
+        self._pos += 1
+
+    def _value(self) -> Any:  # noqa: ANN401
+        """Decode one complete JSON value from the buffer.
+
+        Returns:
+            The decoded value.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number ending exactly at the buffer edge may be truncated.
+            if end == len(self._buf) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _walk_object(self, skeleton: dict, depth: int) -> Iterator[Any]:
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == self._keys[depth]:
+                if depth + 1 < len(self._keys):
+                    if self._peek() == "{":
+                        child = skeleton.setdefault(key, {})
+                        yield from self._walk_object(child, depth + 1)
+                    else:
+                        skeleton[key] = self._value()
+                else:
+                    yield from self._walk_target()
+            else:
+                skeleton[key] = self._value()
+            if self._peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("}")
+            return
+
+    def _walk_target(self) -> Iterator[Any]:
+        if self._fields is not None:
+            fields = self._fields
+            for item in self._walk_items():
+                yield project(item, fields)
+        else:
+            yield from self._walk_items()
+
+    def _walk_items(self) -> Iterator[Any]:
+        if self._peek() != "[":
+            value = self._value()
+            if isinstance(value, dict):
+                yield from value.values()
+            elif isinstance(value, list):
+                yield from value
+            return
+        self._pos += 1
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("]")
+            return
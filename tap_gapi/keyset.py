@@ -0,0 +1,204 @@
+"""Compact sorted key sets, for detecting records deleted from the source.
+
+A key set holds the primary key of every record a sync saw, each with an
+optional fixed-size digest of the record's content. Keys are sorted and front
+coded, storing only the suffix that differs from the previous key, then
+compressed with zlib. Sequential ids take a few bytes each, so the key sets of
+streams with millions of records stay small enough for the state. Digests,
+which do not compress, follow the keys as is.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import zlib
+from pathlib import Path
+from typing import Iterable, Iterator
+
+FORMAT_VERSION = 1
+
+#: Encoded size from which key sets are written to a sidecar file, when a
+#: sidecar directory is set, instead of the state.
+SIDECAR_MIN_BYTES = 1 << 20
+
+#: Number of the latest sidecar files kept for each stream or partition.
+SIDECAR_KEEP = 3
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    while value > 0x7F:  # noqa: PLR2004
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytes, position: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:  # noqa: PLR2004
+            return value, position
+        shift += 7
+
+
+def encode(entries: Iterable[tuple[str, bytes]], digest_size: int) -> bytes:
+    """Encode a key set.
+
+    Args:
+        entries: Each key and its digest, sorted by key.
+        digest_size: The size of every digest, 0 to keep none.
+
+    Returns:
+        The encoded key set.
+    """
+    buffer = bytearray()
+    digests = bytearray()
+    previous = b""
+    for key, digest in entries:
+        raw = key.encode()
+        # The length of the common prefix, from the highest differing bit.
+        limit = min(len(raw), len(previous))
+        difference = int.from_bytes(raw[:limit], "big") ^ int.from_bytes(
+            previous[:limit],
+            "big",
+        )
+        shared = limit - (difference.bit_length() + 7) // 8
+        suffix = raw[shared:]
+        if shared < 0x80 and len(suffix) < 0x80:  # noqa: PLR2004
+            buffer.append(shared)
+            buffer.append(len(suffix))
+        else:
+            _write_varint(buffer, shared)
+            _write_varint(buffer, len(suffix))
+        buffer += suffix
+        digests += digest[:digest_size]
+        previous = raw
+    keys = zlib.compress(buffer)
+    header = bytearray((FORMAT_VERSION, digest_size))
+    _write_varint(header, len(keys))
+    return bytes(header + keys + digests)
+
+
+def decode(data: bytes) -> Iterator[tuple[str, bytes]]:
+    """Decode a key set.
+
+    Args:
+        data: The encoded key set.
+
+    Yields:
+        Each key and its digest, empty if the set keeps none, sorted by key.
+
+    Raises:
+        ValueError: If the key set was written in an unknown format.
+    """
+    version, digest_size = data[0], data[1]
+    if version != FORMAT_VERSION:
+        msg = f"Unknown key set format {version}"
+        raise ValueError(msg)
+    keys_size, start = _read_varint(data, 2)
+    raw = zlib.decompress(data[start : start + keys_size])
+    digest_position = start + keys_size
+    position = 0
+    previous = b""
+    while position < len(raw):
+        shared = raw[position]
+        length = raw[position + 1]
+        if shared < 0x80 and length < 0x80:  # noqa: PLR2004
+            position += 2
+        else:
+            shared, position = _read_varint(raw, position)
+            length, position = _read_varint(raw, position)
+        key = previous[:shared] + raw[position : position + length]
+        position += length
+        yield key.decode(), data[digest_position : digest_position + digest_size]
+        digest_position += digest_size
+        previous = key
+
+
+class KeySetStore:
+    """Write key sets to the state, or to sidecar files when they are large.
+
+    Sidecar files are named after their owner, a stream or partition, and the
+    hash of their content, so a state always points at the key set it was
+    saved with. A state is only committed once the target has received it, so
+    the file of the previous state is never deleted when a new one is written:
+    only older files of the owner, past the latest ``SIDECAR_KEEP``, are.
+    """
+
+    def __init__(self, directory: str | os.PathLike | None = None) -> None:
+        """Create a store.
+
+        Args:
+            directory: Directory of the sidecar files. Key sets are always kept
+                in the state when unset.
+        """
+        self.directory = None if directory is None else Path(directory).expanduser()
+
+    def dump(
+        self,
+        entries: Iterable[tuple[str, bytes]],
+        count: int,
+        digest_size: int,
+        owner: str = "",
+        previous: dict | None = None,
+    ) -> dict:
+        """Encode a key set into its state value.
+
+        Args:
+            entries: Each key and its digest, sorted by key.
+            count: The number of keys.
+            digest_size: The size of every digest, 0 to keep none.
+            owner: The stream or partition the key set belongs to.
+            previous: The state value of the key set it replaces, whose
+                sidecar file is kept.
+
+        Returns:
+            The number of keys, and either the encoded key set or the name of
+            the sidecar file holding it.
+        """
+        data = encode(entries, digest_size)
+        if self.directory is None or len(data) < SIDECAR_MIN_BYTES:
+            return {"count": count, "data": base64.b64encode(data).decode("ascii")}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        prefix = hashlib.sha256(owner.encode()).hexdigest()[:16]
+        name = f"{prefix}-{hashlib.sha256(data).hexdigest()[:32]}.keys"
+        path = self.directory / name
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        # The latest files first, keeping those of states not committed yet.
+        keep = {name, (previous or {}).get("file")}
+        paths = sorted(
+            self.directory.glob(f"{prefix}-*.keys"),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+        for path in paths[SIDECAR_KEEP:]:
+            if path.name not in keep:
+                path.unlink(missing_ok=True)
+        return {"count": count, "file": name}
+
+    def load(self, value: dict | None) -> Iterator[tuple[str, bytes]]:
+        """Decode a key set from its state value.
+
+        Args:
+            value: The state value written by :meth:`dump`, if any.
+
+        Returns:
+            An iterator of each key and its digest, sorted by key.
+
+        Raises:
+            FileNotFoundError: If the sidecar file of the key set is missing.
+        """
+        if not value:
+            return iter(())
+        if "file" not in value:
+            return decode(base64.b64decode(value["data"]))
+        if self.directory is None:
+            msg = f"No sidecar directory to read key set {value['file']} from"
+            raise FileNotFoundError(msg)
+        return decode((self.directory / value["file"]).read_bytes())
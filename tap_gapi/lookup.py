@@ -0,0 +1,92 @@
+"""Lookup indexes of small streams, for denormalizing the records of others."""
+
+from __future__ import annotations
+
+import typing as t
+
+
+class LookupIndex:
+    """The records of a small stream, by primary key.
+
+    Records are stored as tuples of their values, in the order of the stream's
+    columns, rather than as dictionaries.
+    """
+
+    def __init__(self, key: str, columns: list[str]) -> None:
+        """Create an empty index.
+
+        Args:
+            key: The primary key the records are looked up by.
+            columns: The columns kept for each record.
+        """
+        self.key = key
+        self.columns = tuple(columns)
+        self._rows: dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        """Return the number of records.
+
+        Returns:
+            The number of records.
+        """
+        return len(self._rows)
+
+    def add_record(self, record: dict) -> None:
+        """Index a record, replacing any record with the same key.
+
+        Args:
+            record: The raw record. Records without a key are ignored.
+        """
+        key = record.get(self.key)
+        if key is not None:
+            self._rows[str(key)] = tuple(record.get(column) for column in self.columns)
+
+    def get(self, key: t.Any) -> dict | None:  # noqa: ANN401
+        """Return the record with a key.
+
+        Args:
+            key: The key, e.g. a foreign key of another stream's record.
+
+        Returns:
+            The record, or None if the key is empty or unknown.
+        """
+        if key is None:
+            return None
+        row = self._rows.get(str(key))
+        return None if row is None else dict(zip(self.columns, row))
+
+    def records(self) -> t.Iterator[dict]:
+        """Generate every record, in the order they were first indexed.
+
+        Yields:
+            Each record.
+        """
+        columns = self.columns
+        for row in self._rows.values():
+            yield dict(zip(columns, row))
+
+
+def denormalized_schema(schema: dict, dimensions: dict[str, t.Any]) -> dict:
+    """Return a schema extended with an object property for each dimension.
+
+    Args:
+        schema: The schema of the denormalized stream's own columns.
+        dimensions: The stream class of each dimension, and the foreign key
+            pointing at it, by the name of its object property.
+
+    Returns:
+        The schema of the denormalized records.
+    """
+    return {
+        **schema,
+        "properties": {
+            **schema["properties"],
+            **{
+                name: {
+                    "type": ["object", "null"],
+                    "properties": dimension_type.schema["properties"],
+                }
+                for name, (dimension_type, _) in dimensions.items()
+            },
+        },
+    }
@@ -0,0 +1,103 @@
+"""Adaptive page sizing for paginated gapi endpoints."""
+
+from __future__ import annotations
+
+import threading
+import urllib.parse
+
+# Bounds and latency target used when the tap settings do not override them.
+DEFAULT_MIN_PAGE_SIZE = 10
+DEFAULT_MAX_PAGE_SIZE = 1000
+DEFAULT_PAGE_LATENCY_TARGET = 2.0
+
+
+class AdaptivePageSize:
+    """Pick the page size of the next request from how the previous ones went.
+
+    The page size doubles while pages come back in less than half the latency
+    target and halves when a page is slower than the target, times out or is
+    rejected by the server. It always stays within ``[minimum, maximum]``.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = DEFAULT_MIN_PAGE_SIZE,
+        maximum: int = DEFAULT_MAX_PAGE_SIZE,
+        latency_target: float = DEFAULT_PAGE_LATENCY_TARGET,
+        *,
+        adaptive: bool = True,
+    ) -> None:
+        """Create a new page size controller.
+
+        Args:
+            initial: The page size of the first request.
+            minimum: The smallest page size to shrink to.
+            maximum: The largest page size to grow to.
+            latency_target: Response time, in seconds, the page size aims for.
+            adaptive: False to always request ``initial`` records per page.
+        """
+        self.minimum = min(minimum, initial)
+        self.maximum = max(maximum, initial)
+        self.latency_target = latency_target
+        self.adaptive = adaptive
+        self._page_size = initial
+        self._lock = threading.Lock()
+
+    @property
+    def page_size(self) -> int:
+        """Return the page size of the next request.
+
+        Returns:
+            The number of records to request.
+        """
+        return self._page_size
+
+    def record_latency(self, seconds: float) -> None:
+        """Adjust the page size after a successful request.
+
+        Args:
+            seconds: How long the server took to answer.
+        """
+        if not self.adaptive:
+            return
+        with self._lock:
+            if seconds < self.latency_target / 2:
+                self._page_size = min(self._page_size * 2, self.maximum)
+            elif seconds > self.latency_target:
+                self._page_size = max(self._page_size // 2, self.minimum)
+
+    def shrink(self) -> bool:
+        """Halve the page size after a failed request.
+
+        Returns:
+            True if the page size was reduced, False if it is already minimal.
+        """
+        if not self.adaptive:
+            return False
+        with self._lock:
+            page_size = max(self._page_size // 2, self.minimum)
+            shrunk = page_size < self._page_size
+            self._page_size = page_size
+        return shrunk
+
+
+def set_query_param(url: str, name: str, value: object) -> str:
+    """Return ``url`` with one query parameter added or replaced.
+
+    Args:
+        url: The request URL.
+        name: The name of the query parameter.
+        value: The new value of the parameter.
+
+    Returns:
+        The updated URL.
+    """
+    parts = urllib.parse.urlsplit(url)
+    query = [
+        (key, val)
+        for key, val in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if key != name
+    ]
+    query.append((name, str(value)))
+    return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query)))
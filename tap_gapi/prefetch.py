@@ -0,0 +1,127 @@
+"""Background fetching of stream records for concurrent syncs."""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+from typing import Any, AsyncIterable, Callable, Iterable, Iterator
+
+# Records are handed over to the consumer in chunks of this size.
+PREFETCH_CHUNK_SIZE = 500
+
+# Number of chunks a producer may buffer before waiting on the consumer.
+PREFETCH_QUEUE_CHUNKS = 20
+
+_DONE = object()
+
+
+class _Failure:
+    """Wrap an exception raised by a producer."""
+
+    def __init__(self, exception: BaseException) -> None:
+        self.exception = exception
+
+
+class RecordPrefetcher:
+    """Fetch records on a worker thread and hand them over through a bounded queue.
+
+    Only the network requests and response parsing run on the worker. The
+    records are consumed by the thread that iterates the prefetcher, so Singer
+    messages keep being written by a single thread in stream order.
+
+    The worker is either a thread, running :meth:`run`, or an event loop, running
+    :meth:`run_async` over an asynchronous iterable of records.
+    """
+
+    def __init__(
+        self,
+        fetch_records: Callable[[], Iterable[dict] | AsyncIterable[dict]],
+        max_chunks: int = PREFETCH_QUEUE_CHUNKS,
+    ) -> None:
+        """Create a new prefetcher.
+
+        Args:
+            fetch_records: Callable returning the records to prefetch.
+            max_chunks: Number of record chunks that may be buffered.
+        """
+        self._fetch_records = fetch_records
+        self._queue: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self._cancelled = threading.Event()
+
+    def run(self) -> None:
+        """Fetch every record and push it to the queue. Runs on the worker."""
+        chunk: list[dict] = []
+        try:
+            for record in self._fetch_records():
+                chunk.append(record)
+                if len(chunk) >= PREFETCH_CHUNK_SIZE:
+                    if not self._put(chunk):
+                        return
+                    chunk = []
+        except BaseException as ex:  # noqa: BLE001
+            self._put(_Failure(ex))
+            return
+        if chunk and not self._put(chunk):
+            return
+        self._put(_DONE)
+
+    async def run_async(self) -> None:
+        """Fetch every record and push it to the queue. Runs on the event loop."""
+        chunk: list[dict] = []
+        try:
+            async for record in self._fetch_records():
+                chunk.append(record)
+                if len(chunk) >= PREFETCH_CHUNK_SIZE:
+                    if not await self._put_async(chunk):
+                        return
+                    chunk = []
+        except asyncio.CancelledError:
+            raise
+        except BaseException as ex:  # noqa: BLE001
+            await self._put_async(_Failure(ex))
+            return
+        if chunk and not await self._put_async(chunk):
+            return
+        await self._put_async(_DONE)
+
+    def cancel(self) -> None:
+        """Stop the producer at its next hand-over."""
+        self._cancelled.set()
+
+    def _put(self, item: Any) -> bool:  # noqa: ANN401
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    async def _put_async(self, item: Any) -> bool:  # noqa: ANN401
+        # Never block the event loop, other streams are fetched on it.
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                await asyncio.sleep(0.01)
+                continue
+            return True
+        return False
+
+    def __iter__(self) -> Iterator[dict]:
+        """Yield the prefetched records in the order they were fetched.
+
+        Yields:
+            Each prefetched record.
+
+        Raises:
+            BaseException: Any exception raised while fetching.
+        """
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exception
+            yield from item
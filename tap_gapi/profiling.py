@@ -0,0 +1,304 @@
+"""Per-stream profiling of a sync, for the ``--profile`` option."""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable, Iterator
+
+# Seconds between two samples of every thread's stack.
+SAMPLE_INTERVAL = 0.01
+
+# Number of frames kept for each traced allocation.
+TRACEMALLOC_FRAMES = 5
+
+# Number of functions and allocation sites listed in each report.
+TOP_ENTRIES = 30
+
+# The profiler's own allocations are left out of the reports.
+_OWN_FILES = {tracemalloc.__file__, __file__}
+
+# Report of the threads not working for any stream, e.g. the asyncio engine.
+UNATTRIBUTED = "_tap"
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    path = Path(code.co_filename)
+    return f"{code.co_name} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame: FrameType | None, root: str) -> str:
+    """Return a stack in the collapsed format read by flamegraph tools.
+
+    Args:
+        frame: The innermost frame of the stack.
+        root: Label of the outermost element, e.g. the thread name.
+
+    Returns:
+        The frames from the outermost to the innermost, separated by ``;``.
+    """
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(root.replace(";", ":"))
+    return ";".join(reversed(labels))
+
+
+class _StreamProfile:
+    """What was collected for one stream."""
+
+    def __init__(self) -> None:
+        self.profile = cProfile.Profile()
+        self.samples: collections.Counter[str] = collections.Counter()
+        self.allocations: list[tracemalloc.StatisticDiff] | None = None
+        self.peak_memory = 0
+
+    @property
+    def has_calls(self) -> bool:
+        return bool(self.profile.getstats())
+
+
+class StreamProfiler:
+    """Profile a sync and write a report for each stream.
+
+    Every stream gets three files in the output directory:
+
+    - ``<stream>.txt``: its hottest functions, measured by ``cProfile`` on the
+      thread writing the Singer messages, and its top allocation sites,
+      measured by ``tracemalloc``;
+    - ``<stream>.prof``: the raw ``cProfile`` statistics, for ``pstats`` or
+      snakeviz;
+    - ``<stream>.collapsed``: stacks sampled from every thread working for the
+      stream, in the collapsed format of ``flamegraph.pl`` and speedscope.
+
+    Allocations are compared between snapshots taken when each top-level
+    stream sync ends, so those of child streams are included in their
+    parent's report, as are those of any stream prefetched concurrently.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        sample_interval: float = SAMPLE_INTERVAL,
+    ) -> None:
+        """Create a profiler.
+
+        Args:
+            directory: Where the reports are written.
+            sample_interval: Seconds between two stack samples.
+        """
+        self.directory = Path(directory).expanduser()
+        self.sample_interval = sample_interval
+        self.streams: dict[str, _StreamProfile] = collections.defaultdict(
+            _StreamProfile,
+        )
+        self._thread_streams: dict[int, str] = {}
+        self._active: list[str] = []
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._started_tracemalloc = False
+        self._stopped = threading.Event()
+        self._sampler: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start tracing allocations and sampling stacks."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        self._snapshot = tracemalloc.take_snapshot()
+        self._stopped.clear()
+        self._sampler = threading.Thread(
+            target=self._sample,
+            name="tap-gapi-profiler",
+            daemon=True,
+        )
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop sampling stacks and tracing allocations."""
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self._snapshot = None
+
+    def __enter__(self) -> StreamProfiler:
+        """Start profiling.
+
+        Returns:
+            The profiler.
+        """
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Stop profiling and write the reports."""
+        self.stop()
+        self.write_reports()
+
+    @contextlib.contextmanager
+    def profile_stream(self, name: str) -> Iterator[None]:
+        """Profile the calling thread while it syncs a stream.
+
+        Child streams are synced from within their parent's sync. While they
+        are, the parent's ``cProfile`` profile is paused.
+
+        Args:
+            name: The stream name.
+
+        Yields:
+            Nothing, once the stream is being profiled.
+        """
+        outer = self._active[-1] if self._active else None
+        if outer is None:
+            if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+                tracemalloc.reset_peak()
+        else:
+            self.streams[outer].profile.disable()
+        self._active.append(name)
+        profile = self.streams[name].profile
+        with self.attribute(name):
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                self._active.pop()
+                if outer is None:
+                    self._record_allocations(name)
+                else:
+                    self.streams[outer].profile.enable()
+
+    @contextlib.contextmanager
+    def attribute(self, name: str) -> Iterator[None]:
+        """Attribute the stack samples of the calling thread to a stream.
+
+        Args:
+            name: The stream name.
+
+        Yields:
+            Nothing, while the samples are attributed to the stream.
+        """
+        ident = threading.get_ident()
+        previous = self._thread_streams.get(ident)
+        self._thread_streams[ident] = name
+        try:
+            yield
+        finally:
+            if previous is None:
+                del self._thread_streams[ident]
+            else:
+                self._thread_streams[ident] = previous
+
+    def run_for_stream(
+        self,
+        name: str,
+        function: Callable[[], Any],
+    ) -> Any:  # noqa: ANN401
+        """Run a function on a worker thread fetching a stream's records.
+
+        Args:
+            name: The stream name.
+            function: The function to run.
+
+        Returns:
+            The value returned by the function.
+        """
+        with self.attribute(name):
+            return function()
+
+    def _record_allocations(self, name: str) -> None:
+        if self._snapshot is None:
+            return
+        stream = self.streams[name]
+        _, peak = tracemalloc.get_traced_memory()
+        stream.peak_memory = max(stream.peak_memory, peak)
+        snapshot = tracemalloc.take_snapshot()
+        allocations = [
+            allocation
+            for allocation in snapshot.compare_to(self._snapshot, "traceback")
+            if allocation.traceback[-1].filename not in _OWN_FILES
+        ]
+        stream.allocations = allocations[:TOP_ENTRIES]
+        self._snapshot = snapshot
+
+    def _sample(self) -> None:
+        sampler = threading.get_ident()
+        while not self._stopped.wait(self.sample_interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():  # noqa: SLF001
+                if ident == sampler:
+                    continue
+                stream = self._thread_streams.get(ident, UNATTRIBUTED)
+                root = names.get(ident, str(ident))
+                self.streams[stream].samples[collapse_stack(frame, root)] += 1
+
+    def report(self, name: str) -> str:
+        """Render the report of a stream.
+
+        Args:
+            name: The stream name.
+
+        Returns:
+            The hottest functions and the top allocation sites of the stream.
+        """
+        stream = self.streams[name]
+        output = io.StringIO()
+        output.write(f"Profile of stream '{name}'\n\n")
+        output.write(f"Top {TOP_ENTRIES} functions by own time:\n")
+        if stream.has_calls:
+            stats = pstats.Stats(stream.profile, stream=output)
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(TOP_ENTRIES)
+        else:
+            output.write("  No calls were profiled.\n")
+
+        output.write(f"\nTop {TOP_ENTRIES} allocation sites by size retained:\n")
+        if stream.allocations is None:
+            output.write("  Included in the report of the parent stream.\n")
+            return output.getvalue()
+        output.write(f"  Peak traced memory: {stream.peak_memory} bytes\n")
+        for allocation in stream.allocations:
+            output.write(
+                f"  {allocation.size_diff:+d} B, {allocation.count_diff:+d} blocks\n",
+            )
+            for line in allocation.traceback.format(most_recent_first=True)[:6]:
+                output.write(f"    {line.strip()}\n")
+        return output.getvalue()
+
+    def write_reports(self) -> list[Path]:
+        """Write the report, statistics and sampled stacks of every stream.
+
+        Returns:
+            The paths of the written files.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for name, stream in sorted(self.streams.items()):
+            base = self.directory / name
+            if name != UNATTRIBUTED:
+                paths.append(base.with_suffix(".txt"))
+                paths[-1].write_text(self.report(name))
+                if stream.has_calls:
+                    paths.append(base.with_suffix(".prof"))
+                    stream.profile.dump_stats(paths[-1])
+            paths.append(base.with_suffix(".collapsed"))
+            paths[-1].write_text(
+                "".join(
+                    f"{stack} {count}\n"
+                    for stack, count in sorted(stream.samples.items())
+                ),
+            )
+        return paths
@@ -0,0 +1,218 @@
+"""On-disk cache of API responses for development and re-runs."""
+
+from __future__ import annotations
+
+import collections
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Size bound of the cache when the tap settings do not override it.
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Response headers not written to disk. Bodies are stored decoded.
+_EXCLUDED_HEADERS = frozenset({"content-encoding", "content-length", "set-cookie"})
+
+
+class ResponseCache:
+    """Store successful API responses on disk, one owner-only file each.
+
+    Responses are keyed by method, URL with its sorted query parameters, and
+    scope. Only data requests sent by streams go through the cache, never the
+    token endpoint. Entries expire after ``ttl`` seconds, and the least recently
+    used ones are evicted once the cache grows past ``max_bytes``. In replay-only
+    mode, expired entries are still served and a miss is an error for the caller
+    to raise, so a run never reaches the network.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        ttl: float | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        *,
+        replay_only: bool = False,
+    ) -> None:
+        """Create a new cache.
+
+        Args:
+            directory: Directory holding the cached responses.
+            ttl: Seconds a response stays valid, forever if None.
+            max_bytes: Total size above which old responses are evicted.
+            replay_only: Serve expired responses and never store new ones.
+        """
+        self.directory = Path(directory).expanduser()
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.replay_only = replay_only
+        self._lock = threading.Lock()
+        self._entries: collections.OrderedDict[str, int] | None = None
+        self._total_bytes = 0
+
+    @staticmethod
+    def cache_key(request: requests.PreparedRequest, scope: str) -> str:
+        """Return the cache key of a request.
+
+        Args:
+            request: The prepared request.
+            scope: The OAuth scope the request is sent with.
+
+        Returns:
+            A file-name safe key.
+        """
+        url = urllib.parse.urlsplit(request.url)
+        query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(url.query)))
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode()
+        raw = "\n".join(
+            [
+                request.method or "GET",
+                urllib.parse.urlunsplit(url._replace(query=query, fragment="")),
+                scope,
+            ],
+        ).encode()
+        return hashlib.sha256(raw + b"\n" + body).hexdigest()[:32]
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.response"
+
+    def _index(self) -> collections.OrderedDict[str, int]:
+        """Return the size of each entry, least recently used first.
+
+        Returns:
+            The entries of the cache, read from disk on first use.
+        """
+        if self._entries is None:
+            entries = []
+            if self.directory.is_dir():
+                for path in self.directory.glob("*.response"):
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, path.stem, stat.st_size))
+            entries.sort()
+            self._entries = collections.OrderedDict(
+                (key, size) for _, key, size in entries
+            )
+            self._total_bytes = sum(self._entries.values())
+        return self._entries
+
+    def _touch(self, key: str, size: int) -> None:
+        """Mark an entry as the most recently used one.
+
+        Args:
+            key: The cache key.
+            size: The size of the entry's file.
+        """
+        entries = self._index()
+        self._total_bytes += size - entries.pop(key, 0)
+        entries[key] = size
+
+    def _remove(self, key: str) -> None:
+        self._total_bytes -= self._index().pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def load(
+        self,
+        request: requests.PreparedRequest,
+        scope: str,
+    ) -> requests.Response | None:
+        """Return the cached response of a request.
+
+        Args:
+            request: The prepared request.
+            scope: The OAuth scope the request is sent with.
+
+        Returns:
+            The response, or None if none is cached or it expired.
+        """
+        key = self.cache_key(request, scope)
+        path = self._path(key)
+        with self._lock:
+            try:
+                data = path.read_bytes()
+            except OSError:
+                return None
+            header, _, body = data.partition(b"\n")
+            try:
+                entry = json.loads(header)
+            except ValueError:
+                self._remove(key)
+                return None
+            expired = (
+                self.ttl is not None and time.time() - entry["stored_at"] > self.ttl
+            )
+            if expired and not self.replay_only:
+                self._remove(key)
+                return None
+            os.utime(path)
+            self._touch(key, len(data))
+
+        response = requests.Response()
+        response.status_code = entry["status_code"]
+        response.reason = entry.get("reason")
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = body  # noqa: SLF001
+        response._content_consumed = True  # noqa: SLF001
+        response.encoding = entry.get("encoding")
+        response.url = request.url
+        response.request = request
+        return response
+
+    def store(
+        self,
+        request: requests.PreparedRequest,
+        scope: str,
+        response: requests.Response,
+    ) -> None:
+        """Cache a successful response, then evict old ones above the size bound.
+
+        The whole body is read, so streamed responses are buffered in memory.
+
+        Args:
+            request: The prepared request.
+            scope: The OAuth scope the request is sent with.
+            response: The response to cache.
+        """
+        if self.replay_only or response.status_code != requests.codes.ok:
+            return
+        header = {
+            "stored_at": time.time(),
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "encoding": response.encoding,
+            "headers": {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower() not in _EXCLUDED_HEADERS
+            },
+        }
+        data = json.dumps(header).encode() + b"\n" + response.content
+        if len(data) > self.max_bytes:
+            return
+
+        key = self.cache_key(request, scope)
+        path = self._path(key)
+        with self._lock:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            tmp_path.replace(path)
+
+            self._touch(key, len(data))
+            while self._total_bytes > self.max_bytes:
+                self._remove(next(iter(self._index())))
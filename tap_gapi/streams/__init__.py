@@ -0,0 +1,85 @@
+"""Stream type classes for tap-gapi.
+
+The streams of each scope are defined in their own module, which is only
+imported, building the stream schemas, once the scope is used. Every stream
+class can still be imported from ``tap_gapi.streams``.
+"""
+
+from __future__ import annotations
+
+import importlib
+import typing as t
+
+from tap_gapi.client import gapiStream, paginatedGapiStream
+
+__all__ = ["SCOPE_STREAM_TYPES", "StreamRegistry", "gapiStream", "paginatedGapiStream"]
+
+
+class StreamRegistry(t.Mapping[str, t.List[t.Type[gapiStream]]]):
+    """The stream types of each scope, imported when the scope is looked up."""
+
+    def __init__(self, modules: dict[str, str]) -> None:
+        """Create a registry.
+
+        Args:
+            modules: The module defining the streams of each scope, relative to
+                this package. It lists them in ``STREAM_TYPES``.
+        """
+        self._modules = modules
+
+    def __getitem__(self, scope: str) -> list[type[gapiStream]]:
+        """Return the stream types of a scope, importing their module once.
+
+        Args:
+            scope: The OAuth scope.
+
+        Returns:
+            The stream types, in the order they are discovered and synced.
+        """
+        module = importlib.import_module(f"{__name__}.{self._modules[scope]}")
+        return module.STREAM_TYPES
+
+    def __iter__(self) -> t.Iterator[str]:
+        """Iterate over the scopes, without importing their streams.
+
+        Returns:
+            An iterator of the scopes.
+        """
+        return iter(self._modules)
+
+    def __len__(self) -> int:
+        """Return the number of scopes.
+
+        Returns:
+            The number of scopes.
+        """
+        return len(self._modules)
+
+
+SCOPE_STREAM_TYPES = StreamRegistry(
+    {
+        "finance/coa": "finance_coa",
+        "business/taxonomy": "business_taxonomy",
+    },
+)
+
+
+def __getattr__(name: str) -> type[gapiStream]:
+    """Return a stream class by name, importing the scopes' streams.
+
+    Args:
+        name: The name of the stream class.
+
+    Returns:
+        The stream class.
+
+    Raises:
+        AttributeError: If no scope defines a stream class of that name.
+    """
+    if not name.startswith("__"):
+        for stream_types in SCOPE_STREAM_TYPES.values():
+            for stream_type in stream_types:
+                if stream_type.__name__ == name:
+                    return stream_type
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
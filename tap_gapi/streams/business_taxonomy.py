@@ -1,174 +1,22 @@
-"""Stream type classes for tap-gapi."""
+"""Streams of the ``business/taxonomy`` scope: the business taxonomy."""
 
 from __future__ import annotations
 
-import sys
 import typing as t
 
 from singer_sdk import typing as th  # JSON Schema typing helpers
 
-from tap_gapi.client import gapiStream, paginatedGapiStream
+from tap_gapi.client import gapiStream
 
-if sys.version_info >= (3, 9):
-    import importlib.resources as importlib_resources
-else:
-    import importlib_resources
 
-"""
-GAPI FINANACE COA STREAMS
-"""
-class FinanceCOACostCenterStream(paginatedGapiStream):
-    """Define custom stream."""
-
-    name = "costcenter"
-    path = "/finance/chart-of-account/cost-center"
-    primary_keys = ["costCenterId"]
-    replication_key = None
-    schema = th.PropertiesList(
-        th.Property("costCenterId", th.StringType),
-        th.Property("costCenterName", th.StringType),
-        th.Property("legalEntityId", th.StringType),
-        th.Property("geographyId", th.StringType),
-        th.Property("organizationId", th.StringType),
-        th.Property("departmentId", th.StringType),
-        th.Property("functionType", th.StringType),
-        th.Property("marketId", th.StringType),
-        th.Property("marketName", th.StringType),
-        th.Property("revenueEligibleFlag", th.BooleanType),
-        th.Property("peopleEligibleFlag", th.BooleanType),
-        th.Property("peopleAlignmentType", th.StringType),
-        th.Property("effectiveStartDate", th.StringType),
-        th.Property("effectiveEndDate", th.StringType),
-        th.Property("creationDate", th.StringType),
-        th.Property("lastUpdateDate", th.StringType),
-        th.Property("functionId", th.StringType),
-        th.Property("gtmMarketId", th.StringType),
-        th.Property("gtmMarketName", th.StringType),
-        th.Property("gtmCountryRegionId", th.StringType),
-        th.Property("gtmCountryRegionName", th.StringType),
-    ).to_dict()
-
-class FinanceCOAFunctionStream(gapiStream):
-    """Define custom stream."""
-
-    name = "function"
-    path = "/finance/chart-of-account/function"
-    primary_keys = ["functionId"]
-    replication_key = None
-    schema = th.PropertiesList(
-        th.Property("functionId", th.StringType),
-        th.Property("functionName", th.StringType),
-        th.Property("functionType", th.StringType),
-        th.Property("functionHierarchy", th.StringType),
-        th.Property("functionHierarchyLevel", th.StringType),
-        th.Property("functionParentId", th.StringType),
-        th.Property("peopleEligibleFlag", th.BooleanType),
-        th.Property("revenueEligibleFlag", th.BooleanType),
-        th.Property("postingAllowedFlag", th.BooleanType),
-        th.Property("plAlignment", th.StringType),
-        th.Property("effectiveStartDate", th.StringType),
-        th.Property("effectiveEndDate", th.StringType),
-        th.Property("creationDate", th.StringType),
-        th.Property("lastUpdateDate", th.StringType),
-        th.Property("utilizationEligible", th.BooleanType),
-        th.Property("peopleAlignmentType", th.StringType),
-        th.Property("workforceTaxonomyId", th.StringType),
-    ).to_dict()
-
-class FinanceCOAGeographyStream(gapiStream):
-    """Define custom stream."""
-
-    name = "geography"
-    path = "/finance/chart-of-account/geography"
-    primary_keys = ["geographyId"]
-    replication_key = None
-    schema = th.PropertiesList(
-        th.Property("geographyId", th.StringType),
-        th.Property("geographyName", th.StringType),
-        th.Property("abbreviation", th.StringType),
-        th.Property("geographyHierarchyLevel", th.StringType),
-        th.Property("geographyType", th.StringType),
-        th.Property("geographyParentId", th.StringType),
-        th.Property("postingAllowedFlag", th.BooleanType),
-        th.Property("effectiveStartDate", th.StringType),
-        th.Property("effectiveEndDate", th.StringType),
-        th.Property("creationDate", th.StringType),
-        th.Property("lastUpdateDate", th.StringType),
-        th.Property("slalomGeoTaxonomyID", th.StringType)
-    ).to_dict()
-
-class FinanceCOALegalEntityStream(gapiStream):
-    """Define custom stream."""
-
-    name = "legalentity"
-    path = "/finance/chart-of-account/legal-entity"
-    primary_keys = ["legalEntityId"]
-    replication_key = None
-    schema = th.PropertiesList(
-        th.Property("legalEntityName", th.StringType),
-        th.Property(
-            "legalEntityId",
-            th.StringType,
-            description="The legal entity's system ID",
-        ),
-        th.Property("legalEntityContractName", th.StringType),
-        th.Property("legalEntityParentId", th.StringType),
-        th.Property("legalEntityHierarchyLevel", th.StringType),
-        th.Property("legalEntityType", th.StringType),
-        th.Property("operationalEntity", th.StringType),
-        th.Property("abbreviation", th.StringType),
-        th.Property("postingAllowedFlag", th.BooleanType),
-        th.Property("primaryCurrencyCode", th.StringType),
-        th.Property("effectiveStartDate", th.StringType),
-        th.Property("effectiveEndDate", th.StringType),
-        th.Property("creationDate", th.StringType),
-        th.Property("lastUpdateDate", th.StringType),
-        th.Property("operationalStatus", th.StringType)
-    ).to_dict()
-
-class FinanceCOAOrganizationStream(gapiStream):
-    """Define custom stream."""
-
-    name = "organization"
-    path = "/finance/chart-of-account/organization"
-    primary_keys = ["organizationId"]
-    replication_key = None
-    schema = th.PropertiesList(
-        th.Property("organizationName", th.StringType),
-        th.Property(
-            "organizationId",
-            th.StringType,
-            description="The organizations's system ID",
-        ),
-        th.Property(
-            "abbreviation",
-            th.StringType,
-        ),
-        th.Property("organizationHierarchyLevel", th.StringType),
-        th.Property("organizationFunctionProfile", th.StringType),
-        th.Property("organizationType", th.StringType),
-        th.Property("organizationType2", th.StringType),
-        th.Property("organizationParentId", th.StringType),
-        th.Property("peopleEligibleFlag", th.BooleanType),
-        th.Property("postingAllowedFlag", th.BooleanType),
-        th.Property("effectiveStartDate", th.StringType),
-        th.Property("effectiveEndDate", th.StringType),
-        th.Property("creationDate", th.StringType),
-        th.Property("lastUpdateDate", th.StringType),
-    ).to_dict()
-
-
-
-"""
-GAPI BUSINESS STREAMS
-"""
 class BusinessTaxonomyMarketsStream(gapiStream):
     """Define custom stream."""
 
     name = "markets"
     path = "/business/taxonomy/markets?includeInactive=true"
+    scope = "business/taxonomy"
     primary_keys: t.ClassVar[list[str]] = ["id"]
-    replication_key = None
+    replication_key = "modifiedOn"
     schema = th.PropertiesList(
         th.Property("name", th.StringType),
         th.Property(
@@ -202,8 +50,9 @@ class BusinessTaxonomyCapabilitiesStream(gapiStream):
 
     name = "capabilities"
     path = "/business/taxonomy/capabilities?includeInactive=true"
+    scope = "business/taxonomy"
     primary_keys: t.ClassVar[list[str]] = ["id"]
-    replication_key = None
+    replication_key = "modifiedOn"
     schema = th.PropertiesList(
         th.Property(
             "id",
@@ -230,8 +79,9 @@ class BusinessTaxonomySubcapabilitiesStream(gapiStream):
 
     name = "subcapabilities"
     path = "/business/taxonomy/subcapabilities?includeInactive=true"
+    scope = "business/taxonomy"
     primary_keys: t.ClassVar[list[str]] = ["id"]
-    replication_key = None
+    replication_key = "modifiedOn"
     schema = th.PropertiesList(
         th.Property(
             "id",
@@ -258,8 +108,9 @@ class BusinessTaxonomyGroupsStream(gapiStream):
 
     name = "groups"
     path = "/business/taxonomy/groups?includeInactive=true"
+    scope = "business/taxonomy"
     primary_keys: t.ClassVar[list[str]] = ["id"]
-    replication_key = None
+    replication_key = "modifiedOn"
     schema = th.PropertiesList(
         th.Property(
             "id",
@@ -285,8 +136,9 @@ class BusinessTaxonomyTaxonomyTypesStream(gapiStream):
 
     name = "taxonomy_types"
     path = "/business/taxonomy/types"
+    scope = "business/taxonomy"
     primary_keys: t.ClassVar[list[str]] = ["enterpriseId"]
-    replication_key = None
+    replication_key = "modifiedOn"
     schema = th.PropertiesList(
         th.Property("enterpriseId", th.StringType),
         th.Property("name", th.StringType),
@@ -316,8 +168,10 @@ class BusinessTaxonomyTaxonomyTypesCapabilities(gapiStream):
 
     name = "taxonomy_types_capabilities"
     path = "/business/taxonomy/types/capabilities"
+    scope = "business/taxonomy"
     primary_keys: t.ClassVar[list[str]] = ["enterpriseId"]
-    replication_key = None
+    hierarchy_keys = ("enterpriseId", "parentId")
+    replication_key = "modifiedOn"
     schema = th.PropertiesList(
         th.Property("enterpriseId", th.StringType),
         th.Property("name", th.StringType),
@@ -348,8 +202,10 @@ class BusinessTaxonomyTaxonomyTypesIndustriesStream(gapiStream):
 
     name = "taxonomy_types_industries"
     path = "/business/taxonomy/types/industries"
+    scope = "business/taxonomy"
     primary_keys: t.ClassVar[list[str]] = ["enterpriseId"]
-    replication_key = None
+    hierarchy_keys = ("enterpriseId", "parentId")
+    replication_key = "modifiedOn"
     schema = th.PropertiesList(
         th.Property("enterpriseId", th.StringType),
         th.Property("name", th.StringType),
@@ -378,8 +234,10 @@ class BusinessTaxonomyTaxonomyTypesCustomerOutcomesStream(gapiStream):
 
     name = "taxonomy_types_customer_outcomes"
     path = "/business/taxonomy/types/customer-outcomes"
+    scope = "business/taxonomy"
     primary_keys: t.ClassVar[list[str]] = ["enterpriseId"]
-    replication_key = None
+    hierarchy_keys = ("enterpriseId", "parentId")
+    replication_key = "modifiedOn"
     schema = th.PropertiesList(
         th.Property("enterpriseId", th.StringType),
         th.Property("name", th.StringType),
@@ -408,8 +266,10 @@ class BusinessTaxonomyTaxonomyTypesGoToMarketStream(gapiStream):
 
     name = "taxonomy_types_go_to_market"
     path = "/business/taxonomy/types/go-to-market"
+    scope = "business/taxonomy"
     primary_keys: t.ClassVar[list[str]] = ["enterpriseId"]
-    replication_key = None
+    hierarchy_keys = ("enterpriseId", "parentId")
+    replication_key = "modifiedOn"
     schema = th.PropertiesList(
         th.Property("enterpriseId", th.StringType),
         th.Property("name", th.StringType),
@@ -438,8 +298,10 @@ class BusinessTaxonomyTaxonomyTypesSlalomGeographyStream(gapiStream):
 
     name = "taxonomy_types_slalom_geography"
     path = "/business/taxonomy/types/slalom-geography"
+    scope = "business/taxonomy"
     primary_keys: t.ClassVar[list[str]] = ["enterpriseId"]
-    replication_key = None
+    hierarchy_keys = ("enterpriseId", "parentId")
+    replication_key = "modifiedOn"
     schema = th.PropertiesList(
         th.Property("enterpriseId", th.StringType),
         th.Property("name", th.StringType),
@@ -476,8 +338,9 @@ class BusinessTaxonomyLocationsStream(gapiStream):
 
     name = "locations"
     path = "/business/taxonomy/locations"
+    scope = "business/taxonomy"
     primary_keys: t.ClassVar[list[str]] = ["enterpriseId"]
-    replication_key = None
+    replication_key = "modifiedOn"
     schema = th.PropertiesList(
         th.Property("enterpriseId", th.StringType),
         th.Property("name", th.StringType),
@@ -510,8 +373,10 @@ class BusinessTaxonomyTaxonomyTypesSGAStream(gapiStream):
 
     name = "taxonomy_types_sga"
     path = "/business/taxonomy/types/sga"
+    scope = "business/taxonomy"
     primary_keys: t.ClassVar[list[str]] = ["enterpriseId"]
-    replication_key = None
+    hierarchy_keys = ("enterpriseId", "parentId")
+    replication_key = "modifiedOn"
     schema = th.PropertiesList(
         th.Property("enterpriseId", th.StringType),
         th.Property("name", th.StringType),
@@ -540,8 +405,10 @@ class BusinessTaxonomyTaxonomyTypesCustomersStream(gapiStream):
 
     name = "taxonomy_types_customers"
     path = "/business/taxonomy/types/customers"
+    scope = "business/taxonomy"
     primary_keys: t.ClassVar[list[str]] = ["enterpriseId"]
-    replication_key = None
+    hierarchy_keys = ("enterpriseId", "parentId")
+    replication_key = "modifiedOn"
     schema = th.PropertiesList(
         th.Property("enterpriseId", th.StringType),
         th.Property("name", th.StringType),
@@ -566,4 +433,22 @@ class BusinessTaxonomyTaxonomyTypesCustomersStream(gapiStream):
         th.Property("enterpriseCustomerId", th.StringType),
         th.Property("hasMajorEligibleChildren", th.BooleanType),
         th.Property("hasMinorEligibleChildren", th.BooleanType),
-    ).to_dict()
\ No newline at end of file
+    ).to_dict()
+
+
+#: Streams of the scope, in the order they are discovered and synced.
+STREAM_TYPES = [
+    BusinessTaxonomyMarketsStream,
+    BusinessTaxonomyCapabilitiesStream,
+    BusinessTaxonomySubcapabilitiesStream,
+    BusinessTaxonomyGroupsStream,
+    BusinessTaxonomyTaxonomyTypesStream,
+    BusinessTaxonomyTaxonomyTypesCapabilities,
+    BusinessTaxonomyTaxonomyTypesIndustriesStream,
+    BusinessTaxonomyTaxonomyTypesCustomerOutcomesStream,
+    BusinessTaxonomyTaxonomyTypesGoToMarketStream,
+    BusinessTaxonomyTaxonomyTypesSlalomGeographyStream,
+    BusinessTaxonomyLocationsStream,
+    BusinessTaxonomyTaxonomyTypesSGAStream,
+    BusinessTaxonomyTaxonomyTypesCustomersStream,
+]
@@ -0,0 +1,193 @@
+"""Streams of the ``finance/coa`` scope: the finance chart of accounts."""
+
+from __future__ import annotations
+
+from singer_sdk import typing as th  # JSON Schema typing helpers
+
+from tap_gapi.client import gapiStream, paginatedGapiStream
+from tap_gapi.lookup import denormalized_schema
+
+
+class FinanceCOACostCenterStream(paginatedGapiStream):
+    """Define custom stream."""
+
+    name = "costcenter"
+    path = "/finance/chart-of-account/cost-center"
+    scope = "finance/coa"
+    primary_keys = ["costCenterId"]
+    replication_key = "lastUpdateDate"
+    schema = th.PropertiesList(
+        th.Property("costCenterId", th.StringType),
+        th.Property("costCenterName", th.StringType),
+        th.Property("legalEntityId", th.StringType),
+        th.Property("geographyId", th.StringType),
+        th.Property("organizationId", th.StringType),
+        th.Property("departmentId", th.StringType),
+        th.Property("functionType", th.StringType),
+        th.Property("marketId", th.StringType),
+        th.Property("marketName", th.StringType),
+        th.Property("revenueEligibleFlag", th.BooleanType),
+        th.Property("peopleEligibleFlag", th.BooleanType),
+        th.Property("peopleAlignmentType", th.StringType),
+        th.Property("effectiveStartDate", th.StringType),
+        th.Property("effectiveEndDate", th.StringType),
+        th.Property("creationDate", th.StringType),
+        th.Property("lastUpdateDate", th.StringType),
+        th.Property("functionId", th.StringType),
+        th.Property("gtmMarketId", th.StringType),
+        th.Property("gtmMarketName", th.StringType),
+        th.Property("gtmCountryRegionId", th.StringType),
+        th.Property("gtmCountryRegionName", th.StringType),
+    ).to_dict()
+
+class FinanceCOAFunctionStream(gapiStream):
+    """Define custom stream."""
+
+    name = "function"
+    path = "/finance/chart-of-account/function"
+    scope = "finance/coa"
+    primary_keys = ["functionId"]
+    hierarchy_keys = ("functionId", "functionParentId")
+    replication_key = "lastUpdateDate"
+    schema = th.PropertiesList(
+        th.Property("functionId", th.StringType),
+        th.Property("functionName", th.StringType),
+        th.Property("functionType", th.StringType),
+        th.Property("functionHierarchy", th.StringType),
+        th.Property("functionHierarchyLevel", th.StringType),
+        th.Property("functionParentId", th.StringType),
+        th.Property("peopleEligibleFlag", th.BooleanType),
+        th.Property("revenueEligibleFlag", th.BooleanType),
+        th.Property("postingAllowedFlag", th.BooleanType),
+        th.Property("plAlignment", th.StringType),
+        th.Property("effectiveStartDate", th.StringType),
+        th.Property("effectiveEndDate", th.StringType),
+        th.Property("creationDate", th.StringType),
+        th.Property("lastUpdateDate", th.StringType),
+        th.Property("utilizationEligible", th.BooleanType),
+        th.Property("peopleAlignmentType", th.StringType),
+        th.Property("workforceTaxonomyId", th.StringType),
+    ).to_dict()
+
+class FinanceCOAGeographyStream(gapiStream):
+    """Define custom stream."""
+
+    name = "geography"
+    path = "/finance/chart-of-account/geography"
+    scope = "finance/coa"
+    primary_keys = ["geographyId"]
+    hierarchy_keys = ("geographyId", "geographyParentId")
+    replication_key = "lastUpdateDate"
+    schema = th.PropertiesList(
+        th.Property("geographyId", th.StringType),
+        th.Property("geographyName", th.StringType),
+        th.Property("abbreviation", th.StringType),
+        th.Property("geographyHierarchyLevel", th.StringType),
+        th.Property("geographyType", th.StringType),
+        th.Property("geographyParentId", th.StringType),
+        th.Property("postingAllowedFlag", th.BooleanType),
+        th.Property("effectiveStartDate", th.StringType),
+        th.Property("effectiveEndDate", th.StringType),
+        th.Property("creationDate", th.StringType),
+        th.Property("lastUpdateDate", th.StringType),
+        th.Property("slalomGeoTaxonomyID", th.StringType)
+    ).to_dict()
+
+class FinanceCOALegalEntityStream(gapiStream):
+    """Define custom stream."""
+
+    name = "legalentity"
+    path = "/finance/chart-of-account/legal-entity"
+    scope = "finance/coa"
+    primary_keys = ["legalEntityId"]
+    hierarchy_keys = ("legalEntityId", "legalEntityParentId")
+    replication_key = "lastUpdateDate"
+    schema = th.PropertiesList(
+        th.Property("legalEntityName", th.StringType),
+        th.Property(
+            "legalEntityId",
+            th.StringType,
+            description="The legal entity's system ID",
+        ),
+        th.Property("legalEntityContractName", th.StringType),
+        th.Property("legalEntityParentId", th.StringType),
+        th.Property("legalEntityHierarchyLevel", th.StringType),
+        th.Property("legalEntityType", th.StringType),
+        th.Property("operationalEntity", th.StringType),
+        th.Property("abbreviation", th.StringType),
+        th.Property("postingAllowedFlag", th.BooleanType),
+        th.Property("primaryCurrencyCode", th.StringType),
+        th.Property("effectiveStartDate", th.StringType),
+        th.Property("effectiveEndDate", th.StringType),
+        th.Property("creationDate", th.StringType),
+        th.Property("lastUpdateDate", th.StringType),
+        th.Property("operationalStatus", th.StringType)
+    ).to_dict()
+
+class FinanceCOAOrganizationStream(gapiStream):
+    """Define custom stream."""
+
+    name = "organization"
+    path = "/finance/chart-of-account/organization"
+    scope = "finance/coa"
+    primary_keys = ["organizationId"]
+    hierarchy_keys = ("organizationId", "organizationParentId")
+    replication_key = "lastUpdateDate"
+    schema = th.PropertiesList(
+        th.Property("organizationName", th.StringType),
+        th.Property(
+            "organizationId",
+            th.StringType,
+            description="The organizations's system ID",
+        ),
+        th.Property(
+            "abbreviation",
+            th.StringType,
+        ),
+        th.Property("organizationHierarchyLevel", th.StringType),
+        th.Property("organizationFunctionProfile", th.StringType),
+        th.Property("organizationType", th.StringType),
+        th.Property("organizationType2", th.StringType),
+        th.Property("organizationParentId", th.StringType),
+        th.Property("peopleEligibleFlag", th.BooleanType),
+        th.Property("postingAllowedFlag", th.BooleanType),
+        th.Property("effectiveStartDate", th.StringType),
+        th.Property("effectiveEndDate", th.StringType),
+        th.Property("creationDate", th.StringType),
+        th.Property("lastUpdateDate", th.StringType),
+    ).to_dict()
+
+
+class FinanceCOACostCenterDenormalizedStream(gapiStream):
+    """Cost centers joined with the chart-of-account dimensions they point at.
+
+    The cost centers and the dimensions are indexed by key in memory as their
+    own streams sync, so no page is requested twice, and each cost center is
+    joined as it is written. Those not synced in full are fetched once on demand.
+    """
+
+    name = "costcenter_denormalized"
+    path = FinanceCOACostCenterStream.path
+    scope = FinanceCOACostCenterStream.scope
+    primary_keys = FinanceCOACostCenterStream.primary_keys
+    replication_key = FinanceCOACostCenterStream.replication_key
+    enabled_by = "denormalize_cost_centers"
+    records_from = FinanceCOACostCenterStream
+    dimensions = {
+        "legalEntity": (FinanceCOALegalEntityStream, "legalEntityId"),
+        "geography": (FinanceCOAGeographyStream, "geographyId"),
+        "organization": (FinanceCOAOrganizationStream, "organizationId"),
+        "function": (FinanceCOAFunctionStream, "functionId"),
+    }
+    schema = denormalized_schema(FinanceCOACostCenterStream.schema, dimensions)
+
+
+#: Streams of the scope, in the order they are discovered and synced.
+STREAM_TYPES = [
+    FinanceCOAOrganizationStream,
+    FinanceCOAFunctionStream,
+    FinanceCOACostCenterStream,
+    FinanceCOALegalEntityStream,
+    FinanceCOAGeographyStream,
+    FinanceCOACostCenterDenormalizedStream,
+]
@@ -2,10 +2,38 @@
 
 from __future__ import annotations
 
-from singer_sdk import Tap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Any, Callable
+
+import click
+import requests
+from singer_sdk import Stream, Tap
+from singer_sdk._singerlib import Message, RecordMessage, StateMessage
 from singer_sdk import typing as th  # JSON schema typing helpers
 
 from tap_gapi import streams
+from tap_gapi.streams import SCOPE_STREAM_TYPES
+from tap_gapi.auth import gapiAuthenticator
+from tap_gapi.catalog_cache import CatalogCache
+from tap_gapi.client import RequestScheduler
+from tap_gapi.engine import AsyncEngine
+from tap_gapi.hierarchy import HIERARCHY_STREAM_TYPES, HierarchyStream
+from tap_gapi.keyset import KeySetStore
+from tap_gapi.prefetch import RecordPrefetcher  # noqa: TCH001
+from tap_gapi.profiling import StreamProfiler
+from tap_gapi.response_cache import DEFAULT_MAX_BYTES, ResponseCache
+from tap_gapi.telemetry import Telemetry, trace
+from tap_gapi.transport import (
+    DEFAULT_POOL_SIZE,
+    build_session,
+    create_async_client,
+    httpx,
+)
+from tap_gapi.writer import DEFAULT_FLUSH_BYTES, FastMessageWriter
+
 
 class Tapgapi(Tap):
     """gapi tap class."""
@@ -29,9 +57,19 @@ class Tapgapi(Tap):
         ),
         th.Property(
             "scope",
-            th.StringType,
+            th.CustomType(
+                {
+                    "anyOf": [
+                        {"type": "string"},
+                        {"type": "array", "items": {"type": "string"}},
+                    ],
+                },
+            ),
             required=True,
-            description="The API scope that will be used by the tap",
+            description=(
+                "The API scope that will be used by the tap, or a list of scopes to "
+                "extract in a single run"
+            ),
         ),
         th.Property(
             "grant_type",
@@ -51,43 +89,839 @@ class Tapgapi(Tap):
             required=True,
             description="URL that the tap will send the client credentials to to receive a bearer token",
         ),
+        th.Property(
+            "start_date",
+            th.DateTimeType,
+            description=(
+                "The earliest lastUpdateDate / modifiedOn to extract when no bookmark "
+                "exists in state"
+            ),
+        ),
+        th.Property(
+            "token_cache_dir",
+            th.StringType,
+            description=(
+                "Directory where access tokens are cached between runs, in files "
+                "readable by the current user only. Disabled when unset"
+            ),
+        ),
+        th.Property(
+            "token_refresh_margin",
+            th.IntegerType,
+            default=60,
+            description="Seconds before expiry at which an access token is refreshed",
+        ),
+        th.Property(
+            "stream_responses",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Decode records incrementally from the socket instead of loading "
+                "each response body into memory"
+            ),
+        ),
+        th.Property(
+            "change_detection",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Keep content digests in state and only emit new, changed and "
+                "deleted records (flagged with _sdc_deleted_at)"
+            ),
+        ),
+        th.Property(
+            "delete_detection",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Keep the primary keys of each stream in state and emit a record "
+                "flagged with _sdc_deleted_at for every key missing since the "
+                "previous run. Implied by `change_detection`"
+            ),
+        ),
+        th.Property(
+            "key_set_dir",
+            th.StringType,
+            description=(
+                "Directory where the key sets of change and delete detection are "
+                "written when they exceed 1 MiB compressed, instead of the state. "
+                "Kept in the state when unset"
+            ),
+        ),
+        th.Property(
+            "checkpoint_every_pages",
+            th.IntegerType,
+            description=(
+                "Save the position of paginated streams in the state every N pages, "
+                "so an interrupted sync resumes from there instead of the first page"
+            ),
+        ),
+        th.Property(
+            "page_size",
+            th.IntegerType,
+            description=(
+                "Number of records requested per page of paginated streams. The "
+                "server default is used if unset"
+            ),
+        ),
+        th.Property(
+            "adaptive_page_size",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Grow the page size while the server answers quickly and shrink it "
+                "on slow responses, timeouts and 413 or 5xx errors"
+            ),
+        ),
+        th.Property(
+            "min_page_size",
+            th.IntegerType,
+            description="Smallest page size the adaptive page size shrinks to",
+        ),
+        th.Property(
+            "max_page_size",
+            th.IntegerType,
+            description="Largest page size the adaptive page size grows to",
+        ),
+        th.Property(
+            "page_latency_target",
+            th.NumberType,
+            description="Response time, in seconds, the adaptive page size aims for",
+        ),
+        th.Property(
+            "partition_filters",
+            th.ObjectType(additional_properties=th.ObjectType()),
+            description=(
+                "Split paginated streams into partitions, one per combination of "
+                "filter values, e.g. {\"costcenter\": {\"legalEntityId\": "
+                "[\"LE1\", \"LE2\"]}}. The values must cover every record"
+            ),
+        ),
+        th.Property(
+            "fast_coercion",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Coerce records with converters compiled once from each stream "
+                "schema, instead of the SDK's generic type conformance. Missing "
+                "properties are emitted as null"
+            ),
+        ),
+        th.Property(
+            "fast_writer",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Serialize Singer messages with orjson when installed and write "
+                "them to stdout in large buffered chunks"
+            ),
+        ),
+        th.Property(
+            "writer_flush_bytes",
+            th.IntegerType,
+            default=DEFAULT_FLUSH_BYTES,
+            description=(
+                "Size in bytes at which the fast writer writes out its buffer. It "
+                "is also written out after every STATE message"
+            ),
+        ),
+        th.Property(
+            "batch_config",
+            th.ObjectType(
+                th.Property(
+                    "encoding",
+                    th.ObjectType(
+                        th.Property(
+                            "format",
+                            th.StringType,
+                            allowed_values=["jsonl", "parquet"],
+                            description=(
+                                "Format of the batch files. Parquet requires the "
+                                "`parquet` extra"
+                            ),
+                        ),
+                        th.Property(
+                            "compression",
+                            th.StringType,
+                            allowed_values=["gzip", "none"],
+                            description="Compression of the batch files",
+                        ),
+                    ),
+                    description="Format and compression of the batch files",
+                ),
+                th.Property(
+                    "storage",
+                    th.ObjectType(
+                        th.Property(
+                            "root",
+                            th.StringType,
+                            description=(
+                                "Directory URL the batch files are written to, e.g. "
+                                "file:///tmp/batches, or s3://bucket/path with the "
+                                "`s3` extra"
+                            ),
+                        ),
+                        th.Property(
+                            "prefix",
+                            th.StringType,
+                            description="Prefix of the batch file names",
+                        ),
+                    ),
+                    description="Where the batch files are written",
+                ),
+                th.Property(
+                    "batch_size",
+                    th.IntegerType,
+                    description="Maximum number of records per batch file",
+                ),
+            ),
+            description=(
+                "Write records to batch files and emit BATCH messages pointing at "
+                "them, instead of RECORD messages"
+            ),
+        ),
+        th.Property(
+            "response_cache_dir",
+            th.StringType,
+            description=(
+                "Directory where API responses are cached between runs, for "
+                "development. Token responses are never cached. Disabled when unset"
+            ),
+        ),
+        th.Property(
+            "response_cache_ttl",
+            th.IntegerType,
+            default=3600,
+            description=(
+                "Seconds a cached response is reused before it is fetched again"
+            ),
+        ),
+        th.Property(
+            "response_cache_max_bytes",
+            th.IntegerType,
+            default=DEFAULT_MAX_BYTES,
+            description=(
+                "Size of the response cache above which the least recently used "
+                "responses are evicted"
+            ),
+        ),
+        th.Property(
+            "response_cache_replay_only",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Only replay cached responses, even expired ones, and fail on any "
+                "request that is not cached instead of sending it"
+            ),
+        ),
+        th.Property(
+            "prometheus_textfile",
+            th.StringType,
+            description=(
+                "Path of a Prometheus textfile, e.g. for the node exporter, where "
+                "per-stream request latencies, bytes, pages, records and time spent "
+                "decoding, serializing, backing off and throttled are written at "
+                "the end of the sync"
+            ),
+        ),
+        th.Property(
+            "opentelemetry",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Record a span for each API request. Requires the `otel` extra "
+                "and an OpenTelemetry SDK configured by the environment"
+            ),
+        ),
+        th.Property(
+            "hierarchy_streams",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Also emit a `<stream>_closure` closure table and a "
+                "`<stream>_paths` ancestor path stream for each stream holding a "
+                "tree, such as the chart-of-account and taxonomy hierarchies"
+            ),
+        ),
+        th.Property(
+            "denormalize_cost_centers",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Also emit a `costcenter_denormalized` stream, joining each cost "
+                "center synced by the `costcenter` stream with its legal entity, "
+                "geography, organization and function"
+            ),
+        ),
+        th.Property(
+            "catalog_cache_dir",
+            th.StringType,
+            description=(
+                "Directory where discovered catalogs are cached, by scope, tap "
+                "version and stream definitions, so `--discover` skips building "
+                "the streams. Bypassed by `--refresh-catalog`. Disabled when unset"
+            ),
+        ),
+        th.Property(
+            "profile_dir",
+            th.StringType,
+            description=(
+                "Directory where the sync is profiled to: per-stream hot "
+                "functions, allocation sites and flamegraph-compatible collapsed "
+                "stacks. Also set by the `--profile` option. Disabled when unset"
+            ),
+        ),
+        th.Property(
+            "http_pool_size",
+            th.IntegerType,
+            description=(
+                "Number of connections kept open per host. Defaults to "
+                f"{DEFAULT_POOL_SIZE}, or `max_parallel_streams` if larger"
+            ),
+        ),
+        th.Property(
+            "http2",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Send requests over HTTP/2. Requires the `http2` extra, falls back "
+                "to HTTP/1.1 with a warning otherwise"
+            ),
+        ),
+        th.Property(
+            "requests_per_second",
+            th.NumberType,
+            description=(
+                "Maximum sustained rate of API requests, shared by every stream. "
+                "Unlimited if unset"
+            ),
+        ),
+        th.Property(
+            "burst_size",
+            th.IntegerType,
+            description=(
+                "Number of requests that may be sent at once after an idle period. "
+                "Defaults to one second worth of requests"
+            ),
+        ),
+        th.Property(
+            "max_concurrent_requests_per_host",
+            th.IntegerType,
+            description=(
+                "Maximum number of requests in flight to a single host. Unlimited "
+                "if unset"
+            ),
+        ),
+        th.Property(
+            "engine",
+            th.StringType,
+            default="threads",
+            allowed_values=["threads", "asyncio"],
+            description=(
+                "How streams are fetched concurrently: on up to "
+                "`max_parallel_streams` threads, or all of them from one asyncio "
+                "event loop (requires the `http2` extra). Singer messages are "
+                "written in the same order either way"
+            ),
+        ),
+        th.Property(
+            "max_parallel_streams",
+            th.IntegerType,
+            default=1,
+            description=(
+                "Number of streams or stream partitions whose records are fetched "
+                "concurrently. Singer messages are still written by a single "
+                "writer, one stream at a time"
+            ),
+        ),
     ).to_dict()
 
-    def discover_streams(self) -> list[streams.gapiStream]:
+    def __init__(
+        self,
+        *args,  # noqa: ANN002
+        profile_dir: str | None = None,
+        refresh_catalog: bool = False,
+        **kwargs,  # noqa: ANN003
+    ) -> None:
+        """Initialize the tap.
+
+        Args:
+            args: Positional arguments for `Tap`.
+            profile_dir: Directory the sync is profiled to, overriding the
+                `profile_dir` setting.
+            refresh_catalog: Discover the catalog again instead of reading it
+                from the catalog cache.
+            kwargs: Keyword arguments for `Tap`.
+        """
+        self._profile_dir = profile_dir
+        self._refresh_catalog = refresh_catalog
+        #: Indexes of the records of streams synced in full, used by other
+        #: streams, by stream name and kind of index.
+        self.record_indexes: dict[tuple[str, str], Any] = {}
+        self._authenticators: dict[str, gapiAuthenticator] = {}
+        self._authenticators_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    @property
+    def scopes(self) -> list[str]:
+        """Return the configured scopes, accepting a single scope or a list.
+
+        Returns:
+            The list of API scopes to extract.
+        """
+        scope = self.config["scope"]
+        return [scope] if isinstance(scope, str) else list(scope)
+
+    @property
+    def _http_pool_size(self) -> int:
+        return self.config.get("http_pool_size") or max(
+            DEFAULT_POOL_SIZE,
+            self.config.get("max_parallel_streams") or 1,
+        )
+
+    @cached_property
+    def requests_session(self) -> requests.Session:
+        """Return the HTTP session shared by every stream and authenticator.
+
+        Returns:
+            A pooled ``requests.Session``.
+        """
+        http2 = bool(self.config.get("http2"))
+        if http2 and httpx is None:
+            self.logger.warning(
+                "HTTP/2 requires the 'http2' extra of tap-gapi, using HTTP/1.1.",
+            )
+            http2 = False
+        return build_session(self._http_pool_size, http2=http2)
+
+    @cached_property
+    def request_scheduler(self) -> RequestScheduler:
+        """Return the scheduler every stream sends its requests through.
+
+        Returns:
+            The tap-wide ``RequestScheduler``.
+        """
+        return RequestScheduler(
+            requests_per_second=self.config.get("requests_per_second"),
+            burst_size=self.config.get("burst_size"),
+            max_concurrent_requests_per_host=self.config.get(
+                "max_concurrent_requests_per_host",
+            ),
+            metrics_logger=self.metrics_logger,
+        )
+
+    @cached_property
+    def response_cache(self) -> ResponseCache | None:
+        """Return the on-disk cache of API responses, if enabled.
+
+        Returns:
+            The tap-wide ``ResponseCache``, or None.
+        """
+        cache_dir = self.config.get("response_cache_dir")
+        if not cache_dir:
+            return None
+        return ResponseCache(
+            cache_dir,
+            ttl=self.config.get("response_cache_ttl"),
+            max_bytes=self.config.get("response_cache_max_bytes") or DEFAULT_MAX_BYTES,
+            replay_only=bool(self.config.get("response_cache_replay_only")),
+        )
+
+    @cached_property
+    def telemetry(self) -> Telemetry:
+        """Return the telemetry of every stream of the tap.
+
+        Returns:
+            The tap-wide ``Telemetry``.
+        """
+        opentelemetry = bool(self.config.get("opentelemetry"))
+        if opentelemetry and trace is None:
+            self.logger.warning(
+                "OpenTelemetry spans require the 'otel' extra of tap-gapi.",
+            )
+        return Telemetry(opentelemetry=opentelemetry)
+
+    @cached_property
+    def profiler(self) -> StreamProfiler | None:
+        """Return the profiler of the sync, if profiling.
+
+        Returns:
+            The tap-wide ``StreamProfiler``, or None.
+        """
+        profile_dir = self._profile_dir or self.config.get("profile_dir")
+        if not profile_dir:
+            return None
+        return StreamProfiler(profile_dir)
+
+    @property
+    def streams(self) -> dict[str, Stream]:
+        """Get the streams, those built from other streams' records last.
+
+        The SDK orders streams by name. Derived and denormalized streams are
+        moved after the others, so the records they use are indexed as their
+        sources sync instead of being fetched again.
+
+        Returns:
+            A mapping of names to streams.
+        """
+        if self._streams is None:
+            self._streams = {
+                stream.name: stream
+                for stream in sorted(
+                    super().streams.values(),
+                    key=lambda stream: isinstance(stream, HierarchyStream)
+                    or bool(getattr(stream, "dimensions", None)),
+                )
+            }
+        return self._streams
+
+    @property
+    def catalog_json_text(self) -> str:
+        """Get the catalog JSON, from the catalog cache when enabled.
+
+        A catalog discovered while the cache is enabled is cached for the next
+        invocations.
+
+        Returns:
+            The tap's catalog as formatted JSON text.
+        """
+        cache_dir = self.config.get("catalog_cache_dir")
+        if not cache_dir:
+            return super().catalog_json_text
+        cache = CatalogCache(cache_dir)
+        key = cache.cache_key(self.config)
+        catalog_text = None if self._refresh_catalog else cache.load(key)
+        if catalog_text is None:
+            catalog_text = super().catalog_json_text
+            cache.store(key, catalog_text)
+        return catalog_text
+
+    @cached_property
+    def key_set_store(self) -> KeySetStore:
+        """Return where the key sets of change and delete detection are written.
+
+        Returns:
+            The tap-wide ``KeySetStore``.
+        """
+        return KeySetStore(self.config.get("key_set_dir"))
+
+    @cached_property
+    def indexed_stream_names(self) -> set[str]:
+        """Return the names of the streams other streams are built from.
+
+        Returns:
+            The names of the streams whose records are indexed, for the streams
+            denormalized against them or built from their records.
+        """
+        names = set()
+        for stream in self.streams.values():
+            if not stream.selected:
+                continue
+            names.update(
+                dimension_type.name
+                for dimension_type, _ in getattr(stream, "dimensions", {}).values()
+            )
+            records_from = getattr(stream, "records_from", None)
+            if records_from is not None:
+                names.add(records_from.name)
+        return names
+
+    def get_record_index(
+        self,
+        stream_type: type[streams.gapiStream],
+        kind: str,
+    ) -> Any:  # noqa: ANN401
+        """Return an index of a stream's records, fetching them if needed.
+
+        The records of a stream are indexed as it syncs. Those of a stream that
+        was not synced in full yet are fetched, without syncing the stream.
+
+        Args:
+            stream_type: The class of the indexed stream.
+            kind: The kind of index, e.g. ``hierarchy`` or ``lookup``.
+
+        Returns:
+            The index.
+        """
+        key = (stream_type.name, kind)
+        if key not in self.record_indexes:
+            for _ in stream_type(self).request_records(None):
+                pass
+        return self.record_indexes[key]
+
+    def get_authenticator(self, stream: streams.gapiStream) -> gapiAuthenticator:
+        """Return the authenticator for the stream's scope, creating it once.
+
+        Args:
+            stream: The stream requesting an authenticator.
+
+        Returns:
+            The authenticator shared by every stream of the same scope.
+        """
+        with self._authenticators_lock:
+            if stream.scope not in self._authenticators:
+                self._authenticators[stream.scope] = (
+                    gapiAuthenticator.create_for_stream(stream)
+                )
+            return self._authenticators[stream.scope]
+
+    def discover_streams(self) -> list[streams.gapiStream | HierarchyStream]:
         """Return a list of discovered streams.
 
+        Streams derived from hierarchical streams come last, so the streams they
+        are derived from are synced first.
+
         Returns:
             A list of discovered streams.
         """
-        tap_scope = self.config["scope"]
-        if tap_scope == 'finance/coa':
-            selected_streams = [
-            streams.FinanceCOAOrganizationStream(self),
-            streams.FinanceCOAFunctionStream(self),
-            streams.FinanceCOACostCenterStream(self),
-            streams.FinanceCOALegalEntityStream(self),
-            streams.FinanceCOAGeographyStream(self),
-            ]
-        elif tap_scope == 'business/taxonomy':
-            selected_streams = [
-            streams.BusinessTaxonomyMarketsStream(self),
-            streams.BusinessTaxonomyCapabilitiesStream(self),
-            streams.BusinessTaxonomySubcapabilitiesStream(self),
-            streams.BusinessTaxonomyGroupsStream(self),
-            streams.BusinessTaxonomyTaxonomyTypesStream(self),
-            streams.BusinessTaxonomyTaxonomyTypesCapabilities(self),
-            streams.BusinessTaxonomyTaxonomyTypesIndustriesStream(self),
-            streams.BusinessTaxonomyTaxonomyTypesCustomerOutcomesStream(self),
-            streams.BusinessTaxonomyTaxonomyTypesGoToMarketStream(self),
-            streams.BusinessTaxonomyTaxonomyTypesSlalomGeographyStream(self),
-            streams.BusinessTaxonomyLocationsStream(self),
-            streams.BusinessTaxonomyTaxonomyTypesSGAStream(self),
-            streams.BusinessTaxonomyTaxonomyTypesCustomersStream(self),
+        selected_streams: list[streams.gapiStream | HierarchyStream] = []
+        derived_streams: list[HierarchyStream] = []
+        for tap_scope in self.scopes:
+            stream_types = [
+                stream_type
+                for stream_type in SCOPE_STREAM_TYPES.get(tap_scope, [])
+                if stream_type.enabled_by is None
+                or self.config.get(stream_type.enabled_by)
             ]
+            selected_streams.extend(stream_type(self) for stream_type in stream_types)
+            if self.config.get("hierarchy_streams"):
+                derived_streams.extend(
+                    derived_type(self, stream_type)
+                    for stream_type in stream_types
+                    if stream_type.hierarchy_keys
+                    for derived_type in HIERARCHY_STREAM_TYPES
+                )
+        return selected_streams + derived_streams
+
+    def create_async_client(self) -> Any | None:  # noqa: ANN401
+        """Create the HTTP client of the asyncio engine.
+
+        Returns:
+            An ``httpx.AsyncClient``, or None if ``httpx`` is not installed.
+        """
+        return create_async_client(
+            self._http_pool_size,
+            http2=bool(self.config.get("http2")),
+        )
+
+    def _sync_prefetched(
+        self,
+        start_prefetch: Callable[[streams.gapiStream], list[RecordPrefetcher]],
+    ) -> None:
+        """Sync all streams while their records are fetched in the background.
+
+        Args:
+            start_prefetch: Callable starting the prefetch of a stream.
+        """
+        prefetchers = [
+            prefetcher
+            for stream in self.streams.values()
+            if stream.selected and not stream.parent_stream_type
+            for prefetcher in start_prefetch(stream)
+        ]
+        try:
+            self._sync_streams()
+        finally:
+            for prefetcher in prefetchers:
+                prefetcher.cancel()
+
+    @cached_property
+    def _message_writer(self) -> FastMessageWriter | None:
+        if not self.config.get("fast_writer"):
+            return None
+        return FastMessageWriter(
+            flush_bytes=self.config.get("writer_flush_bytes") or DEFAULT_FLUSH_BYTES,
+        )
+
+    def write_message(self, message: Message) -> None:
+        """Write a message to stdout, through the fast writer if enabled.
+
+        Args:
+            message: The Singer message.
+        """
+        started = time.perf_counter()
+        if self._message_writer is None:
+            super().write_message(message)
         else:
-            selected_streams = []
+            self._message_writer.write_message(message)
+        if isinstance(message, RecordMessage):
+            self.telemetry.add_serialization(
+                message.stream,
+                time.perf_counter() - started,
+            )
+
+    def sync_all(self) -> None:
+        """Sync all streams, then write out any buffered message and telemetry."""
+        try:
+            if self.profiler is None:
+                self._sync_all_streams()
+            else:
+                with self.profiler:
+                    self._sync_all_streams()
+                self.logger.info(
+                    "Wrote the profile of the sync to %s.",
+                    self.profiler.directory,
+                )
+        finally:
+            if self._message_writer is not None:
+                self._message_writer.flush()
+            self.telemetry.log(self.metrics_logger)
+            textfile = self.config.get("prometheus_textfile")
+            if textfile:
+                self.telemetry.write_prometheus(textfile)
+
+    def _sync_all_streams(self) -> None:
+        """Sync all streams, fetching them concurrently when configured to.
+
+        With the ``asyncio`` engine, every stream is fetched from one event loop.
+        Otherwise up to ``max_parallel_streams`` are prefetched on threads.
+        """
+        if self.config.get("engine") == "asyncio":
+            client = self.create_async_client()
+            if client is not None:
+                with AsyncEngine(client, name=f"{self.name}-engine") as engine:
+                    self._sync_prefetched(
+                        lambda stream: stream.start_async_prefetch(engine),
+                    )
+                return
+            self.logger.warning(
+                "The asyncio engine requires the 'http2' extra of tap-gapi, "
+                "using threads.",
+            )
+
+        max_parallel_streams = self.config.get("max_parallel_streams") or 1
+        if max_parallel_streams <= 1:
+            self._sync_streams()
+            return
+        with ThreadPoolExecutor(
+            max_workers=max_parallel_streams,
+            thread_name_prefix=self.name,
+        ) as executor:
+            self._sync_prefetched(lambda stream: stream.start_prefetch(executor))
+
+    def _sync_streams(self) -> None:
+        """Sync every stream in turn, profiling each one when profiling.
+
+        This is the SDK's sync of all streams, with the sync of each top-level
+        stream wrapped in the profiler. Child streams are synced, and so
+        profiled, within their parent.
+        """
+        profiler = self.profiler
+        if profiler is None:
+            super().sync_all()
+            return
+
+        self._reset_state_progress_markers()
+        self._set_compatible_replication_methods()
+        self.write_message(StateMessage(value=self.state))
+        for stream in self.streams.values():
+            if not stream.selected and not stream.has_selected_descendents:
+                self.logger.info("Skipping deselected stream '%s'.", stream.name)
+                continue
+            if stream.parent_stream_type:
+                continue
+            with profiler.profile_stream(stream.name):
+                stream.sync()
+            stream.finalize_state_progress_markers()
+        for stream in self.streams.values():
+            stream.log_sync_costs()
+
+    @classmethod
+    def invoke(  # type: ignore[override]
+        cls,
+        *,
+        about: bool = False,
+        about_format: str | None = None,
+        config: tuple[str, ...] = (),
+        state: str | None = None,
+        catalog: str | None = None,
+        profile: str | None = None,
+        refresh_catalog: bool = False,
+    ) -> None:
+        """Invoke the tap's command line interface.
 
-        return selected_streams 
+        Args:
+            about: Display package metadata and settings.
+            about_format: Specify output style for `--about`.
+            config: Configuration file location or 'ENV' to use environment
+                variables. Accepts multiple inputs as a tuple.
+            state: Use a bookmarks file for incremental replication.
+            catalog: Use a Singer catalog file with the tap.
+            profile: Profile the sync to this directory.
+            refresh_catalog: Bypass the catalog cache.
+        """
+        super(Tap, cls).invoke(about=about, about_format=about_format)
+        cls.print_version(print_fn=cls.logger.info)
+        config_files, parse_env_config = cls.config_from_cli_args(*config)
+
+        tap = cls(
+            config=config_files,  # type: ignore[arg-type]
+            state=state,
+            catalog=catalog,
+            parse_env_config=parse_env_config,
+            validate_config=True,
+            profile_dir=profile,
+            refresh_catalog=refresh_catalog,
+        )
+        tap.sync_all()
+
+    @classmethod
+    def cb_discover(
+        cls,
+        ctx: click.Context,
+        param: click.Option,  # noqa: ARG003
+        value: bool,  # noqa: FBT001
+    ) -> None:
+        """CLI callback to run the tap in discovery mode.
+
+        Args:
+            ctx: Click context.
+            param: Click option.
+            value: Whether to run in discovery mode.
+        """
+        if not value:
+            return
+
+        config_args = ctx.params.get("config", ())
+        config_files, parse_env_config = cls.config_from_cli_args(*config_args)
+        tap = cls(
+            config=config_files,  # type: ignore[arg-type]
+            parse_env_config=parse_env_config,
+            validate_config=False,
+            setup_mapper=False,
+            refresh_catalog=ctx.params.get("refresh_catalog", False),
+        )
+        tap.run_discovery()
+        ctx.exit()
+
+    @classmethod
+    def get_singer_command(cls) -> click.Command:
+        """Return the tap's command, with `--profile` and `--refresh-catalog`.
+
+        Returns:
+            A click.Command object.
+        """
+        command = super().get_singer_command()
+        command.params.append(
+            click.Option(
+                ["--profile"],
+                help=(
+                    "Profile the sync and write per-stream reports and "
+                    "flamegraph-compatible collapsed stacks to this directory."
+                ),
+                type=click.Path(file_okay=False),
+            ),
+        )
+        command.params.append(
+            click.Option(
+                ["--refresh-catalog"],
+                is_flag=True,
+                # Parsed before `--discover`, whose callback reads it.
+                is_eager=True,
+                help="Discover the catalog again instead of reading it from cache.",
+            ),
+        )
+        return command
 
 
 if __name__ == "__main__":
@@ -0,0 +1,317 @@
+"""Per-stream performance telemetry, logged as METRIC lines and exported."""
+
+from __future__ import annotations
+
+import bisect
+import collections
+import enum
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from singer_sdk import metrics
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover - optional dependency
+    trace = None
+
+# Upper bounds, in seconds, of the request latency histogram buckets.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROMETHEUS_PREFIX = "tap_gapi"
+
+
+class TelemetryMetric(str, enum.Enum):
+    """Metrics collected for every stream."""
+
+    HTTP_REQUEST_LATENCY = "http_request_latency"
+    HTTP_RESPONSE_BYTES = "http_response_bytes"
+    PAGE_COUNT = "page_count"
+    RECORDS_PARSED = "records_parsed"
+    DECODE_DURATION = "decode_duration"
+    SERIALIZATION_DURATION = "serialization_duration"
+    BACKOFF_DURATION = "backoff_duration"
+    THROTTLE_DURATION = "throttle_duration"
+    TOKEN_REQUEST_DURATION = "token_request_duration"
+
+
+# Metric type of the summary points, and the Prometheus name and unit.
+_SUMMARIES = {
+    TelemetryMetric.HTTP_RESPONSE_BYTES: ("counter", "http_response_bytes_total"),
+    TelemetryMetric.PAGE_COUNT: ("counter", "pages_total"),
+    TelemetryMetric.RECORDS_PARSED: ("counter", "records_parsed_total"),
+    TelemetryMetric.DECODE_DURATION: ("timer", "decode_seconds_total"),
+    TelemetryMetric.SERIALIZATION_DURATION: (
+        "timer",
+        "serialization_seconds_total",
+    ),
+    TelemetryMetric.BACKOFF_DURATION: ("timer", "backoff_seconds_total"),
+    TelemetryMetric.THROTTLE_DURATION: ("timer", "throttle_seconds_total"),
+}
+
+
+class LatencyHistogram:
+    """Count request latencies in the fixed ``LATENCY_BUCKETS``."""
+
+    def __init__(self) -> None:
+        """Create an empty histogram."""
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Count one latency.
+
+        Args:
+            seconds: The latency in seconds.
+        """
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self) -> dict[str, int]:
+        """Return the number of latencies at or below each bucket bound.
+
+        Returns:
+            The cumulative counts, keyed by upper bound, ending with ``+Inf``.
+        """
+        bounds = [str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+        total = 0
+        cumulative = {}
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            cumulative[bound] = total
+        return cumulative
+
+
+class StreamTelemetry:
+    """Counters of one stream, updated from any fetching thread."""
+
+    def __init__(self) -> None:
+        """Create empty counters."""
+        self.latency = LatencyHistogram()
+        self.totals: dict[TelemetryMetric, float] = collections.defaultdict(float)
+        self._lock = threading.Lock()
+
+    def add(self, metric: TelemetryMetric, value: float) -> None:
+        """Add to a counter or timer.
+
+        Args:
+            metric: The metric.
+            value: The amount to add.
+        """
+        with self._lock:
+            self.totals[metric] += value
+
+    def observe_request(self, seconds: float) -> None:
+        """Count the latency of one request.
+
+        Args:
+            seconds: The request latency in seconds.
+        """
+        with self._lock:
+            self.latency.observe(seconds)
+
+
+class Telemetry:
+    """Collect the telemetry of every stream of a tap.
+
+    Totals are logged as SDK METRIC lines once the sync is done, and can be
+    written to a Prometheus textfile. With OpenTelemetry installed and enabled,
+    each request is also recorded as a span.
+    """
+
+    def __init__(self, *, opentelemetry: bool = False) -> None:
+        """Create an empty collection.
+
+        Args:
+            opentelemetry: Record a span for each request, if the OpenTelemetry
+                API is installed.
+        """
+        self.streams: dict[str, StreamTelemetry] = {}
+        self.token_requests: dict[str, list[float]] = {}
+        self._serialization: dict[str, float] = collections.defaultdict(float)
+        self._lock = threading.Lock()
+        self.tracer = (
+            trace.get_tracer("tap-gapi") if opentelemetry and trace else None
+        )
+
+    def stream(self, name: str) -> StreamTelemetry:
+        """Return the counters of a stream, creating them once.
+
+        Args:
+            name: The stream name.
+
+        Returns:
+            The stream's counters.
+        """
+        with self._lock:
+            if name not in self.streams:
+                self.streams[name] = StreamTelemetry()
+            return self.streams[name]
+
+    def add_serialization(self, stream: str, seconds: float) -> None:
+        """Add the time spent writing a message of a stream.
+
+        Only called by the single Singer writer, so it takes no lock.
+
+        Args:
+            stream: The stream name.
+            seconds: The time spent.
+        """
+        self._serialization[stream] += seconds
+
+    def add_token_request(self, scope: str, seconds: float) -> None:
+        """Count a request to the token endpoint.
+
+        Args:
+            scope: The OAuth scope of the token.
+            seconds: The time the request took.
+        """
+        with self._lock:
+            totals = self.token_requests.setdefault(scope, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+
+    def trace_request(
+        self,
+        stream: str,
+        method: str,
+        url: str,
+        status_code: int,
+        seconds: float,
+    ) -> None:
+        """Record a finished request as an OpenTelemetry span.
+
+        Args:
+            stream: The stream name.
+            method: The HTTP method.
+            url: The request URL.
+            status_code: The response status code.
+            seconds: The request latency in seconds.
+        """
+        if self.tracer is None:
+            return
+        end = time.time_ns()
+        span = self.tracer.start_span(
+            f"{method} {stream}",
+            start_time=end - int(seconds * 1e9),
+            attributes={
+                "tap_gapi.stream": stream,
+                "http.request.method": method,
+                "url.full": url,
+                "http.response.status_code": status_code,
+            },
+        )
+        span.end(end_time=end)
+
+    def _merged_totals(self, name: str) -> dict[TelemetryMetric, float]:
+        totals = dict(self.stream(name).totals)
+        if name in self._serialization:
+            totals[TelemetryMetric.SERIALIZATION_DURATION] = self._serialization[name]
+        return totals
+
+    def points(self) -> Iterator[metrics.Point]:
+        """Return the summary of every stream as metric points.
+
+        Yields:
+            The points, tagged with the stream name.
+        """
+        for name in sorted(set(self.streams) | set(self._serialization)):
+            tags = {metrics.Tag.STREAM: name}
+            latency = self.stream(name).latency
+            if latency.count:
+                yield metrics.Point(
+                    "histogram",
+                    TelemetryMetric.HTTP_REQUEST_LATENCY,
+                    {
+                        "count": latency.count,
+                        "sum": round(latency.sum, 6),
+                        "buckets": latency.cumulative(),
+                    },
+                    tags,
+                )
+            totals = self._merged_totals(name)
+            for metric, (metric_type, _) in _SUMMARIES.items():
+                if metric in totals:
+                    value = totals[metric]
+                    value = round(value, 6) if metric_type == "timer" else int(value)
+                    yield metrics.Point(metric_type, metric, value, tags)
+        for scope, (count, seconds) in sorted(self.token_requests.items()):
+            yield metrics.Point(
+                "timer",
+                TelemetryMetric.TOKEN_REQUEST_DURATION,
+                round(seconds, 6),
+                {"scope": scope, "count": count},
+            )
+
+    def log(self, logger: logging.Logger) -> None:
+        """Log the summary of every stream as METRIC lines.
+
+        Args:
+            logger: The metrics logger.
+        """
+        for point in self.points():
+            metrics.log(logger, point)
+
+    def prometheus(self) -> str:
+        """Render the summary in the Prometheus text exposition format.
+
+        Returns:
+            The metrics, one sample per line.
+        """
+        lines: list[str] = []
+
+        def sample(name: str, labels: dict[str, Any], value: float) -> None:
+            label_text = ",".join(
+                f'{key}="{_escape(str(label))}"' for key, label in labels.items()
+            )
+            lines.append(f"{PROMETHEUS_PREFIX}_{name}{{{label_text}}} {value}")
+
+        names = sorted(set(self.streams) | set(self._serialization))
+        lines.append(
+            f"# TYPE {PROMETHEUS_PREFIX}_http_request_duration_seconds histogram",
+        )
+        for name in names:
+            latency = self.stream(name).latency
+            for bound, count in latency.cumulative().items():
+                sample(
+                    "http_request_duration_seconds_bucket",
+                    {"stream": name, "le": bound},
+                    count,
+                )
+            sample("http_request_duration_seconds_sum", {"stream": name}, latency.sum)
+            sample(
+                "http_request_duration_seconds_count",
+                {"stream": name},
+                latency.count,
+            )
+        for metric, (_, prometheus_name) in _SUMMARIES.items():
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{prometheus_name} counter")
+            for name in names:
+                value = self._merged_totals(name).get(metric, 0)
+                sample(prometheus_name, {"stream": name}, value)
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_token_request_seconds_total counter")
+        for scope, (_, seconds) in sorted(self.token_requests.items()):
+            sample("token_request_seconds_total", {"scope": scope}, seconds)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str | os.PathLike) -> None:
+        """Atomically write the summary to a Prometheus textfile.
+
+        Args:
+            path: The ``.prom`` file read by the node exporter.
+        """
+        path = Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(self.prometheus())
+        tmp_path.replace(path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,109 @@
+"""Persistent OAuth token cache shared by tap invocations."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class TokenCache:
+    """Store access tokens on disk, one owner-only file per client and scope.
+
+    Tokens are keyed by the token endpoint, client id and scope. A per-key lock
+    file serializes refreshes, so parallel runs wait for the first one to fetch a
+    token and then reuse it instead of all calling the token endpoint.
+    """
+
+    def __init__(self, directory: str | os.PathLike) -> None:
+        """Create a new cache.
+
+        Args:
+            directory: Directory holding the cached tokens.
+        """
+        self.directory = Path(directory).expanduser()
+
+    @staticmethod
+    def cache_key(auth_endpoint: str, client_id: str, scope: str) -> str:
+        """Return the cache key for a token.
+
+        Args:
+            auth_endpoint: The OAuth token endpoint.
+            client_id: The OAuth client id.
+            scope: The OAuth scope.
+
+        Returns:
+            A file-name safe key.
+        """
+        raw = "\n".join([auth_endpoint, client_id, scope]).encode()
+        return hashlib.sha256(raw).hexdigest()[:32]
+
+    def _ensure_directory(self) -> None:
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    @contextlib.contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """Hold an exclusive, cross-process lock for a key.
+
+        Args:
+            key: The cache key.
+
+        Yields:
+            Nothing, once the lock is held.
+        """
+        self._ensure_directory()
+        fd = os.open(self.directory / f"{key}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def load(self, key: str, min_ttl: float = 0) -> tuple[str, float | None] | None:
+        """Return a cached token that stays valid for at least ``min_ttl`` seconds.
+
+        Args:
+            key: The cache key.
+            min_ttl: Minimum remaining lifetime in seconds.
+
+        Returns:
+            The access token and its expiry as a UNIX timestamp (or None if it
+            never expires), or None if no usable token is cached.
+        """
+        try:
+            entry = json.loads((self.directory / f"{key}.json").read_text())
+        except (OSError, ValueError):
+            return None
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at - time.time() <= min_ttl:
+            return None
+        return entry["access_token"], expires_at
+
+    def store(self, key: str, access_token: str, expires_at: float | None) -> None:
+        """Atomically write a token readable by the current user only.
+
+        Args:
+            key: The cache key.
+            access_token: The access token.
+            expires_at: The token expiry as a UNIX timestamp, or None.
+        """
+        self._ensure_directory()
+        path = self.directory / f"{key}.json"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as tmp_file:
+            entry = {"access_token": access_token, "expires_at": expires_at}
+            json.dump(entry, tmp_file)
+        tmp_path.replace(path)
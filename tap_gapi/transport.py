@@ -0,0 +1,277 @@
+"""HTTP transport shared by every stream and authenticator of the tap."""
+
+from __future__ import annotations
+
+import contextlib
+import socket
+from typing import Any, Iterator
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.connection import HTTPConnection
+
+try:
+    import brotli  # noqa: F401
+except ImportError:  # pragma: no cover - optional dependency
+    try:
+        import brotlicffi  # noqa: F401
+    except ImportError:
+        BROTLI_AVAILABLE = False
+    else:
+        BROTLI_AVAILABLE = True
+else:
+    BROTLI_AVAILABLE = True
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+# Connections kept open per host when the tap settings do not override it.
+DEFAULT_POOL_SIZE = 10
+
+# Keep idle connections alive across long pauses, e.g. rate-limit waits.
+KEEPALIVE_SOCKET_OPTIONS = [
+    *HTTPConnection.default_socket_options,
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+
+def accept_encoding() -> str:
+    """Return the content encodings the transport can decode.
+
+    Returns:
+        The value of the ``Accept-Encoding`` header.
+    """
+    return "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """Pool connections per host and enable TCP keep-alive on them."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        """Create the pool manager with TCP keep-alive enabled.
+
+        Args:
+            args: Positional arguments for ``HTTPAdapter.init_poolmanager``.
+            kwargs: Keyword arguments for ``HTTPAdapter.init_poolmanager``.
+        """
+        kwargs.setdefault("socket_options", KEEPALIVE_SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+
+def httpx_timeout(timeout: float | tuple[float, float] | None) -> Any:  # noqa: ANN401
+    """Convert a ``requests`` timeout to an ``httpx`` one.
+
+    Args:
+        timeout: The request timeout, or a ``(connect, read)`` tuple.
+
+    Returns:
+        The equivalent ``httpx`` timeout.
+    """
+    if isinstance(timeout, tuple):
+        connect_timeout, read_timeout = timeout
+        return httpx.Timeout(read_timeout, connect=connect_timeout)
+    return timeout
+
+
+@contextlib.contextmanager
+def translate_errors(request: requests.PreparedRequest) -> Iterator[None]:
+    """Raise ``httpx`` network errors as their ``requests`` equivalent.
+
+    The SDK retries on ``requests`` exceptions only.
+
+    Args:
+        request: The request being sent.
+
+    Yields:
+        Nothing.
+
+    Raises:
+        ReadTimeout: If the server did not answer in time.
+        ConnectionError: If the request could not be sent.
+    """
+    try:
+        yield
+    except Exception as ex:
+        if httpx is None:
+            raise
+        if isinstance(ex, httpx.TimeoutException):
+            raise requests.exceptions.ReadTimeout(ex, request=request) from ex
+        if isinstance(ex, httpx.TransportError):
+            raise requests.exceptions.ConnectionError(ex, request=request) from ex
+        raise
+
+
+def to_requests_response(
+    http_response: Any,  # noqa: ANN401
+    request: requests.PreparedRequest,
+    connection: BaseAdapter | None = None,
+) -> requests.Response:
+    """Convert a complete ``httpx`` response to a ``requests.Response``.
+
+    Args:
+        http_response: The ``httpx`` response, with its body read.
+        request: The request that was sent.
+        connection: The adapter that sent the request, if any.
+
+    Returns:
+        The equivalent ``requests.Response``.
+    """
+    response = requests.Response()
+    response.status_code = http_response.status_code
+    response.reason = http_response.reason_phrase
+    response.headers = CaseInsensitiveDict(http_response.headers.items())
+    response._content = http_response.content  # noqa: SLF001
+    response._content_consumed = True  # noqa: SLF001
+    response.encoding = http_response.encoding
+    response.url = str(http_response.url)
+    response.elapsed = http_response.elapsed
+    response.request = request
+    response.connection = connection
+    return response
+
+
+async def send_async(
+    client: Any,  # noqa: ANN401
+    request: requests.PreparedRequest,
+    timeout: float | tuple[float, float] | None = None,
+) -> requests.Response:
+    """Send a prepared request with an ``httpx.AsyncClient``.
+
+    Args:
+        client: The asynchronous ``httpx`` client.
+        request: The prepared request.
+        timeout: The request timeout, or a ``(connect, read)`` tuple.
+
+    Returns:
+        The response, converted to a ``requests.Response``.
+    """
+    with translate_errors(request):
+        http_response = await client.request(
+            request.method,
+            request.url,
+            headers=dict(request.headers),
+            content=request.body,
+            timeout=httpx_timeout(timeout),
+        )
+    return to_requests_response(http_response, request)
+
+
+def create_async_client(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    *,
+    http2: bool = False,
+) -> Any | None:  # noqa: ANN401
+    """Create the ``httpx.AsyncClient`` used by the asyncio engine.
+
+    Args:
+        pool_size: Maximum number of open connections.
+        http2: Send requests over HTTP/2.
+
+    Returns:
+        The client, or None if ``httpx`` is not installed.
+    """
+    if httpx is None:
+        return None
+    return httpx.AsyncClient(
+        http2=http2,
+        headers={"Accept-Encoding": accept_encoding()},
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+        ),
+    )
+
+
+class HTTP2Adapter(BaseAdapter):
+    """Send ``requests`` requests over HTTP/2 with an ``httpx`` client.
+
+    Requests to one host are multiplexed over a single connection. Response
+    bodies are read in full, so streamed responses are buffered by this adapter.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE) -> None:
+        """Create a new adapter.
+
+        Args:
+            pool_size: Maximum number of open connections.
+
+        Raises:
+            ImportError: If ``httpx`` is not installed.
+        """
+        if httpx is None:
+            msg = "HTTP/2 support requires the 'http2' extra of tap-gapi"
+            raise ImportError(msg)
+        super().__init__()
+        self._client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+            ),
+        )
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,  # noqa: ARG002, FBT001, FBT002
+        timeout: float | tuple[float, float] | None = None,
+        verify: bool | str = True,  # noqa: ARG002, FBT002
+        cert: Any = None,  # noqa: ANN401, ARG002
+        proxies: dict | None = None,  # noqa: ARG002
+    ) -> requests.Response:
+        """Send a prepared request over HTTP/2.
+
+        Args:
+            request: The prepared request.
+            stream: Ignored, the body is always read in full.
+            timeout: The request timeout, or a ``(connect, read)`` tuple.
+            verify: Ignored, the ``httpx`` client verifies certificates.
+            cert: Ignored.
+            proxies: Ignored.
+
+        Returns:
+            The response, converted to a ``requests.Response``.
+        """
+        with translate_errors(request):
+            http2_response = self._client.request(
+                request.method,
+                request.url,
+                headers=dict(request.headers),
+                content=request.body,
+                timeout=httpx_timeout(timeout),
+            )
+        return to_requests_response(http2_response, request, connection=self)
+
+    def close(self) -> None:
+        """Close every connection of the client."""
+        self._client.close()
+
+
+def build_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    *,
+    http2: bool = False,
+) -> requests.Session:
+    """Create the pooled HTTP session of the tap.
+
+    Args:
+        pool_size: Number of connections kept open per host.
+        http2: Send requests over HTTP/2, which requires ``httpx``.
+
+    Returns:
+        A ``requests.Session`` reusing its connections across streams.
+    """
+    session = requests.Session()
+    session.headers["Accept-Encoding"] = accept_encoding()
+    session.headers["Connection"] = "keep-alive"
+    adapter: BaseAdapter = (
+        HTTP2Adapter(pool_size)
+        if http2
+        else KeepAliveAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -1,3 +1,151 @@
 """Test Configuration."""
 
+from __future__ import annotations
+
+import gzip
+import http.server
+import json
+import threading
+import urllib.parse
+
+import pytest
+import requests
+
 pytest_plugins = ("singer_sdk.testing.pytest_plugin",)
+
+OFFLINE_CONFIG = {
+    "client_id": "test-client",
+    "client_secret": "test-secret",
+    "scope": "finance/coa",
+    "grant_type": "client_credentials",
+    "url_base": "https://gapi.example.com",
+    "access_token_url": "https://auth.example.com/oauth2/token",
+}
+
+
+def build_response(
+    body: object,
+    status_code: int = 200,
+    headers: dict | None = None,
+    url: str = "https://gapi.example.com/finance/chart-of-account/cost-center",
+) -> requests.Response:
+    """Build a ``requests.Response`` holding ``body``."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = (  # noqa: SLF001
+        body if isinstance(body, bytes) else json.dumps(body).encode()
+    )
+    response.headers.update(headers or {})
+    response.url = url
+    return response
+
+
+class FakeGapi:
+    """In-process stand-in for the GAPI gateway and its token endpoint.
+
+    Routes map a URL path to either a response body or a callable receiving the
+    prepared request and the parsed query string and returning a response.
+    """
+
+    def __init__(self) -> None:
+        self.routes: dict[str, object] = {}
+        self.requests: list[requests.PreparedRequest] = []
+        self.token_requests = 0
+        self._lock = threading.Lock()
+
+    def send(self, request: requests.PreparedRequest, **_: object) -> requests.Response:
+        url = urllib.parse.urlsplit(request.url)
+        if request.url.startswith(OFFLINE_CONFIG["access_token_url"]):
+            with self._lock:
+                self.token_requests += 1
+            return build_response(
+                {"access_token": "token", "expires_in": 3600},
+                url=request.url,
+            )
+        with self._lock:
+            self.requests.append(request)
+        route = self.routes.get(url.path)
+        if route is None:
+            return build_response({"result": []}, url=request.url)
+        if callable(route):
+            query = dict(urllib.parse.parse_qsl(url.query))
+            response = route(request, query)
+            response.url = request.url
+            return response
+        return build_response(route, url=request.url)
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    """Local HTTP/1.1 server answering every GET with ``body``, gzipped on request.
+
+    It counts the TCP connections it accepts, to measure connection reuse.
+    """
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.body: object = {"result": []}
+        self.connections = 0
+        self.requests: list[dict[str, str]] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def get_request(self):  # noqa: ANN201
+        self.connections += 1
+        return super().get_request()
+
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.server.requests.append(dict(self.headers))
+        body = json.dumps(self.server.body).encode()
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            body = gzip.compress(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """Serve JSON over HTTP on a local port for the duration of a test."""
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def tap_config() -> dict:
+    """Return a minimal config that never needs to reach the API."""
+    return dict(OFFLINE_CONFIG)
+
+
+@pytest.fixture
+def make_response():
+    """Return a factory building ``requests.Response`` objects from a body."""
+    return build_response
+
+
+@pytest.fixture
+def fake_api(monkeypatch) -> FakeGapi:
+    """Route every HTTP request sent through ``requests`` to a ``FakeGapi``."""
+    api = FakeGapi()
+    monkeypatch.setattr(requests.Session, "send", api.send)
+    return api
@@ -0,0 +1,478 @@
+"""Record GAPI responses and replay them from a local server.
+
+Record fixtures from the live API, with every token redacted::
+
+    python -m tests.harness record config.json tests/fixtures
+
+Recordings hold real data, so ``tests/fixtures`` is ignored by git. They are JSON
+files, one per stream, holding the responses in the order they were received.
+``Fixtures`` replays them, or synthesizes records from the stream schemas, and
+``ReplayServer`` serves them over HTTP on a local port.
+
+``import_times`` measures what importing the tap costs a fresh interpreter.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import http.server
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import urllib.parse
+from pathlib import Path
+from typing import Callable, Iterator
+
+import requests
+
+from tap_gapi.client import gapiStream, paginatedGapiStream
+from tap_gapi.tap import SCOPE_STREAM_TYPES, Tapgapi
+
+# Keys whose values are replaced in recorded bodies, compared case-insensitively.
+REDACTED_KEYS = frozenset(
+    {"access_token", "refresh_token", "id_token", "client_secret", "authorization"},
+)
+REDACTED = "REDACTED"
+
+# Query parameters left out of fixture lookups, so any page size replays.
+IGNORED_PARAMS = frozenset({"limit"})
+
+DEFAULT_PAGE_SIZE = 500
+
+_Responder = Callable[[dict], bytes]
+
+
+def redact(value: object) -> object:
+    """Replace tokens and secrets in a decoded JSON body.
+
+    Args:
+        value: The decoded body.
+
+    Returns:
+        A copy of the body with the values of ``REDACTED_KEYS`` replaced.
+    """
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key.lower() in REDACTED_KEYS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def lookup_key(path: str, query: dict) -> tuple[str, str]:
+    """Return the key a response is recorded and replayed under.
+
+    Args:
+        path: The URL path, relative to ``url_base``.
+        query: The query parameters.
+
+    Returns:
+        The path and the sorted query string, without ``IGNORED_PARAMS``.
+    """
+    params = sorted((k, v) for k, v in query.items() if k not in IGNORED_PARAMS)
+    return path, urllib.parse.urlencode(params)
+
+
+def stream_types() -> list[type[gapiStream]]:
+    """Return the stream class of each endpoint of the tap.
+
+    Opt-in streams, which read the endpoint of another stream, are left out.
+
+    Returns:
+        The stream classes of all scopes.
+    """
+    return [
+        stream_type
+        for stream_type in itertools.chain.from_iterable(SCOPE_STREAM_TYPES.values())
+        if not stream_type.enabled_by
+    ]
+
+
+def import_times(code: str = "import tap_gapi.tap") -> dict[str, tuple[int, int]]:
+    """Run code in a fresh interpreter and return how long each import took.
+
+    Args:
+        code: The Python code to run with ``-X importtime``.
+
+    Returns:
+        The own and cumulative import time of each module, in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, module = line[len("import time:") :].split("|")
+        if own.strip().isdigit():
+            times[module.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def _stream_path(stream_type: type[gapiStream]) -> tuple[str, dict]:
+    url = urllib.parse.urlsplit(stream_type.path)
+    return url.path, dict(urllib.parse.parse_qsl(url.query))
+
+
+def _value_factory(name: str, schema: dict) -> Callable[[int], object]:
+    types = schema.get("type", [])
+    types = [types] if isinstance(types, str) else types
+    if "object" in types:
+        properties = {
+            key: _value_factory(key, item)
+            for key, item in schema.get("properties", {}).items()
+        }
+        return lambda index: {key: make(index) for key, make in properties.items()}
+    if "array" in types:
+        make_item = _value_factory(name, schema.get("items", {}))
+        return lambda index: [make_item(index)]
+    if "boolean" in types:
+        return lambda index: index % 2 == 0
+    if "integer" in types:
+        return lambda index: index
+    if "number" in types:
+        return lambda index: index * 1.5
+    if schema.get("format") == "date-time" or name.endswith("Date"):
+        return lambda _: "2024-01-01T00:00:00+00:00"
+    return lambda index: f"{name}-{index:08d}"
+
+
+def record_factory(stream_type: type[gapiStream]) -> Callable[[int], dict]:
+    """Return a function building records that match a stream schema.
+
+    Args:
+        stream_type: The stream class.
+
+    Returns:
+        A function of the record position, which makes its primary key unique,
+        returning a record with a value for every schema property.
+    """
+    return _value_factory(stream_type.name, stream_type.schema)
+
+
+class Fixtures:
+    """Responses of the GAPI gateway, recorded or synthesized."""
+
+    def __init__(self) -> None:
+        """Create an empty set of fixtures."""
+        self._responses: dict[tuple[str, str], bytes] = {}
+        self._responders: dict[str, _Responder] = {}
+
+    @classmethod
+    def load(cls, directory: str | os.PathLike) -> Fixtures:
+        """Load the recordings of a directory.
+
+        Args:
+            directory: Directory written by ``record``.
+
+        Returns:
+            The recorded fixtures.
+        """
+        fixtures = cls()
+        for path in sorted(Path(directory).glob("*.json")):
+            for exchange in json.loads(path.read_text())["exchanges"]:
+                key = lookup_key(exchange["path"], exchange["query"])
+                fixtures._responses[key] = json.dumps(exchange["body"]).encode()
+        return fixtures
+
+    @classmethod
+    def synthetic(
+        cls,
+        records: int = 10,
+        scale: dict[str, int] | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Fixtures:
+        """Synthesize responses for every stream of the tap.
+
+        Args:
+            records: Number of records of each stream.
+            scale: Number of records of specific streams, by stream name.
+            page_size: Records per page of paginated streams, unless the
+                request sets a ``limit``.
+
+        Returns:
+            The synthetic fixtures.
+        """
+        fixtures = cls()
+        for stream_type in stream_types():
+            count = (scale or {}).get(stream_type.name, records)
+            fixtures.add_synthetic(stream_type, count, page_size)
+        return fixtures
+
+    def add_synthetic(
+        self,
+        stream_type: type[gapiStream],
+        records: int,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> None:
+        """Serve synthetic records for a stream, generating each page on request.
+
+        Paginated streams are served as a ``lastEvaluatedKey`` chain, so millions
+        of records never have to be held in memory.
+
+        Args:
+            stream_type: The stream class.
+            records: Number of records of the stream.
+            page_size: Records per page of a paginated stream, unless the
+                request sets a ``limit``.
+        """
+        path, _ = _stream_path(stream_type)
+        make_record = record_factory(stream_type)
+        if not issubclass(stream_type, paginatedGapiStream):
+            items = [make_record(i) for i in range(records)]
+            body = json.dumps({"result": items}).encode()
+            self._responders[path] = lambda _: body
+            return
+
+        key_name = stream_type.primary_keys[0]
+
+        def respond(query: dict) -> bytes:
+            # The tap sends the key as URL-quoted JSON.
+            token = urllib.parse.unquote(query.get("nextToken") or "null")
+            last_key = json.loads(token)
+            start = int(last_key[key_name]) if last_key else 0
+            end = min(start + int(query.get("limit") or page_size), records)
+            result: dict = {
+                "items": [make_record(i) for i in range(start, end)],
+            }
+            if end < records:
+                result["lastEvaluatedKey"] = {key_name: f"{end:08d}"}
+            return json.dumps({"result": result}).encode()
+
+        self._responders[path] = respond
+
+    def respond(self, path: str, query: dict) -> bytes | None:
+        """Return the body of a request.
+
+        Args:
+            path: The URL path.
+            query: The query parameters.
+
+        Returns:
+            The response body, or None if no fixture matches.
+        """
+        body = self._responses.get(lookup_key(path, query))
+        if body is None and path in self._responders:
+            body = self._responders[path](query)
+        return body
+
+
+class ReplayServer(http.server.ThreadingHTTPServer):
+    """Local HTTP server replaying fixtures and issuing dummy tokens.
+
+    It counts the data requests it answers and the bytes of their bodies.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, fixtures: Fixtures) -> None:
+        """Create a server on a free local port.
+
+        Args:
+            fixtures: The responses to replay.
+        """
+        super().__init__(("127.0.0.1", 0), _ReplayHandler)
+        self.fixtures = fixtures
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the server."""
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def tap_config(self, **overrides: object) -> dict:
+        """Return a tap config pointing at this server.
+
+        Args:
+            overrides: Additional settings.
+
+        Returns:
+            The tap config.
+        """
+        return {
+            "client_id": "replay-client",
+            "client_secret": "replay-secret",
+            "scope": list(SCOPE_STREAM_TYPES),
+            "grant_type": "client_credentials",
+            "url_base": self.url,
+            "access_token_url": f"{self.url}/oauth2/token",
+            **overrides,
+        }
+
+    def count(self, body: bytes) -> None:
+        """Count a data response.
+
+        Args:
+            body: The response body.
+        """
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += len(body)
+
+
+@contextlib.contextmanager
+def replay_server(fixtures: Fixtures) -> Iterator[ReplayServer]:
+    """Serve fixtures on a local port for the duration of the block.
+
+    Args:
+        fixtures: The responses to replay.
+
+    Yields:
+        The running server.
+    """
+    server = ReplayServer(fixtures)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _ReplayHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: ReplayServer
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:  # noqa: N802
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        token = {"access_token": "replay-token", "expires_in": 3600}
+        self._send(200, json.dumps(token).encode())
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        body = self.server.fixtures.respond(url.path, query)
+        if body is None:
+            self._send(404, b'{"error": "no fixture"}')
+            return
+        self.server.count(body)
+        self._send(200, body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+class FixtureRecorder:
+    """Capture the successful data responses a tap receives, grouped by stream.
+
+    Token requests are not recorded, request headers are never kept and token
+    fields of response bodies are redacted.
+    """
+
+    def __init__(self, url_base: str) -> None:
+        """Create a new recorder.
+
+        Args:
+            url_base: The API URL root, stripped from recorded paths.
+        """
+        self.url_base = url_base.rstrip("/")
+        self.exchanges: dict[str, list[dict]] = {}
+        self._streams = {_stream_path(t)[0]: t.name for t in stream_types()}
+        self._lock = threading.Lock()
+
+    def observe(self, response: requests.Response) -> None:
+        """Record a response if it answers a stream request.
+
+        Args:
+            response: The response received by the tap.
+        """
+        url = response.request.url
+        if response.status_code != requests.codes.ok or not url.startswith(
+            self.url_base,
+        ):
+            return
+        relative = urllib.parse.urlsplit(url[len(self.url_base) :])
+        stream_name = self._streams.get(relative.path)
+        if stream_name is None:
+            return
+        exchange = {
+            "path": relative.path,
+            "query": dict(urllib.parse.parse_qsl(relative.query)),
+            "body": redact(response.json()),
+        }
+        with self._lock:
+            self.exchanges.setdefault(stream_name, []).append(exchange)
+
+    def hook(self, response: requests.Response, **_: object) -> None:
+        """Record a response, as a ``requests`` response hook.
+
+        Args:
+            response: The response received by the tap.
+        """
+        self.observe(response)
+
+    def save(self, directory: str | os.PathLike) -> list[Path]:
+        """Write one recording file per stream.
+
+        Args:
+            directory: The output directory.
+
+        Returns:
+            The written files.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for stream_name, exchanges in sorted(self.exchanges.items()):
+            path = directory / f"{stream_name}.json"
+            recording = {"stream": stream_name, "exchanges": exchanges}
+            path.write_text(json.dumps(recording, indent=2) + "\n")
+            paths.append(path)
+        return paths
+
+
+def record(config: dict, directory: str | os.PathLike) -> list[Path]:
+    """Sync every stream of the configured scopes and save their responses.
+
+    Args:
+        config: The tap config, with credentials for the live API.
+        directory: The output directory.
+
+    Returns:
+        The written recordings.
+    """
+    # Only the shared session of the threads engine sees every response.
+    tap = Tapgapi(config={**config, "engine": "threads", "response_cache_dir": None})
+    recorder = FixtureRecorder(config["url_base"])
+    tap.requests_session.hooks["response"].append(recorder.hook)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        tap.sync_all()
+    return recorder.save(directory)
+
+
+def main() -> None:
+    """Record fixtures from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="Record live responses")
+    record_parser.add_argument("config", help="Tap config file")
+    record_parser.add_argument("output", help="Directory of the recordings")
+    args = parser.parse_args()
+    config = json.loads(Path(args.config).read_text())
+    for path in record(config, args.output):
+        print(path)  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
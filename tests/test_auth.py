@@ -0,0 +1,53 @@
+"""Tests for gapi authentication and the on-disk token cache."""
+
+from __future__ import annotations
+
+import stat
+import time
+
+from tap_gapi.tap import Tapgapi
+from tap_gapi.token_cache import TokenCache
+
+
+def _fetch_token(tap_config) -> str:
+    tap = Tapgapi(config=tap_config)
+    authenticator = tap.streams["function"].authenticator
+    return authenticator.auth_headers["Authorization"]
+
+
+def test_token_is_reused_across_runs(tap_config, fake_api, tmp_path):
+    tap_config["token_cache_dir"] = str(tmp_path)
+
+    assert _fetch_token(tap_config) == "Bearer token"
+    assert _fetch_token(tap_config) == "Bearer token"
+
+    assert fake_api.token_requests == 1
+    token_files = list(tmp_path.glob("*.json"))
+    assert len(token_files) == 1
+    assert stat.S_IMODE(token_files[0].stat().st_mode) == 0o600
+
+
+def test_token_close_to_expiry_is_refreshed(tap_config, fake_api, tmp_path):
+    tap_config["token_cache_dir"] = str(tmp_path)
+    cache = TokenCache(tmp_path)
+    key = cache.cache_key(
+        tap_config["access_token_url"],
+        tap_config["client_id"],
+        tap_config["scope"],
+    )
+    cache.store(key, "stale", time.time() + 30)
+
+    assert _fetch_token(tap_config) == "Bearer token"
+    assert fake_api.token_requests == 1
+    assert cache.load(key)[0] == "token"
+
+
+def test_tokens_are_cached_per_scope(tmp_path):
+    cache = TokenCache(tmp_path)
+    finance = cache.cache_key("https://auth", "client", "finance/coa")
+    business = cache.cache_key("https://auth", "client", "business/taxonomy")
+    cache.store(finance, "a", None)
+
+    assert finance != business
+    assert cache.load(finance) == ("a", None)
+    assert cache.load(business) is None
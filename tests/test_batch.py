@@ -0,0 +1,120 @@
+"""Tests for BATCH messages and batch files."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import urllib.parse
+
+import pytest
+
+from tap_gapi.tap import Tapgapi
+
+COST_CENTERS = "/finance/chart-of-account/cost-center"
+
+
+def _messages(capsys) -> list[dict]:
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def _path(url: str) -> str:
+    return urllib.parse.urlparse(url).path
+
+
+def _paged_cost_centers(make_response, pages: int, per_page: int):
+    def route(request, query):
+        token = query.get("nextToken")
+        page = int(json.loads(urllib.parse.unquote(token))) if token else 0
+        result: dict = {
+            "items": [
+                {
+                    "costCenterId": f"c{page * per_page + i}",
+                    "revenueEligibleFlag": i % 2 == 0,
+                }
+                for i in range(per_page)
+            ],
+        }
+        if page + 1 < pages:
+            result["lastEvaluatedKey"] = str(page + 1)
+        return make_response({"result": result})
+
+    return route
+
+
+def test_records_are_written_to_gzip_jsonl_files(
+    tap_config, fake_api, capsys, make_response, tmp_path
+):
+    fake_api.routes[COST_CENTERS] = _paged_cost_centers(make_response, 3, 2)
+    tap_config["batch_config"] = {
+        "encoding": {"format": "jsonl", "compression": "gzip"},
+        "storage": {"root": f"file://{tmp_path}", "prefix": "gapi-"},
+        "batch_size": 4,
+    }
+    Tapgapi(config=tap_config).streams["costcenter"].sync()
+
+    messages = _messages(capsys)
+    assert not [m for m in messages if m["type"] == "RECORD"]
+    batches = [m for m in messages if m["type"] == "BATCH"]
+    assert [m["encoding"] for m in batches] == [
+        {"format": "jsonl", "compression": "gzip"},
+    ] * 2
+    records = []
+    for batch in batches:
+        (url,) = batch["manifest"]
+        assert _path(url).startswith(f"{tmp_path}/gapi-tap-gapi--costcenter-")
+        assert url.endswith(".json.gz")
+        with gzip.open(_path(url)) as file:
+            records.append([json.loads(line)["costCenterId"] for line in file])
+    assert records == [["c0", "c1", "c2", "c3"], ["c4", "c5"]]
+    assert [m["type"] for m in messages][-4:] == ["BATCH", "STATE"] * 2
+
+
+def test_checkpoints_are_only_written_after_their_batch(
+    tap_config, fake_api, capsys, make_response, tmp_path
+):
+    fake_api.routes[COST_CENTERS] = _paged_cost_centers(make_response, 4, 2)
+    tap_config["checkpoint_every_pages"] = 1
+    tap_config["batch_config"] = {
+        "encoding": {"format": "jsonl", "compression": "none"},
+        "storage": {"root": f"file://{tmp_path}"},
+        "batch_size": 3,
+    }
+    Tapgapi(config=tap_config).streams["costcenter"].sync()
+
+    batched = 0
+    tokens = []
+    for message in _messages(capsys):
+        if message["type"] == "BATCH":
+            (url,) = message["manifest"]
+            assert url.endswith(".json")
+            with open(_path(url), "rb") as file:
+                batched += len(file.readlines())
+        elif message["type"] == "STATE":
+            token = message["value"]["bookmarks"]["costcenter"].get("resume_token")
+            # Every record of the pages before the token is in a written file.
+            assert token is None or int(token) * 2 <= batched
+            tokens.append(token)
+    assert batched == 8
+    assert any(tokens)
+    assert tokens[-1] is None
+
+
+def test_records_are_written_to_parquet_files(
+    tap_config, fake_api, capsys, make_response, tmp_path
+):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    fake_api.routes[COST_CENTERS] = _paged_cost_centers(make_response, 2, 3)
+    tap_config["batch_config"] = {
+        "encoding": {"format": "parquet", "compression": "gzip"},
+        "storage": {"root": f"file://{tmp_path}"},
+        "batch_size": 5,
+    }
+    Tapgapi(config=tap_config).streams["costcenter"].sync()
+
+    manifests = [m["manifest"] for m in _messages(capsys) if m["type"] == "BATCH"]
+    tables = [parquet.read_table(_path(url)) for (url,) in manifests]
+    assert [table.num_rows for table in tables] == [5, 1]
+    # Column types come from the stream schema, not from each file's records.
+    assert tables[0].schema == tables[1].schema
+    assert str(tables[1].schema.field("revenueEligibleFlag").type) == "bool"
+    assert tables[1].column("costCenterId").to_pylist() == ["c5"]
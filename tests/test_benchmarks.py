@@ -0,0 +1,165 @@
+"""Micro-benchmarks of the hot paths of tap-gapi, against the SDK's defaults.
+
+Each benchmark group times the SDK's default path and the tap's own, so the
+pytest-benchmark table compares them side by side::
+
+    pytest tests/test_benchmarks.py --benchmark-group-by=group
+
+Requires ``pytest-benchmark``.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+
+import pytest
+import requests
+from singer_sdk._singerlib import RecordMessage
+from singer_sdk._singerlib import write_message as singer_write_message
+from singer_sdk.helpers._typing import (
+    TypeConformanceLevel,
+    conform_record_data_types,
+)
+from singer_sdk.helpers._util import utc_now
+from singer_sdk.helpers.jsonpath import extract_jsonpath
+
+from tap_gapi.client import gapiPaginator, parse_response_body
+from tap_gapi.coercion import RecordCoercer
+from tap_gapi.streams import FinanceCOACostCenterStream
+from tap_gapi.tap import Tapgapi
+from tap_gapi.writer import FastMessageWriter
+
+pytest.importorskip("pytest_benchmark")
+
+PAGES = 20
+
+
+def _page(size: int) -> bytes:
+    items = [
+        {
+            "costCenterId": f"CC{i:06d}",
+            "costCenterName": f"Cost center {i}",
+            "legalEntityId": "LE01",
+            "revenueEligibleFlag": True,
+            "lastUpdateDate": "2024-01-01T00:00:00Z",
+        }
+        for i in range(size)
+    ]
+    return json.dumps(
+        {"result": {"items": items, "lastEvaluatedKey": {"costCenterId": "x"}}},
+    ).encode()
+
+
+def _response(content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content  # noqa: SLF001
+    return response
+
+
+def _decode_twice(stream: FinanceCOACostCenterStream, content: bytes) -> None:
+    response = _response(content)
+    list(extract_jsonpath(stream.records_jsonpath, input=response.json()))
+    next(extract_jsonpath(stream.last_evaluated_key_jsonpath, response.json()), None)
+
+
+def _decode_once(stream: FinanceCOACostCenterStream, content: bytes) -> None:
+    response = _response(content)
+    list(stream.parse_response(response))
+    gapiPaginator(jsonpath=stream.last_evaluated_key_jsonpath).get_next(response)
+    assert parse_response_body(response) is parse_response_body(response)
+
+
+@pytest.mark.benchmark(group="page-decode")
+@pytest.mark.parametrize("decode", [_decode_twice, _decode_once], ids=["twice", "once"])
+def test_page_decode(benchmark, tap_config, decode):
+    stream = FinanceCOACostCenterStream(Tapgapi(config=tap_config))
+    benchmark(decode, stream, _page(5_000))
+
+
+@pytest.mark.benchmark(group="transport")
+@pytest.mark.parametrize("shared", [False, True], ids=["per-stream", "shared"])
+def test_transport_connections(benchmark, tap_config, stub_server, shared):
+    stub_server.body = json.loads(_page(1))
+    tap_config["url_base"] = stub_server.url
+    tap_config["scope"] = "business/taxonomy"
+    streams_count = len(Tapgapi(config=tap_config).streams)
+    url = f"{stub_server.url}/business/taxonomy"
+
+    def fetch() -> None:
+        if shared:
+            session = Tapgapi(config=tap_config).requests_session
+            for _ in range(streams_count * PAGES):
+                session.get(url, timeout=5).json()
+            return
+        for _ in range(streams_count):
+            with requests.Session() as session:
+                for _ in range(PAGES):
+                    session.get(url, timeout=5).json()
+
+    benchmark.pedantic(fetch, rounds=1, iterations=1)
+    benchmark.extra_info["connections"] = stub_server.connections
+    assert stub_server.connections == (1 if shared else streams_count)
+
+
+@pytest.mark.benchmark(group="record-coercion")
+@pytest.mark.parametrize("compiled", [False, True], ids=["sdk", "compiled"])
+def test_record_coercion(benchmark, tap_config, compiled):
+    stream = FinanceCOACostCenterStream(Tapgapi(config=tap_config))
+    properties = list(stream.schema["properties"])
+    records = [
+        {
+            **{name: f"{name}-{i}" for name in properties},
+            "revenueEligibleFlag": i % 2 == 0,
+            "peopleEligibleFlag": 1,
+            "unexpected": "x",
+        }
+        for i in range(5_000)
+    ]
+    coerce = RecordCoercer(stream.schema)
+
+    def conform() -> list[dict]:
+        if compiled:
+            return [coerce(record) for record in records]
+        return [
+            conform_record_data_types(
+                stream.name,
+                dict(record),
+                stream.schema,
+                TypeConformanceLevel.RECURSIVE,
+                stream.logger,
+            )
+            for record in records
+        ]
+
+    conformed = benchmark.pedantic(conform, rounds=3, iterations=1)
+    assert conformed[0]["peopleEligibleFlag"] is True
+
+
+@pytest.mark.benchmark(group="message-writer")
+@pytest.mark.parametrize("fast", [False, True], ids=["sdk", "fast"])
+def test_message_writer(benchmark, fast):
+    record = json.loads(_page(1))["result"]["items"][0]
+    messages = [
+        RecordMessage("costcenter", record, time_extracted=utc_now())
+        for _ in range(20_000)
+    ]
+
+    def write() -> None:
+        if fast:
+            with open(os.devnull, "wb") as devnull:
+                writer = FastMessageWriter(devnull)
+                for message in messages:
+                    writer.write_message(message)
+                writer.flush()
+            return
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for message in messages:
+                singer_write_message(message)
+
+    benchmark.pedantic(write, rounds=3, iterations=1)
+    benchmark.extra_info["records_per_second"] = round(
+        len(messages) / benchmark.stats.stats.mean,
+    )
@@ -0,0 +1,86 @@
+"""Tests for the discovery catalog cache."""
+
+from __future__ import annotations
+
+import json
+
+from click.testing import CliRunner
+
+from tap_gapi.catalog_cache import CatalogCache, cached_discovery
+from tap_gapi.tap import Tapgapi
+from tests.harness import import_times
+
+
+def test_cache_key_follows_scopes_and_discovery_settings(tap_config):
+    key = CatalogCache.cache_key(tap_config)
+
+    assert CatalogCache.cache_key({**tap_config, "client_secret": "other"}) == key
+    assert CatalogCache.cache_key({**tap_config, "scope": ["finance/coa"]}) == key
+    assert CatalogCache.cache_key({**tap_config, "scope": "business/taxonomy"}) != key
+    assert CatalogCache.cache_key({**tap_config, "hierarchy_streams": True}) != key
+
+
+def test_discovery_reads_the_cached_catalog(tap_config, tmp_path):
+    tap_config["catalog_cache_dir"] = str(tmp_path)
+    catalog_text = Tapgapi(config=tap_config).catalog_json_text
+    assert len(list(tmp_path.glob("catalog-*.json"))) == 1
+
+    tap = Tapgapi(config=tap_config, setup_mapper=False)
+    assert tap.catalog_json_text == catalog_text
+    assert tap._streams is None  # noqa: SLF001
+
+    (cached,) = tmp_path.glob("catalog-*.json")
+    cached.write_text("{}")
+    tap = Tapgapi(config=tap_config, setup_mapper=False, refresh_catalog=True)
+    assert tap.catalog_json_text == catalog_text
+    assert cached.read_text() == catalog_text
+
+
+def test_cached_discovery_needs_a_plain_discover_command(tap_config, tmp_path):
+    tap_config["catalog_cache_dir"] = str(tmp_path / "catalogs")
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(tap_config))
+    args = ["--config", str(config_file), "--discover"]
+
+    assert cached_discovery(args) is None
+    catalog_text = Tapgapi(config=tap_config).catalog_json_text
+    assert cached_discovery(args) == catalog_text
+    assert cached_discovery([f"--config={config_file}", "--discover"]) == catalog_text
+    assert cached_discovery([*args, "--refresh-catalog"]) is None
+    assert cached_discovery(["--config", "ENV", "--discover"]) is None
+    assert cached_discovery(["--config", str(config_file)]) is None
+
+
+def test_cached_discovery_does_not_import_the_sdk(tap_config, tmp_path):
+    tap_config["catalog_cache_dir"] = str(tmp_path)
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(tap_config))
+    Tapgapi(config=tap_config).catalog_json_text  # noqa: B018
+
+    modules = import_times(
+        "import sys\n"
+        "from tap_gapi import cli\n"
+        f"sys.argv = ['tap-gapi', '--config', {str(config_file)!r}, '--discover']\n"
+        "cli.main()",
+    )
+    assert "tap_gapi.cli" in modules
+    assert "singer_sdk" not in modules
+    assert "tap_gapi.tap" not in modules
+
+
+def test_refresh_catalog_option_bypasses_the_cache(tap_config, tmp_path):
+    tap_config["catalog_cache_dir"] = str(tmp_path)
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(tap_config))
+    catalog_text = Tapgapi(config=tap_config).catalog_json_text
+    (cached,) = tmp_path.glob("catalog-*.json")
+    cached.write_text("{}")
+    runner = CliRunner()
+
+    result = runner.invoke(Tapgapi.cli, ["--config", str(config_file), "--discover"])
+    assert result.output == "{}\n"
+    result = runner.invoke(
+        Tapgapi.cli,
+        ["--config", str(config_file), "--discover", "--refresh-catalog"],
+    )
+    assert result.output == f"{catalog_text}\n"
@@ -0,0 +1,100 @@
+"""Tests for content-hash change detection."""
+
+from __future__ import annotations
+
+import json
+
+from tap_gapi.keyset import KeySetStore
+from tap_gapi.tap import Tapgapi
+
+FUNCTIONS = "/finance/chart-of-account/function"
+
+
+def _sync(tap_config, state, capsys) -> tuple[list[dict], dict]:
+    tap = Tapgapi(config=tap_config, state=state)
+    tap.streams["function"].sync()
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [m["record"] for m in messages if m["type"] == "RECORD"]
+    return records, tap.state
+
+
+def _saved_keys(state: dict, stream: str = "function") -> list[str]:
+    key_set = state["bookmarks"][stream]["record_keys"]
+    return [key for key, _ in KeySetStore().load(key_set)]
+
+
+def test_only_changed_and_deleted_records_are_emitted(tap_config, fake_api, capsys):
+    tap_config["change_detection"] = True
+    fake_api.routes[FUNCTIONS] = {
+        "result": [
+            {"functionId": "a", "functionName": "A"},
+            {"functionId": "b", "functionName": "B"},
+            {"functionId": "c", "functionName": "C"},
+        ],
+    }
+    records, state = _sync(tap_config, {}, capsys)
+    assert [r["functionId"] for r in records] == ["a", "b", "c"]
+
+    records, state = _sync(tap_config, state, capsys)
+    assert records == []
+
+    fake_api.routes[FUNCTIONS] = {
+        "result": [
+            {"functionId": "a", "functionName": "A"},
+            {"functionId": "b", "functionName": "B2"},
+            {"functionId": "d", "functionName": "D"},
+        ],
+    }
+    records, state = _sync(tap_config, state, capsys)
+    assert [(r["functionId"], r.get("functionName")) for r in records] == [
+        ("b", "B2"),
+        ("d", "D"),
+        ("c", None),
+    ]
+    assert records[-1]["_sdc_deleted_at"]
+    assert _saved_keys(state) == ["a", "b", "d"]
+
+
+def test_not_modified_response_skips_stream(
+    tap_config, fake_api, capsys, make_response
+):
+    tap_config["change_detection"] = True
+    seen_headers = []
+
+    def route(request, query):
+        seen_headers.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return make_response(b"", status_code=304)
+        return make_response(
+            {"result": [{"functionId": "a"}]},
+            headers={"ETag": '"v1"'},
+        )
+
+    fake_api.routes[FUNCTIONS] = route
+    records, state = _sync(tap_config, {}, capsys)
+    assert len(records) == 1
+
+    records, state = _sync(tap_config, state, capsys)
+    assert records == []
+    assert seen_headers == [None, '"v1"']
+    assert _saved_keys(state) == ["a"]
+
+
+def test_delete_detection_emits_every_record_and_tombstones(
+    tap_config, fake_api, capsys
+):
+    tap_config["delete_detection"] = True
+    fake_api.routes[FUNCTIONS] = {
+        "result": [{"functionId": "a"}, {"functionId": "b"}],
+    }
+    _, state = _sync(tap_config, {}, capsys)
+    records, state = _sync(tap_config, state, capsys)
+    assert [r["functionId"] for r in records] == ["a", "b"]
+
+    fake_api.routes[FUNCTIONS] = {"result": [{"functionId": "b"}]}
+    records, state = _sync(tap_config, state, capsys)
+    assert [(r["functionId"], bool(r.get("_sdc_deleted_at"))) for r in records] == [
+        ("b", False),
+        ("a", True),
+    ]
+    assert _saved_keys(state) == ["b"]
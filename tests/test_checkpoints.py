@@ -0,0 +1,93 @@
+"""Tests for resumable pagination checkpoints."""
+
+from __future__ import annotations
+
+import json
+import urllib.parse
+
+import pytest
+from singer_sdk.exceptions import FatalAPIError
+
+from tap_gapi.tap import Tapgapi
+
+COST_CENTERS = "/finance/chart-of-account/cost-center"
+
+
+def _page(ids: list[str], last_evaluated_key: object = None) -> dict:
+    result: dict = {"items": [{"costCenterId": i} for i in ids]}
+    if last_evaluated_key:
+        result["lastEvaluatedKey"] = last_evaluated_key
+    return {"result": result}
+
+
+def _token(query: dict) -> object:
+    token = query.get("nextToken")
+    return json.loads(urllib.parse.unquote(token)) if token else None
+
+
+def _messages(capsys) -> list[dict]:
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_interrupted_sync_resumes_from_checkpoint(
+    tap_config, fake_api, capsys, make_response
+):
+    tap_config["checkpoint_every_pages"] = 1
+    tokens = []
+    fail = True
+
+    def route(request, query):
+        token = _token(query)
+        tokens.append(token)
+        if token is None:
+            return make_response(_page(["c1", "c2"], {"k": "2"}))
+        if token == {"k": "2"}:
+            return make_response(_page(["c3", "c4"], {"k": "4"}))
+        if fail:
+            return make_response({"error": "boom"}, status_code=400)
+        # The source shifted: a record of the checkpointed page shows up again.
+        return make_response(_page(["c4", "c5"]))
+
+    fake_api.routes[COST_CENTERS] = route
+    tap = Tapgapi(config=tap_config)
+    with pytest.raises(FatalAPIError):
+        tap.streams["costcenter"].sync()
+    messages = _messages(capsys)
+    records = [m["record"]["costCenterId"] for m in messages if m["type"] == "RECORD"]
+    assert records == ["c1", "c2", "c3", "c4"]
+    state = [m["value"] for m in messages if m["type"] == "STATE"][-1]
+    bookmark = state["bookmarks"]["costcenter"]
+    assert bookmark["resume_token"] == {"k": "4"}
+    assert bookmark["resume_boundary_keys"] == ["c3", "c4"]
+
+    fail = False
+    tokens.clear()
+    tap = Tapgapi(config=tap_config, state=state)
+    tap.streams["costcenter"].sync()
+    records = [
+        m["record"]["costCenterId"] for m in _messages(capsys) if m["type"] == "RECORD"
+    ]
+    assert tokens == [{"k": "4"}]
+    assert records == ["c5"]
+    assert "resume_token" not in tap.state["bookmarks"]["costcenter"]
+    assert "resume_boundary_keys" not in tap.state["bookmarks"]["costcenter"]
+
+
+def test_checkpoints_are_written_every_n_pages(
+    tap_config, fake_api, capsys, make_response
+):
+    tap_config["checkpoint_every_pages"] = 2
+
+    def route(request, query):
+        page = int(_token(query) or 0)
+        return make_response(_page([f"c{page}"], str(page + 1) if page < 4 else None))
+
+    fake_api.routes[COST_CENTERS] = route
+    Tapgapi(config=tap_config).streams["costcenter"].sync()
+    checkpoints = [
+        m["value"]["bookmarks"]["costcenter"].get("resume_token")
+        for m in _messages(capsys)
+        if m["type"] == "STATE"
+    ]
+    assert [token for token in checkpoints if token] == ["2", "4"]
+    assert checkpoints[-1] is None
@@ -0,0 +1,74 @@
+"""Tests for the gapi REST client helpers."""
+
+from __future__ import annotations
+
+import json
+from unittest import mock
+
+from tap_gapi import client
+from tap_gapi.streams import FinanceCOACostCenterStream
+from tap_gapi.tap import Tapgapi
+
+
+def _cost_center_page(size: int, next_key: dict | None = None) -> dict:
+    items = [{"costCenterId": str(i), "costCenterName": f"CC {i}"} for i in range(size)]
+    return {"result": {"items": items, "lastEvaluatedKey": next_key}}
+
+
+def test_response_body_is_decoded_once(tap_config, make_response):
+    stream = FinanceCOACostCenterStream(Tapgapi(config=tap_config))
+    response = make_response(_cost_center_page(3, {"costCenterId": "2"}))
+
+    with mock.patch.object(client, "loads_json", wraps=client.loads_json) as loads:
+        records = list(stream.parse_response(response))
+        next_token = stream.get_new_paginator().get_next(response)
+
+    assert [r["costCenterId"] for r in records] == ["0", "1", "2"]
+    assert next_token == {"costCenterId": "2"}
+    assert loads.call_count == 1
+
+
+def test_loads_json_matches_stdlib():
+    document = json.dumps(_cost_center_page(2)).encode()
+    assert client.loads_json(document) == json.loads(document)
+
+
+def _select(tap_config: dict, stream_name: str, properties: set[str]) -> Tapgapi:
+    catalog = Tapgapi(config=tap_config).catalog_dict
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            breadcrumb = metadata["breadcrumb"]
+            if entry["tap_stream_id"] == stream_name and breadcrumb:
+                metadata["metadata"]["selected"] = breadcrumb[1] in properties
+    return Tapgapi(config=tap_config, catalog=catalog)
+
+
+def test_records_are_projected_on_the_selected_properties(tap_config, make_response):
+    tap_config["fast_coercion"] = True
+    stream = _select(tap_config, "costcenter", {"costCenterName"}).streams["costcenter"]
+    page = _cost_center_page(2)
+    page["result"]["items"][0]["marketName"] = "deselected"
+
+    records = list(stream.parse_response(make_response(page)))
+    assert records == [
+        {"costCenterId": "0", "costCenterName": "CC 0"},
+        {"costCenterId": "1", "costCenterName": "CC 1"},
+    ]
+    assert stream.post_process(records[0]) == {
+        "costCenterId": "0",
+        "costCenterName": "CC 0",
+        "lastUpdateDate": None,
+    }
+    assert "fields" not in stream.get_url_params(None, None)
+
+    stream.fields_param = "fields"
+    params = stream.get_url_params(None, None)
+    assert params["fields"] == "costCenterId,costCenterName,lastUpdateDate"
+
+
+def test_streams_with_every_property_selected_are_not_projected(tap_config):
+    stream = FinanceCOACostCenterStream(Tapgapi(config=tap_config))
+    stream.fields_param = "fields"
+
+    assert stream._selected_properties is None  # noqa: SLF001
+    assert "fields" not in stream.get_url_params(None, None)
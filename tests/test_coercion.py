@@ -0,0 +1,73 @@
+"""Tests for the compiled record coercion."""
+
+from __future__ import annotations
+
+import datetime
+import json
+
+from tap_gapi.coercion import RecordCoercer
+from tap_gapi.streams import BusinessTaxonomyTaxonomyTypesStream
+from tap_gapi.tap import Tapgapi
+
+
+def test_coercer_follows_the_stream_schema():
+    coerce = RecordCoercer(BusinessTaxonomyTaxonomyTypesStream.schema)
+    record = coerce(
+        {
+            "enterpriseId": "T1",
+            "isActive": "true",
+            "isMajor": 0,
+            "levelMax": "3",
+            "createdOn": datetime.datetime(2024, 1, 2, 3, 4, 5),
+            "modifiedOn": "2024-01-02T03:04:05Z",
+            "unknown": "dropped",
+        },
+    )
+    schema = BusinessTaxonomyTaxonomyTypesStream.schema
+    assert list(record) == list(schema["properties"])
+    assert record["isActive"] is True
+    assert record["isMajor"] is False
+    assert record["levelMax"] == 3
+    assert record["createdOn"] == "2024-01-02T03:04:05+00:00"
+    assert record["modifiedOn"] == "2024-01-02T03:04:05Z"
+    assert record["isMinor"] is None
+    assert "unknown" not in record
+
+
+def test_coercer_handles_arrays_and_nested_objects():
+    coerce = RecordCoercer(
+        {
+            "properties": {
+                "flags": {"type": ["array", "null"], "items": {"type": ["boolean"]}},
+                "names": {"type": ["array", "null"], "items": {"type": ["string"]}},
+                "owner": {
+                    "type": ["object", "null"],
+                    "properties": {"age": {"type": ["integer", "null"]}},
+                },
+            },
+        },
+    )
+    record = coerce({"flags": ["1", "no"], "names": ["a"], "owner": {"age": 4.0}})
+    assert record == {"flags": [True, False], "names": ["a"], "owner": {"age": 4}}
+
+
+def test_fast_coercion_is_compiled_once_per_stream_class(
+    tap_config, fake_api, capsys
+):
+    tap_config.update(scope="business/taxonomy", fast_coercion=True)
+    fake_api.routes["/business/taxonomy/types"] = {
+        "result": [{"enterpriseId": "T1", "levelMax": "2", "extra": 1}],
+    }
+    first = Tapgapi(config=tap_config).streams["taxonomy_types"]
+    second = Tapgapi(config=tap_config).streams["taxonomy_types"]
+    assert first._record_coercer is second._record_coercer  # noqa: SLF001
+
+    second.sync()
+    records = [
+        json.loads(line)["record"]
+        for line in capsys.readouterr().out.splitlines()
+        if json.loads(line)["type"] == "RECORD"
+    ]
+    assert records[0]["levelMax"] == 2
+    assert records[0]["isActive"] is None
+    assert "extra" not in records[0]
@@ -0,0 +1,127 @@
+"""Tests for the asyncio execution engine."""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import requests
+
+from tap_gapi.client import gapiStream
+from tap_gapi.tap import Tapgapi
+
+
+class FakeAsyncClient:
+    """Asynchronous client answering from a ``FakeGapi`` after a delay."""
+
+    def __init__(self, api, latency: float) -> None:
+        self.api = api
+        self.latency = latency
+        self.in_flight = 0
+        self.peak = 0
+        self.threads: set[str] = set()
+        self.closed = False
+
+    async def request(self, method, url, headers, content, timeout):  # noqa: ARG002
+        self.threads.add(threading.current_thread().name)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        request = requests.Request(method, url, headers=headers).prepare()
+        response = self.api.send(request)
+        return SimpleNamespace(
+            status_code=response.status_code,
+            reason_phrase="OK",
+            headers=response.headers,
+            content=response.content,
+            encoding="utf-8",
+            url=url,
+            elapsed=datetime.timedelta(seconds=self.latency),
+        )
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def _messages(capsys) -> list[dict]:
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def _sync(tap_config, capsys, monkeypatch, client=None) -> list[dict]:
+    if client is not None:
+        monkeypatch.setattr(Tapgapi, "create_async_client", lambda _: client)
+    Tapgapi(config=tap_config).sync_all()
+    return [
+        (m["type"], m.get("stream"), m.get("record"))
+        for m in _messages(capsys)
+        if m["type"] in {"SCHEMA", "RECORD"}
+    ]
+
+
+def test_asyncio_engine_fetches_concurrently_in_singer_order(
+    tap_config, fake_api, capsys, monkeypatch
+):
+    for path, key in (
+        ("function", "functionId"),
+        ("geography", "geographyId"),
+        ("legal-entity", "legalEntityId"),
+        ("organization", "organizationId"),
+    ):
+        fake_api.routes[f"/finance/chart-of-account/{path}"] = {
+            "result": [{key: f"{path}-{i}"} for i in range(3)],
+        }
+    sequential = _sync(tap_config, capsys, monkeypatch)
+
+    tap_config["engine"] = "asyncio"
+    client = FakeAsyncClient(fake_api, latency=0.2)
+    start = time.perf_counter()
+    concurrent = _sync(tap_config, capsys, monkeypatch, client)
+    elapsed = time.perf_counter() - start
+
+    assert concurrent == sequential
+    assert len([m for m in concurrent if m[0] == "RECORD"]) == 12
+    assert elapsed < 0.6
+    assert client.peak == 5
+    assert len(client.threads) == 1
+    assert client.closed
+
+
+def test_asyncio_engine_falls_back_to_threads_without_httpx(
+    tap_config, fake_api, capsys, monkeypatch
+):
+    fake_api.routes["/finance/chart-of-account/function"] = {
+        "result": [{"functionId": "a"}],
+    }
+    tap_config["engine"] = "asyncio"
+    monkeypatch.setattr(Tapgapi, "create_async_client", lambda _: None)
+    messages = _sync(tap_config, capsys, monkeypatch)
+    assert ("RECORD", "function", {"functionId": "a"}) in messages
+
+
+def test_asyncio_engine_prepares_and_parses_off_the_event_loop(
+    tap_config, fake_api, capsys, monkeypatch
+):
+    fake_api.routes["/finance/chart-of-account/function"] = {
+        "result": [{"functionId": "a"}],
+    }
+    threads: dict[str, set[str]] = {"prepare_request": set(), "parse_response": set()}
+    for name, names in threads.items():
+        method = getattr(gapiStream, name)
+
+        def spy(self, *args, method=method, names=names, **kwargs):
+            names.add(threading.current_thread().name)
+            return method(self, *args, **kwargs)
+
+        monkeypatch.setattr(gapiStream, name, spy)
+    tap_config["engine"] = "asyncio"
+    client = FakeAsyncClient(fake_api, latency=0)
+    messages = _sync(tap_config, capsys, monkeypatch, client)
+
+    assert ("RECORD", "function", {"functionId": "a"}) in messages
+    (loop_thread,) = client.threads
+    assert all(names and loop_thread not in names for names in threads.values())
@@ -0,0 +1,132 @@
+"""Tests for the streams derived from hierarchical streams."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+
+from tap_gapi.hierarchy import Hierarchy
+from tap_gapi.tap import Tapgapi
+
+FUNCTIONS = "/finance/chart-of-account/function"
+
+
+def _hierarchy(links: dict[str, str | None]) -> Hierarchy:
+    hierarchy = Hierarchy()
+    for node_id, parent_id in links.items():
+        hierarchy.add(node_id, parent_id)
+    return hierarchy
+
+
+def test_closure_and_paths_of_a_tree():
+    # Children come before their parents.
+    hierarchy = _hierarchy({"c": "b", "b": "a", "a": None, "d": "a", "e": "e"})
+
+    closure = {
+        (row["ancestorId"], row["descendantId"]): row["depth"]
+        for row in hierarchy.closure()
+    }
+    assert closure == {
+        ("c", "c"): 0,
+        ("b", "c"): 1,
+        ("a", "c"): 2,
+        ("b", "b"): 0,
+        ("a", "b"): 1,
+        ("a", "a"): 0,
+        ("d", "d"): 0,
+        ("a", "d"): 1,
+        ("e", "e"): 0,
+    }
+    paths = {row["id"]: row for row in hierarchy.paths()}
+    assert paths["c"] == {
+        "id": "c",
+        "parentId": "b",
+        "rootId": "a",
+        "depth": 2,
+        "path": ["a", "b", "c"],
+        "isOrphan": False,
+        "inCycle": False,
+    }
+    assert paths["e"]["path"] == ["e"]
+
+
+def test_orphans_and_cycles_end_the_chain_of_ancestors():
+    hierarchy = _hierarchy(
+        {"x": "missing", "y": "x", "p": "q", "q": "r", "r": "p", "s": "p"},
+    )
+    paths = {row["id"]: row for row in hierarchy.paths()}
+
+    assert paths["x"]["isOrphan"]
+    assert paths["x"]["parentId"] == "missing"
+    assert paths["y"]["path"] == ["x", "y"]
+    assert not paths["y"]["isOrphan"]
+
+    assert {node for node, row in paths.items() if row["inCycle"]} == {"p", "q", "r"}
+    assert paths["p"]["path"] == ["r", "q", "p"]
+    assert paths["s"]["path"] == ["r", "q", "p", "s"]
+    assert paths["s"]["depth"] == 3
+    assert len(list(hierarchy.closure())) == sum(
+        len(row["path"]) for row in paths.values()
+    )
+
+
+def test_deep_chains_resolve_without_recursion():
+    hierarchy = Hierarchy()
+    for node in range(200_000, 0, -1):
+        hierarchy.add(node, node - 1 or None)
+    path = hierarchy.path("200000")
+    assert len(path) == 200_000
+    assert path[0] == "1"
+
+
+def _sync(config: dict) -> dict[str, list[dict]]:
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        Tapgapi(config=config).sync_all()
+    records: dict[str, list[dict]] = {}
+    for message in map(json.loads, output.getvalue().splitlines()):
+        if message["type"] == "RECORD":
+            records.setdefault(message["stream"], []).append(message["record"])
+    return records
+
+
+def test_derived_streams_reuse_the_synced_records(tap_config, fake_api):
+    tap_config["max_parallel_streams"] = 3
+    fake_api.routes[FUNCTIONS] = {
+        "result": [
+            {"functionId": "F1", "functionParentId": None},
+            {"functionId": "F2", "functionParentId": "F1"},
+        ],
+    }
+    tap_config["hierarchy_streams"] = True
+    records = _sync(tap_config)
+
+    assert [row["path"] for row in records["function_paths"]] == [
+        ["F1"],
+        ["F1", "F2"],
+    ]
+    assert len(records["function_closure"]) == 3
+    assert {"organization_paths", "geography_paths", "legalentity_paths"} <= set(
+        Tapgapi(config=tap_config).streams,
+    )
+    assert "costcenter_paths" not in Tapgapi(config=tap_config).streams
+    assert [request.path_url for request in fake_api.requests].count(FUNCTIONS) == 1
+
+
+def test_derived_streams_fetch_their_source_when_it_was_not_synced(
+    tap_config,
+    fake_api,
+):
+    fake_api.routes[FUNCTIONS] = {
+        "result": [{"functionId": "F1"}, {"functionId": "F2", "functionParentId": "F1"}],
+    }
+    tap_config["hierarchy_streams"] = True
+    stream = Tapgapi(config=tap_config).streams["function_closure"]
+
+    rows = list(stream.get_records(None))
+    assert {(row["ancestorId"], row["descendantId"]) for row in rows} == {
+        ("F1", "F1"),
+        ("F2", "F2"),
+        ("F1", "F2"),
+    }
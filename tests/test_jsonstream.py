@@ -0,0 +1,77 @@
+"""Tests for the incremental JSON reader."""
+
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+import requests
+
+from tap_gapi.client import gapiPaginator
+from tap_gapi.jsonstream import IncrementalJSONReader, jsonpath_to_keys
+from tap_gapi.streams import FinanceCOACostCenterStream
+from tap_gapi.tap import Tapgapi
+
+
+def _chunks(document: dict, size: int) -> list[bytes]:
+    raw = json.dumps(document).encode()
+    return [raw[i : i + size] for i in range(0, len(raw), size)]
+
+
+def test_jsonpath_to_keys():
+    assert jsonpath_to_keys("$.result[*]") == ("result",)
+    assert jsonpath_to_keys("$.result.items[*]") == ("result", "items")
+    assert jsonpath_to_keys("$..items[*]") is None
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_reader_yields_items_and_keeps_siblings(chunk_size):
+    document = {
+        "statusCode": 200,
+        "result": {
+            "lastEvaluatedKey": {"costCenterId": "12"},
+            "items": [{"id": 1, "amount": 12.5, "name": "café"}, {"id": 22}],
+            "count": 1234,
+        },
+    }
+    reader = IncrementalJSONReader(_chunks(document, chunk_size), ("result", "items"))
+
+    assert list(reader) == document["result"]["items"]
+    assert reader.skeleton == {
+        "statusCode": 200,
+        "result": {"lastEvaluatedKey": {"costCenterId": "12"}, "count": 1234},
+    }
+
+
+def test_reader_handles_empty_and_missing_arrays():
+    assert list(IncrementalJSONReader(_chunks({"result": []}, 3), ("result",))) == []
+    reader = IncrementalJSONReader(_chunks({"error": None}, 3), ("result",))
+    assert list(reader) == []
+    assert reader.skeleton == {"error": None}
+
+
+def test_streamed_parse_feeds_paginator(tap_config):
+    tap_config["stream_responses"] = True
+    stream = FinanceCOACostCenterStream(Tapgapi(config=tap_config))
+    body = {
+        "result": {
+            "items": [{"costCenterId": "1"}, {"costCenterId": "2"}],
+            "lastEvaluatedKey": {"costCenterId": "2"},
+        },
+    }
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(json.dumps(body).encode())
+
+    records = list(stream.parse_response(response))
+    paginator = gapiPaginator(jsonpath=stream.last_evaluated_key_jsonpath)
+
+    assert records == body["result"]["items"]
+    assert paginator.get_next(response) == {"costCenterId": "2"}
+
+
+def test_reader_projects_items_on_fields():
+    document = {"result": [{"id": 1, "name": "a", "extra": [1, 2]}, {"extra": 3}]}
+    reader = IncrementalJSONReader(_chunks(document, 5), ("result",), fields=("id",))
+    assert list(reader) == [{"id": 1}, {}]
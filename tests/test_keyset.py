@@ -0,0 +1,72 @@
+"""Tests for the compact key sets of delete detection."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from tap_gapi import keyset
+from tap_gapi.keyset import KeySetStore
+
+
+def test_key_sets_round_trip_with_and_without_digests():
+    entries = [("", b"0" * 8), ("a", b"1" * 8), ("ab", b"2" * 8), ("é", b"3" * 8)]
+    assert list(keyset.decode(keyset.encode(entries, 8))) == entries
+    keys = [(f"{index:08d}", b"") for index in range(1000)]
+    assert list(keyset.decode(keyset.encode(keys, 0))) == keys
+
+
+def test_keys_store_only_what_differs_from_the_previous_key():
+    long_prefix = "x" * 200
+    keys = ["", "a", "abc", "abd", "b"]
+    keys += [f"{long_prefix}1", f"{long_prefix}2", "é", "éa"]
+    entries = [(key, b"") for key in keys]
+    encoded = keyset.encode(entries, 0)
+
+    assert list(keyset.decode(encoded)) == entries
+    # The second long key only stores its last character.
+    single = keyset.encode([(f"{long_prefix}1", b""), (f"{long_prefix}2", b"")], 0)
+    assert len(single) < len(keyset.encode([(f"{long_prefix}1", b"")], 0)) + 8
+
+
+def test_key_sets_are_much_smaller_than_json():
+    keys = [(f"CC{index:010d}", b"") for index in range(100_000)]
+    key_set = KeySetStore().dump(keys, len(keys), 0)
+
+    assert key_set["count"] == len(keys)
+    assert len(key_set["data"]) * 20 < len(json.dumps([key for key, _ in keys]))
+
+
+def test_large_key_sets_go_to_a_sidecar_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(keyset, "SIDECAR_MIN_BYTES", 100)
+    store = KeySetStore(tmp_path)
+    keys = [(f"{index:x}", b"") for index in range(10_000)]
+
+    key_set = store.dump(keys, len(keys), 0)
+    assert "data" not in key_set
+    assert list(store.load(key_set)) == keys
+
+    # Files of the previous state outlive the save, until the state is replaced.
+    replacement = store.dump(keys[1:], len(keys) - 1, 0, previous=key_set)
+    assert list(store.load(key_set)) == keys
+    with pytest.raises(FileNotFoundError):
+        KeySetStore().load(replacement)
+
+
+def test_only_the_latest_sidecar_files_of_an_owner_are_kept(tmp_path, monkeypatch):
+    monkeypatch.setattr(keyset, "SIDECAR_MIN_BYTES", 100)
+    monkeypatch.setattr(keyset, "SIDECAR_KEEP", 1)
+    store = KeySetStore(tmp_path)
+    keys = [(f"{index:x}", b"") for index in range(10_000)]
+
+    other = store.dump(keys, len(keys), 0, owner="other")
+    key_sets = [None]
+    for index in range(3):
+        key_set = store.dump(keys[index:], 0, 0, owner="a", previous=key_sets[-1])
+        os.utime(tmp_path / key_set["file"], (index, index))
+        key_sets.append(key_set)
+
+    names = {path.name for path in tmp_path.iterdir()}
+    assert names == {other["file"], key_sets[-2]["file"], key_sets[-1]["file"]}
@@ -0,0 +1,115 @@
+"""Tests for the cost centers denormalized against the chart-of-account dimensions."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+
+from tap_gapi.lookup import LookupIndex
+from tap_gapi.tap import Tapgapi
+
+COA = "/finance/chart-of-account"
+DIMENSIONS = {
+    f"{COA}/legal-entity": {
+        "result": [{"legalEntityId": "L1", "legalEntityName": "Co"}],
+    },
+    f"{COA}/geography": {"result": [{"geographyId": "G1", "geographyName": "US"}]},
+    f"{COA}/organization": {"result": [{"organizationId": "O1"}]},
+    f"{COA}/function": {"result": [{"functionId": "F1", "functionName": "Sales"}]},
+}
+COST_CENTERS = {
+    "result": {
+        "items": [
+            {
+                "costCenterId": "C1",
+                "legalEntityId": "L1",
+                "geographyId": "G1",
+                "functionId": "F1",
+                "lastUpdateDate": "2024-01-01",
+            },
+            {"costCenterId": "C2", "functionId": "x", "lastUpdateDate": "2024-01-02"},
+        ],
+    },
+}
+
+
+def _sync(config: dict) -> dict[str, list[dict]]:
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        Tapgapi(config=config).sync_all()
+    records: dict[str, list[dict]] = {}
+    for message in map(json.loads, output.getvalue().splitlines()):
+        if message["type"] == "RECORD":
+            records.setdefault(message["stream"], []).append(message["record"])
+    return records
+
+
+def test_lookup_index_keeps_rows_as_tuples():
+    index = LookupIndex("id", ["id", "name"])
+    index.add_record({"id": 1, "name": "one", "ignored": True})
+    index.add_record({"name": "no key"})
+
+    assert len(index) == 1
+    assert index.get("1") == {"id": 1, "name": "one"}
+    assert index.get(None) is None
+    assert index.get("2") is None
+
+
+def test_the_denormalized_stream_is_opt_in(tap_config):
+    assert "costcenter_denormalized" not in Tapgapi(config=tap_config).streams
+    tap_config["denormalize_cost_centers"] = True
+    stream = Tapgapi(config=tap_config).streams["costcenter_denormalized"]
+    assert "geographyName" in stream.schema["properties"]["geography"]["properties"]
+
+
+def test_cost_centers_are_joined_with_the_synced_dimensions(tap_config, fake_api):
+    fake_api.routes.update(DIMENSIONS)
+    fake_api.routes[f"{COA}/cost-center"] = COST_CENTERS
+    tap_config["denormalize_cost_centers"] = True
+    records = _sync(tap_config)
+
+    joined = {row["costCenterId"]: row for row in records["costcenter_denormalized"]}
+    assert joined["C1"]["legalEntity"]["legalEntityName"] == "Co"
+    assert joined["C1"]["function"]["functionName"] == "Sales"
+    assert joined["C1"]["organization"] is None
+    assert joined["C2"]["function"] is None
+    assert "legalEntity" not in records["costcenter"][0]
+    paths = [request.path_url.partition("?")[0] for request in fake_api.requests]
+    for path in (*DIMENSIONS, f"{COA}/cost-center"):
+        assert paths.count(path) == 1
+
+
+def test_cost_center_pages_are_requested_once(tap_config, fake_api, make_response):
+    def route(request, query):  # noqa: ARG001
+        page = int(query.get("nextToken") or 0)
+        result: dict = {"items": [{"costCenterId": f"C{page}{i}"} for i in range(2)]}
+        if page < 2:  # noqa: PLR2004
+            result["lastEvaluatedKey"] = page + 1
+        return make_response({"result": result})
+
+    fake_api.routes[f"{COA}/cost-center"] = route
+    tap_config.update(
+        denormalize_cost_centers=True,
+        checkpoint_every_pages=1,
+        max_parallel_streams=2,
+    )
+    records = _sync(tap_config)
+
+    ids = [record["costCenterId"] for record in records["costcenter"]]
+    assert len(ids) == 6
+    assert [row["costCenterId"] for row in records["costcenter_denormalized"]] == ids
+    paths = [request.path_url.partition("?")[0] for request in fake_api.requests]
+    assert paths.count(f"{COA}/cost-center") == 3
+
+
+def test_dimensions_are_fetched_when_they_were_not_synced(tap_config, fake_api):
+    fake_api.routes.update(DIMENSIONS)
+    fake_api.routes[f"{COA}/cost-center"] = COST_CENTERS
+    tap_config["denormalize_cost_centers"] = True
+    stream = Tapgapi(config=tap_config).streams["costcenter_denormalized"]
+
+    records = list(stream.get_records(None))
+    expected = dict.fromkeys(stream.schema["properties"]["geography"]["properties"])
+    expected.update(geographyId="G1", geographyName="US")
+    assert records[0]["geography"] == expected
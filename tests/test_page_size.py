@@ -0,0 +1,109 @@
+"""Tests for adaptive page sizes and partitioned paginated streams."""
+
+from __future__ import annotations
+
+import json
+import urllib.parse
+
+import backoff
+
+from tap_gapi.client import paginatedGapiStream
+from tap_gapi.page_size import AdaptivePageSize, set_query_param
+from tap_gapi.tap import Tapgapi
+
+COST_CENTERS = "/finance/chart-of-account/cost-center"
+
+
+def test_page_size_grows_when_fast_and_shrinks_when_slow():
+    page_size = AdaptivePageSize(100, minimum=25, maximum=300, latency_target=2.0)
+    page_size.record_latency(0.1)
+    assert page_size.page_size == 200
+    page_size.record_latency(0.1)
+    assert page_size.page_size == 300
+    page_size.record_latency(1.5)
+    assert page_size.page_size == 300
+    page_size.record_latency(3.0)
+    assert page_size.page_size == 150
+    assert page_size.shrink()
+    assert page_size.shrink()
+    assert page_size.page_size == 37
+    assert page_size.shrink()
+    assert page_size.page_size == 25
+    assert not page_size.shrink()
+
+
+def test_fixed_page_size_never_changes():
+    page_size = AdaptivePageSize(100, adaptive=False)
+    page_size.record_latency(0.0)
+    assert not page_size.shrink()
+    assert page_size.page_size == 100
+
+
+def test_set_query_param_replaces_existing_value():
+    url = "https://gapi.example.com/x?activeStatus=ALL&limit=10&nextToken=%2522a%2522"
+    updated = urllib.parse.urlsplit(set_query_param(url, "limit", 5))
+    assert urllib.parse.parse_qsl(updated.query) == [
+        ("activeStatus", "ALL"),
+        ("nextToken", "%22a%22"),
+        ("limit", "5"),
+    ]
+
+
+def test_too_large_page_is_retried_smaller(
+    tap_config, fake_api, capsys, make_response, monkeypatch
+):
+    monkeypatch.setattr(
+        paginatedGapiStream,
+        "backoff_wait_generator",
+        lambda _: backoff.constant(interval=0),
+    )
+    tap_config.update(page_size=400, adaptive_page_size=True)
+    limits = []
+
+    def route(request, query):
+        limits.append(int(query["limit"]))
+        if int(query["limit"]) > 100:
+            return make_response({"error": "too large"}, status_code=413)
+        return make_response({"result": {"items": [{"costCenterId": "c1"}]}})
+
+    fake_api.routes[COST_CENTERS] = route
+    Tapgapi(config=tap_config).streams["costcenter"].sync()
+    assert limits == [400, 200, 100]
+    assert '"costCenterId": "c1"' in capsys.readouterr().out
+
+
+def test_partitions_are_fetched_per_filter_value(
+    tap_config, fake_api, capsys, make_response
+):
+    tap_config.update(
+        max_parallel_streams=4,
+        partition_filters={"costcenter": {"legalEntityId": ["LE1", "LE2"]}},
+    )
+
+    def route(request, query):
+        entity = query["legalEntityId"]
+        return make_response(
+            {
+                "result": {
+                    "items": [
+                        {"costCenterId": f"{entity}-{i}", "legalEntityId": entity}
+                        for i in range(3)
+                    ],
+                },
+            },
+        )
+
+    fake_api.routes[COST_CENTERS] = route
+    tap = Tapgapi(config=tap_config)
+    for stream in tap.streams.values():
+        stream.selected = stream.name == "costcenter"
+    tap.sync_all()
+
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [m["record"]["costCenterId"] for m in messages if m["type"] == "RECORD"]
+    assert records == [f"LE{e}-{i}" for e in (1, 2) for i in range(3)]
+    partitions = tap.state["bookmarks"]["costcenter"]["partitions"]
+    assert [p["context"] for p in partitions] == [
+        {"legalEntityId": "LE1"},
+        {"legalEntityId": "LE2"},
+    ]
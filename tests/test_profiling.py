@@ -0,0 +1,82 @@
+"""Tests for the per-stream profiling of a sync."""
+
+from __future__ import annotations
+
+import json
+import pstats
+import re
+import time
+
+from click.testing import CliRunner
+
+from tap_gapi.profiling import StreamProfiler
+from tap_gapi.tap import Tapgapi
+
+COST_CENTERS = "/finance/chart-of-account/cost-center"
+
+COLLAPSED_LINE = re.compile(r"^[^ ;]+(;[^;]+)* \d+$")
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_child_streams_are_profiled_apart_from_their_parent(tmp_path):
+    profiler = StreamProfiler(tmp_path, sample_interval=0.001)
+    with profiler:
+        with profiler.profile_stream("parent"):
+            kept = [bytearray(1024) for _ in range(100)]
+            with profiler.profile_stream("child"):
+                _busy(0.05)
+    del kept
+
+    parent, child = profiler.streams["parent"], profiler.streams["child"]
+    def functions(profile):  # noqa: ANN001, ANN202
+        return {function for _, _, function in pstats.Stats(profile).stats}
+
+    assert "_busy" not in functions(parent.profile)
+    assert "_busy" in functions(child.profile)
+    assert child.allocations is None
+    assert "Included in the report of the parent stream" in profiler.report("child")
+    assert any(
+        allocation.size_diff >= 100 * 1024
+        and allocation.traceback[-1].filename == __file__
+        for allocation in parent.allocations
+    )
+    assert any("_busy" in stack for stack in child.samples)
+    assert (tmp_path / "child.prof").exists()
+    assert (tmp_path / "parent.txt").exists()
+
+
+def test_sync_writes_a_report_per_stream(tap_config, fake_api, tmp_path):
+    fake_api.routes[COST_CENTERS] = {
+        "result": {"items": [{"costCenterId": str(i)} for i in range(50)]},
+    }
+    tap_config["profile_dir"] = str(tmp_path)
+    Tapgapi(config=tap_config).sync_all()
+
+    for name in ("costcenter", "function", "organization"):
+        assert "functions by own time" in (tmp_path / f"{name}.txt").read_text()
+        pstats.Stats(str(tmp_path / f"{name}.prof"))
+    report = (tmp_path / "costcenter.txt").read_text()
+    assert "parse_response" in report
+    assert "Peak traced memory" in report
+    for path in tmp_path.glob("*.collapsed"):
+        assert all(map(COLLAPSED_LINE.match, path.read_text().splitlines()))
+
+
+def test_profile_option_of_the_cli(tap_config, fake_api, tmp_path):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(tap_config))
+    profile_dir = tmp_path / "profile"
+
+    result = CliRunner().invoke(
+        Tapgapi.cli,
+        ["--config", str(config_path), "--profile", str(profile_dir)],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert (profile_dir / "costcenter.txt").exists()
+    assert fake_api.requests
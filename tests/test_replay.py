@@ -0,0 +1,69 @@
+"""Tests for the record and replay harness."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import urllib.parse
+
+from tap_gapi.tap import Tapgapi
+from tests.harness import Fixtures, record, redact, replay_server
+
+
+def _sync(config: dict) -> dict[str, list[dict]]:
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        Tapgapi(config=config).sync_all()
+    records: dict[str, list[dict]] = {}
+    for message in map(json.loads, output.getvalue().splitlines()):
+        if message["type"] == "RECORD":
+            records.setdefault(message["stream"], []).append(message["record"])
+    return records
+
+
+def test_tokens_are_redacted():
+    body = {
+        "result": [{"id": 1, "Access_Token": "secret", "nested": {"id_token": "x"}}],
+        "refresh_token": "secret",
+    }
+    assert redact(body) == {
+        "result": [
+            {"id": 1, "Access_Token": "REDACTED", "nested": {"id_token": "REDACTED"}},
+        ],
+        "refresh_token": "REDACTED",
+    }
+
+
+def test_synthetic_cost_centers_are_served_as_a_key_chain():
+    fixtures = Fixtures.synthetic(records=3, scale={"costcenter": 1_050})
+    with replay_server(fixtures) as server:
+        records = _sync(server.tap_config(scope="finance/coa", page_size=500))
+        assert server.requests == 3 + 4
+    ids = [record["costCenterId"] for record in records["costcenter"]]
+    assert len(ids) == len(set(ids)) == 1_050
+    assert len(records["function"]) == 3
+
+
+def test_recordings_replay_every_stream(tmp_path):
+    fixtures = Fixtures.synthetic(records=2, scale={"costcenter": 5}, page_size=2)
+    with replay_server(fixtures) as server:
+        config = server.tap_config()
+        paths = record(config, tmp_path)
+        expected = _sync(config)
+
+    assert len(paths) == len(expected) == 18
+    recording = json.loads((tmp_path / "costcenter.json").read_text())
+    tokens = [
+        urllib.parse.unquote(exchange["query"].get("nextToken", ""))
+        for exchange in recording["exchanges"]
+    ]
+    assert tokens == [
+        "",
+        '{"costCenterId": "00000002"}',
+        '{"costCenterId": "00000004"}',
+    ]
+    assert "replay-token" not in "".join(path.read_text() for path in paths)
+
+    with replay_server(Fixtures.load(tmp_path)) as server:
+        assert _sync(server.tap_config()) == expected
@@ -0,0 +1,127 @@
+"""Tests for the on-disk response cache."""
+
+from __future__ import annotations
+
+import json
+import urllib.parse
+
+import pytest
+import requests
+from singer_sdk.exceptions import FatalAPIError
+
+from tap_gapi.response_cache import ResponseCache
+from tap_gapi.tap import Tapgapi
+
+COST_CENTERS = "/finance/chart-of-account/cost-center"
+
+
+def _request(url: str) -> requests.PreparedRequest:
+    return requests.Request("GET", url).prepare()
+
+
+def _records(capsys) -> list[dict]:
+    return [
+        message["record"]
+        for message in map(json.loads, capsys.readouterr().out.splitlines())
+        if message["type"] == "RECORD"
+    ]
+
+
+@pytest.fixture
+def paged_cost_centers(fake_api, make_response):
+    def route(request, query):
+        token = query.get("nextToken")
+        if token is None:
+            page = {"items": [{"costCenterId": "c1"}], "lastEvaluatedKey": "2"}
+        else:
+            assert json.loads(urllib.parse.unquote(token)) == "2"
+            page = {"items": [{"costCenterId": "c2"}]}
+        return make_response({"result": page})
+
+    fake_api.routes[COST_CENTERS] = route
+
+
+def test_cache_key_ignores_query_order_and_depends_on_scope():
+    key = ResponseCache.cache_key(_request("https://h/p?a=1&b=2"), "finance/coa")
+    assert key == ResponseCache.cache_key(
+        _request("https://h/p?b=2&a=1"),
+        "finance/coa",
+    )
+    assert key != ResponseCache.cache_key(
+        _request("https://h/p?a=1&b=3"),
+        "finance/coa",
+    )
+    assert key != ResponseCache.cache_key(
+        _request("https://h/p?a=1&b=2"),
+        "business/taxonomy",
+    )
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path, make_response):
+    body = {"result": ["x" * 100]}
+    ResponseCache(tmp_path).store(_request("https://h/a"), "s", make_response(body))
+    (entry,) = tmp_path.glob("*.response")
+    max_bytes = entry.stat().st_size * 3 + 10
+
+    cache = ResponseCache(tmp_path, max_bytes=max_bytes)
+    for name in ("b", "c"):
+        cache.store(_request(f"https://h/{name}"), "s", make_response(body))
+    assert cache.load(_request("https://h/a"), "s").json() == body
+
+    cache.store(_request("https://h/d"), "s", make_response(body))
+    assert cache.load(_request("https://h/b"), "s") is None
+    assert cache.load(_request("https://h/a"), "s") is not None
+    assert len(list(tmp_path.glob("*.response"))) == 3
+
+    # The recency order survives across instances.
+    cache = ResponseCache(tmp_path, max_bytes=max_bytes)
+    cache.store(_request("https://h/e"), "s", make_response(body))
+    assert cache.load(_request("https://h/c"), "s") is None
+
+
+def test_errors_are_not_cached(tmp_path, make_response):
+    cache = ResponseCache(tmp_path)
+    cache.store(_request("https://h/a"), "s", make_response({}, status_code=500))
+    assert cache.load(_request("https://h/a"), "s") is None
+
+
+def test_second_run_is_served_from_cache(
+    tap_config, fake_api, capsys, paged_cost_centers, tmp_path
+):
+    tap_config["response_cache_dir"] = str(tmp_path)
+    Tapgapi(config=tap_config).streams["costcenter"].sync()
+    first = _records(capsys)
+    assert len(fake_api.requests) == 2
+    # Only the two data pages are cached, never the token response.
+    assert len(list(tmp_path.glob("*.response"))) == 2
+    assert fake_api.token_requests == 1
+
+    Tapgapi(config=tap_config).streams["costcenter"].sync()
+    assert _records(capsys) == first
+    assert len(fake_api.requests) == 2
+
+    tap_config["response_cache_ttl"] = 0
+    Tapgapi(config=tap_config).streams["costcenter"].sync()
+    assert _records(capsys) == first
+    assert len(fake_api.requests) == 4
+
+
+def test_replay_only_mode_never_sends_requests(
+    tap_config, fake_api, capsys, paged_cost_centers, tmp_path
+):
+    tap_config["response_cache_dir"] = str(tmp_path)
+    Tapgapi(config=tap_config).streams["costcenter"].sync()
+    first = _records(capsys)
+
+    token_requests = fake_api.token_requests
+
+    tap_config["response_cache_ttl"] = 0
+    tap_config["response_cache_replay_only"] = True
+    Tapgapi(config=tap_config).streams["costcenter"].sync()
+    assert _records(capsys) == first
+    assert len(fake_api.requests) == 2
+    assert fake_api.token_requests == token_requests
+
+    with pytest.raises(FatalAPIError, match="replay-only"):
+        Tapgapi(config=tap_config).streams["function"].sync()
+    assert len(fake_api.requests) == 2
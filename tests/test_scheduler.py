@@ -0,0 +1,95 @@
+"""Tests for the rate-limit aware request scheduler."""
+
+from __future__ import annotations
+
+import email.utils
+import threading
+import time
+
+import pytest
+
+from tap_gapi.client import (
+    RequestScheduler,
+    TokenBucket,
+    gapiStream,
+    rate_limit_delay,
+)
+from tap_gapi.tap import Tapgapi
+
+FUNCTIONS = "/finance/chart-of-account/function"
+
+
+def test_token_bucket_allows_burst_then_rate():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_rate_limit_delay_reads_headers(make_response):
+    assert rate_limit_delay(make_response({}, 429, {"Retry-After": "3"})) == 3
+    retry_at = email.utils.formatdate(time.time() + 30, usegmt=True)
+    delay = rate_limit_delay(make_response({}, 503, {"Retry-After": retry_at}))
+    assert 25 < delay <= 30
+    exhausted = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "7"}
+    assert rate_limit_delay(make_response({}, 200, exhausted)) == 7
+    exhausted["X-RateLimit-Reset"] = str(int(time.time()) + 60)
+    assert 55 < rate_limit_delay(make_response({}, 200, exhausted)) <= 60
+    remaining = {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "7"}
+    assert rate_limit_delay(make_response({}, 200, remaining)) is None
+    assert rate_limit_delay(make_response({}, 400, {"Retry-After": "3"})) is None
+
+
+def test_concurrency_is_limited_per_host():
+    scheduler = RequestScheduler(max_concurrent_requests_per_host=2)
+    in_flight = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+    lock = threading.Lock()
+
+    def request(host):
+        with scheduler.slot(f"https://{host}/x"):
+            with lock:
+                in_flight[host] += 1
+                peak[host] = max(peak[host], in_flight[host])
+            time.sleep(0.02)
+            with lock:
+                in_flight[host] -= 1
+
+    threads = [
+        threading.Thread(target=request, args=(host,))
+        for host in ("a", "b")
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == {"a": 2, "b": 2}
+    assert scheduler.throttle_waits[("a", "concurrency")][0] > 0
+
+
+def test_retry_after_is_honored_instead_of_backoff(
+    tap_config, fake_api, capsys, make_response, monkeypatch
+):
+    monkeypatch.setattr(gapiStream, "backoff_jitter", lambda _, value: value)
+    calls = []
+
+    def route(request, query):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return make_response({}, status_code=429, headers={"Retry-After": "0.3"})
+        return make_response({"result": [{"functionId": "a"}]})
+
+    fake_api.routes[FUNCTIONS] = route
+    tap = Tapgapi(config=tap_config)
+    tap.streams["function"].sync()
+
+    assert len(calls) == 2
+    assert 0.3 <= calls[1] - calls[0] < 1
+    waits, seconds = tap.request_scheduler.throttle_waits[
+        ("gapi.example.com", "retry_after")
+    ]
+    assert waits == 1
+    assert seconds == pytest.approx(0.3, abs=0.05)
+    assert '"functionId": "a"' in capsys.readouterr().out
@@ -0,0 +1,38 @@
+"""Tests for what starting the tap imports."""
+
+from __future__ import annotations
+
+from tap_gapi import streams
+from tests.harness import import_times
+
+SCOPE_MODULES = {"tap_gapi.streams.finance_coa", "tap_gapi.streams.business_taxonomy"}
+
+
+def test_importing_the_tap_builds_no_stream():
+    modules = import_times()
+    assert "tap_gapi.tap" in modules
+    assert not SCOPE_MODULES & set(modules)
+    assert "pyarrow" not in modules
+
+
+def test_only_the_configured_scopes_are_imported(tap_config):
+    tap_config["scope"] = "finance/coa"
+    # Scope modules are imported by importlib, which -X importtime doesn't log.
+    import_times(
+        "import sys\n"
+        "from tap_gapi.tap import Tapgapi\n"
+        f"tap = Tapgapi(config={tap_config!r})\n"
+        "assert len(tap.streams) == 5, list(tap.streams)\n"
+        "assert 'tap_gapi.streams.finance_coa' in sys.modules\n"
+        "assert 'tap_gapi.streams.business_taxonomy' not in sys.modules",
+    )
+
+
+def test_stream_classes_are_still_importable_from_the_streams_package():
+    from tap_gapi.streams import BusinessTaxonomyMarketsStream  # noqa: PLC0415
+
+    assert BusinessTaxonomyMarketsStream.scope == "business/taxonomy"
+    assert streams.SCOPE_STREAM_TYPES["business/taxonomy"][0] is (
+        BusinessTaxonomyMarketsStream
+    )
+    assert list(streams.SCOPE_STREAM_TYPES) == ["finance/coa", "business/taxonomy"]
@@ -0,0 +1,148 @@
+"""Offline throughput benchmarks of every stream, replayed from a local server.
+
+The time a fresh interpreter takes to import the tap, which every scheduled run
+and ``--about`` or ``--discover`` invocation pays, is benchmarked as well, along
+with a cold ``--discover`` with and without a cached catalog.
+
+Requires ``pytest-benchmark``. Scale the cost centers up with the
+``GAPI_BENCH_COST_CENTERS`` environment variable, e.g. to 2000000, and replay
+recordings instead of synthetic records with ``GAPI_BENCH_FIXTURES``::
+
+    GAPI_BENCH_COST_CENTERS=2000000 pytest tests/test_stream_benchmarks.py
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import pytest
+
+from tap_gapi.tap import Tapgapi
+from tests.harness import (
+    Fixtures,
+    ReplayServer,
+    import_times,
+    replay_server,
+    stream_types,
+)
+
+pytest.importorskip("pytest_benchmark")
+
+COST_CENTERS = int(os.environ.get("GAPI_BENCH_COST_CENTERS", "20000"))
+RECORDS_PER_STREAM = int(os.environ.get("GAPI_BENCH_RECORDS", "1000"))
+
+
+@pytest.fixture(scope="module")
+def server():
+    fixtures_dir = os.environ.get("GAPI_BENCH_FIXTURES")
+    fixtures = (
+        Fixtures.load(fixtures_dir)
+        if fixtures_dir
+        else Fixtures.synthetic(
+            records=RECORDS_PER_STREAM,
+            scale={"costcenter": COST_CENTERS},
+        )
+    )
+    with replay_server(fixtures) as replay:
+        yield replay
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere.
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _sync_stream(server: ReplayServer, stream_name: str) -> dict:
+    tap = Tapgapi(config=server.tap_config(page_size=1000))
+    stream = tap.streams[stream_name]
+    write_message = tap.write_message
+    records = 0
+
+    def count_records(message):  # noqa: ANN001, ANN202
+        nonlocal records
+        records += message.type == "RECORD"
+        write_message(message)
+
+    tap.write_message = count_records
+    requests_before, bytes_before = server.requests, server.bytes_sent
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        stream.sync()
+        elapsed = time.perf_counter() - start
+    sent = server.bytes_sent - bytes_before
+    return {
+        "records": records,
+        "requests": server.requests - requests_before,
+        "bytes": sent,
+        "records_per_second": round(records / elapsed),
+        "bytes_per_second": round(sent / elapsed),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+@pytest.mark.parametrize("stream_name", [t.name for t in stream_types()])
+def test_stream_throughput(benchmark, server, stream_name):
+    stats = benchmark.pedantic(
+        _sync_stream,
+        args=(server, stream_name),
+        rounds=1,
+        iterations=1,
+    )
+    benchmark.extra_info.update(stats)
+    assert stats["records"] > 0
+    assert stats["requests"] > 0
+
+
+def test_import_time(benchmark):
+    modules = benchmark.pedantic(import_times, rounds=5, iterations=1)
+    _, cumulative = modules["tap_gapi.tap"]
+    own_times = sorted(
+        ((own, module) for module, (own, _) in modules.items()),
+        reverse=True,
+    )
+    benchmark.extra_info.update(
+        {
+            "import_ms": round(cumulative / 1000, 1),
+            "slowest_modules": {module: own for own, module in own_times[:10]},
+        },
+    )
+    assert "tap_gapi.streams.finance_coa" not in modules
+
+
+def _discover(config_file: str, *args: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "tap_gapi.cli", "--config", config_file, *args],
+        capture_output=True,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def test_cached_discovery(benchmark, tap_config, tmp_path):
+    tap_config["scope"] = ["finance/coa", "business/taxonomy"]
+    tap_config["catalog_cache_dir"] = str(tmp_path / "catalogs")
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(tap_config))
+    uncached = _discover(str(config_file), "--discover", "--refresh-catalog")
+
+    cached = benchmark.pedantic(
+        _discover,
+        args=(str(config_file), "--discover"),
+        rounds=5,
+        iterations=1,
+    )
+    benchmark.extra_info.update(
+        {
+            "uncached_discovery_ms": round(uncached * 1000, 1),
+            "cached_discovery_ms": round(cached * 1000, 1),
+        },
+    )
+    assert cached < uncached
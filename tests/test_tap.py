@@ -0,0 +1,112 @@
+"""Tests for Tapgapi sync orchestration."""
+
+from __future__ import annotations
+
+import json
+import time
+
+from tap_gapi.tap import Tapgapi
+
+
+def _messages(capsys) -> list[dict]:
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_parallel_streams_keep_singer_order(
+    tap_config, fake_api, capsys, make_response
+):
+    def slow(request, query):
+        time.sleep(0.2)
+        return make_response({"result": [{"functionId": "F1"}, {"functionId": "F2"}]})
+
+    fake_api.routes["/finance/chart-of-account/function"] = slow
+    fake_api.routes["/finance/chart-of-account/geography"] = slow
+    fake_api.routes["/finance/chart-of-account/legal-entity"] = slow
+    fake_api.routes["/finance/chart-of-account/organization"] = slow
+    tap_config["max_parallel_streams"] = 5
+
+    start = time.perf_counter()
+    Tapgapi(config=tap_config).sync_all()
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.6
+    seen_schemas: set[str] = set()
+    finished: set[str] = set()
+    current = None
+    for message in _messages(capsys):
+        stream = message.get("stream")
+        if message["type"] == "SCHEMA":
+            seen_schemas.add(stream)
+        elif message["type"] == "RECORD":
+            assert stream in seen_schemas
+            assert stream not in finished
+            if current not in (None, stream):
+                finished.add(current)
+            current = stream
+    assert len(seen_schemas) == 5
+
+
+def test_multi_scope_run_shares_session_and_tokens(tap_config, fake_api, capsys):
+    tap_config["scope"] = ["finance/coa", "business/taxonomy"]
+    tap = Tapgapi(config=tap_config)
+
+    assert len(tap.streams) == 18
+    assert {s.requests_session for s in tap.streams.values()} == {tap.requests_session}
+
+    tap.sync_all()
+    capsys.readouterr()
+
+    assert fake_api.token_requests == 2
+    scopes = {
+        stream.scope: stream.authenticator for stream in tap.streams.values()
+    }
+    assert scopes["finance/coa"].oauth_scopes == "finance/coa"
+    assert scopes["business/taxonomy"].oauth_scopes == "business/taxonomy"
+
+
+def test_single_scope_string_is_still_accepted(tap_config):
+    tap = Tapgapi(config=tap_config)
+    assert tap.scopes == ["finance/coa"]
+    assert sorted(tap.streams) == [
+        "costcenter", "function", "geography", "legalentity", "organization",
+    ]
+
+
+def test_incremental_sync_filters_and_bookmarks(tap_config, fake_api, capsys):
+    fake_api.routes["/finance/chart-of-account/function"] = {
+        "result": [
+            {"functionId": "old", "lastUpdateDate": "2023-12-31T23:59:59Z"},
+            {"functionId": "new", "lastUpdateDate": "2024-02-01T00:00:00Z"},
+            {"functionId": "same", "lastUpdateDate": "2024-01-01T00:00:00+00:00"},
+        ],
+    }
+    state = {
+        "bookmarks": {
+            "function": {
+                "replication_key": "lastUpdateDate",
+                "replication_key_value": "2024-01-01T00:00:00Z",
+            },
+        },
+    }
+    tap = Tapgapi(config=tap_config, state=state)
+    tap.streams["function"].sync()
+
+    messages = _messages(capsys)
+    records = [m["record"]["functionId"] for m in messages if m["type"] == "RECORD"]
+    assert records == ["new", "same"]
+    bookmark = tap.state["bookmarks"]["function"]
+    assert bookmark["replication_key_value"] == "2024-02-01T00:00:00Z"
+
+
+def test_replication_filter_param_is_sent(tap_config, fake_api, monkeypatch):
+    from tap_gapi.streams import FinanceCOAFunctionStream
+
+    monkeypatch.setattr(
+        FinanceCOAFunctionStream, "replication_filter_param", "updatedSince"
+    )
+    tap_config["start_date"] = "2024-01-01T00:00:00Z"
+    stream = Tapgapi(config=tap_config).streams["function"]
+    stream._write_starting_replication_value(None)
+
+    params = stream.get_url_params(None, None)
+    assert params == {"updatedSince": "2024-01-01T00:00:00Z"}
@@ -0,0 +1,166 @@
+"""Tests for per-stream performance telemetry."""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+
+import pytest
+import requests
+from singer_sdk import metrics
+
+from tap_gapi.client import gapiStream
+from tap_gapi.tap import Tapgapi
+from tap_gapi.telemetry import LatencyHistogram, TelemetryMetric
+
+COST_CENTERS = "/finance/chart-of-account/cost-center"
+
+
+@pytest.fixture
+def metric_points():
+    """Collect the points logged by the SDK metrics logger."""
+    points: list[dict] = []
+
+    class Collector(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            message = record.getMessage()
+            if message.startswith("METRIC: "):
+                points.append(json.loads(message[len("METRIC: ") :]))
+
+    logger = metrics.get_metrics_logger()
+    handler = Collector()
+    logger.addHandler(handler)
+    yield points
+    logger.removeHandler(handler)
+
+
+def _summary(points: list[dict], stream: str) -> dict[str, object]:
+    names = {metric.value for metric in TelemetryMetric}
+    return {
+        point["metric"]: point["value"]
+        for point in points
+        if point["metric"] in names and point["tags"].get("stream") == stream
+    }
+
+
+def _cost_center_pages(make_response):
+    pages = [
+        {"result": {"items": [{"costCenterId": "c1"}], "lastEvaluatedKey": "2"}},
+        {"result": {"items": [{"costCenterId": "c2"}, {"costCenterId": "c3"}]}},
+    ]
+    calls = []
+
+    def route(request, query):
+        calls.append(query)
+        return make_response(pages[len(calls) - 1])
+
+    return route, pages
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = LatencyHistogram()
+    for seconds in (0.01, 0.2, 0.2, 100):
+        histogram.observe(seconds)
+    buckets = histogram.cumulative()
+    assert buckets["0.05"] == 1
+    assert buckets["0.25"] == 3
+    assert buckets["60.0"] == 3
+    assert buckets["+Inf"] == histogram.count == 4
+
+
+def test_stream_summary_is_logged_and_exported(
+    tap_config, fake_api, make_response, metric_points, tmp_path
+):
+    route, pages = _cost_center_pages(make_response)
+    fake_api.routes[COST_CENTERS] = route
+    textfile = tmp_path / "metrics" / "tap_gapi.prom"
+    tap_config["scope"] = "finance/coa"
+    tap_config["prometheus_textfile"] = str(textfile)
+    Tapgapi(config=tap_config).sync_all()
+
+    summary = _summary(metric_points, "costcenter")
+    assert summary["page_count"] == 2
+    assert summary["records_parsed"] == 3
+    assert summary["http_response_bytes"] == sum(
+        len(json.dumps(page)) for page in pages
+    )
+    assert summary["http_request_latency"]["count"] == 2
+    assert summary["serialization_duration"] > 0
+    assert summary["decode_duration"] > 0
+    token = [p for p in metric_points if p["metric"] == "token_request_duration"]
+    assert [p["tags"] for p in token] == [{"scope": "finance/coa", "count": 1}]
+
+    prom = textfile.read_text()
+    assert 'tap_gapi_pages_total{stream="costcenter"} 2' in prom
+    assert 'tap_gapi_records_parsed_total{stream="costcenter"} 3' in prom
+    assert (
+        'tap_gapi_http_request_duration_seconds_bucket{stream="costcenter",'
+        'le="+Inf"} 2'
+    ) in prom
+    assert 'tap_gapi_token_request_seconds_total{scope="finance/coa"}' in prom
+
+
+def test_backoff_is_counted(
+    tap_config, fake_api, make_response, metric_points, monkeypatch
+):
+    monkeypatch.setattr(gapiStream, "backoff_jitter", lambda _, value: 0.05)
+    route, _ = _cost_center_pages(make_response)
+    failed = []
+
+    def flaky(request, query):
+        if not failed:
+            failed.append(query)
+            return make_response({}, status_code=503)
+        return route(request, query)
+
+    fake_api.routes[COST_CENTERS] = flaky
+    tap = Tapgapi(config=tap_config)
+    tap.streams["costcenter"].sync()
+    tap.telemetry.log(tap.metrics_logger)
+
+    summary = _summary(metric_points, "costcenter")
+    assert summary["backoff_duration"] == 0.05
+    assert summary["page_count"] == 2
+    assert summary["http_request_latency"]["count"] == 3
+
+
+def test_streamed_bytes_are_counted_as_they_are_read(tap_config):
+    tap_config["stream_responses"] = True
+    tap = Tapgapi(config=tap_config)
+    stream = tap.streams["costcenter"]
+    content = json.dumps(
+        {"result": {"items": [{"costCenterId": str(i)} for i in range(100)]}},
+    ).encode()
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(content)
+
+    assert len(list(stream.parse_response(response))) == 100
+    totals = tap.telemetry.stream("costcenter").totals
+    assert totals[TelemetryMetric.HTTP_RESPONSE_BYTES] == len(content)
+    assert totals[TelemetryMetric.RECORDS_PARSED] == 100
+    assert totals[TelemetryMetric.DECODE_DURATION] > 0
+
+
+def test_requests_are_recorded_as_spans(tap_config, fake_api, make_response):
+    sdk_trace = pytest.importorskip("opentelemetry.sdk.trace")
+    exporting = pytest.importorskip("opentelemetry.sdk.trace.export")
+    in_memory = pytest.importorskip(
+        "opentelemetry.sdk.trace.export.in_memory_span_exporter",
+    )
+    exporter = in_memory.InMemorySpanExporter()
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(exporting.SimpleSpanProcessor(exporter))
+
+    route, _ = _cost_center_pages(make_response)
+    fake_api.routes[COST_CENTERS] = route
+    tap_config["opentelemetry"] = True
+    tap = Tapgapi(config=tap_config)
+    tap.telemetry.tracer = provider.get_tracer("tap-gapi")
+    tap.streams["costcenter"].sync()
+
+    spans = exporter.get_finished_spans()
+    assert [span.name for span in spans] == ["GET costcenter"] * 2
+    assert spans[0].attributes["http.response.status_code"] == 200
+    assert spans[0].attributes["tap_gapi.stream"] == "costcenter"
@@ -0,0 +1,35 @@
+"""Tests for the tap-wide HTTP transport."""
+
+from __future__ import annotations
+
+import pytest
+
+from tap_gapi.tap import Tapgapi
+from tap_gapi.transport import KeepAliveAdapter, build_session
+
+
+def test_session_reuses_connections_and_decompresses(stub_server):
+    stub_server.body = {"result": [{"functionId": "a"}]}
+    session = build_session(pool_size=4)
+    for _ in range(10):
+        response = session.get(f"{stub_server.url}/function", timeout=5)
+        assert response.json() == {"result": [{"functionId": "a"}]}
+    assert stub_server.connections == 1
+    assert "gzip" in stub_server.requests[0]["Accept-Encoding"]
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_tap_session_pool_follows_parallelism(tap_config):
+    tap_config["max_parallel_streams"] = 16
+    adapter = Tapgapi(config=tap_config).requests_session.get_adapter("https://x")
+    assert isinstance(adapter, KeepAliveAdapter)
+    assert adapter._pool_maxsize == 16  # noqa: SLF001
+
+
+def test_http2_adapter_converts_responses(stub_server):
+    pytest.importorskip("httpx")
+    stub_server.body = {"result": [{"functionId": "a"}]}
+    session = build_session(http2=True)
+    response = session.get(f"{stub_server.url}/function", timeout=5)
+    assert response.status_code == 200
+    assert response.json() == {"result": [{"functionId": "a"}]}
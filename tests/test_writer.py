@@ -0,0 +1,68 @@
+"""Tests for the buffered Singer message writer."""
+
+from __future__ import annotations
+
+import datetime
+import decimal
+import io
+import json
+
+from singer_sdk._singerlib import RecordMessage, SchemaMessage, StateMessage
+from singer_sdk._singerlib.messages import format_message
+
+from tap_gapi.tap import Tapgapi
+from tap_gapi.writer import FastMessageWriter
+
+EXTRACTED_AT = datetime.datetime(
+    2024, 5, 6, 7, 8, 9, 123456, tzinfo=datetime.timezone.utc
+)
+
+
+def test_messages_match_the_sdk_format():
+    output = io.BytesIO()
+    writer = FastMessageWriter(output)
+    messages = [
+        SchemaMessage("s", {"properties": {}}, ["id"]),
+        RecordMessage(
+            "s",
+            {"id": "a", "n": decimal.Decimal("1.10"), "ok": True, "x": None},
+            time_extracted=EXTRACTED_AT,
+        ),
+        RecordMessage("s", {"id": "b"}, version=3),
+        StateMessage({"bookmarks": {"s": {"replication_key_value": "b"}}}),
+    ]
+    for message in messages:
+        writer.write_message(message)
+
+    lines = output.getvalue().decode().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        json.loads(format_message(message)) for message in messages
+    ]
+
+
+def test_output_is_flushed_at_state_and_size_thresholds():
+    output = io.BytesIO()
+    writer = FastMessageWriter(output, flush_bytes=200)
+    writer.write_message(RecordMessage("s", {"id": "a"}))
+    assert output.getvalue() == b""
+    writer.write_message(StateMessage({"bookmarks": {}}))
+    assert output.getvalue().count(b"\n") == 2
+
+    for i in range(10):
+        writer.write_message(RecordMessage("s", {"id": str(i)}))
+    written = output.getvalue().count(b"\n")
+    assert 2 < written < 12
+    writer.flush()
+    assert output.getvalue().count(b"\n") == 12
+
+
+def test_tap_writes_through_fast_writer(tap_config, fake_api, capsys):
+    tap_config["fast_writer"] = True
+    fake_api.routes["/finance/chart-of-account/function"] = {
+        "result": [{"functionId": "a"}, {"functionId": "b"}],
+    }
+    Tapgapi(config=tap_config).sync_all()
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    records = [m["record"] for m in messages if m["type"] == "RECORD"]
+    assert records == [{"functionId": "a"}, {"functionId": "b"}]
+    assert messages[-1]["type"] == "STATE"